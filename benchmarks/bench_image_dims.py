@@ -0,0 +1,70 @@
+"""Compare files/sec of a full Pillow open against the header-only dimension reader.
+
+Usage:
+    python -m benchmarks.bench_image_dims [folder] [--files N] [--repeat R]
+
+Without a folder, a temporary corpus of N synthetic JPEG/PNG images is generated.
+"""
+import argparse
+import os
+import tempfile
+import time
+from PIL import Image
+from image_token.utils.utils import list_all_images, read_image_dims
+
+
+def pillow_read_image_dims(path: str) -> tuple[int, int]:
+    # The reader used before the header parser was introduced.
+    img = Image.open(path)
+    width, height = img.size
+    return width, height
+
+
+def generate_corpus(folder: str, num_files: int):
+    sizes = [(640, 480), (1920, 1080), (1024, 1024), (300, 500)]
+    for i in range(num_files):
+        width, height = sizes[i % len(sizes)]
+        image_format, ext = ("JPEG", "jpg") if i % 2 == 0 else ("PNG", "png")
+        Image.new("RGB", (width, height), (i % 255, 80, 160)).save(
+            os.path.join(folder, f"img_{i:06d}.{ext}"), format=image_format
+        )
+
+
+def time_reader(reader, paths, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for path in paths:
+            reader(path)
+        best = min(best, time.perf_counter() - start)
+    return len(paths) / best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("folder", nargs="?")
+    parser.add_argument("--files", type=int, default=2000)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        folder = args.folder
+        if folder is None:
+            folder = temp_dir
+            generate_corpus(folder, args.files)
+        paths = list(list_all_images(folder))
+
+        for path in paths:
+            assert read_image_dims(path) == pillow_read_image_dims(path), path
+
+        before = time_reader(pillow_read_image_dims, paths, args.repeat)
+        after = time_reader(read_image_dims, paths, args.repeat)
+
+    print(f"files: {len(paths)}")
+    print(f"PIL.Image.open : {before:12.0f} files/sec")
+    print(f"header reader  : {after:12.0f} files/sec")
+    print(f"speedup        : {after / before:12.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,57 @@
+"""Measure how long ``import image_token`` takes in a fresh interpreter.
+
+Usage:
+    python benchmarks/bench_import_time.py [--repeat R] [--top N]
+
+Each run uses ``python -X importtime``; the best total is reported together with the
+slowest modules of that run. Modules that should only load on first use (LangChain,
+tiktoken, requests) are flagged if they show up.
+"""
+import argparse
+import subprocess
+import sys
+
+LAZY_MODULES = ("langchain_core", "langchain_openai", "dotenv", "tiktoken", "requests")
+
+
+def import_times(module: str) -> dict[str, tuple[int, int]]:
+    # -X importtime writes "import time: self [us] | cumulative | imported package"
+    # to stderr, one line per module.
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    times = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        self_us, cumulative, name = line[len("import time:"):].split("|")
+        times[name.strip()] = (int(self_us), int(cumulative))
+    return times
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--top", type=int, default=10)
+    args = parser.parse_args()
+
+    runs = [import_times("image_token") for _ in range(args.repeat)]
+    best = min(runs, key=lambda times: times["image_token"][1])
+
+    print(f"import image_token : {best['image_token'][1] / 1000:10.1f} ms (best of {args.repeat})")
+    print(f"modules imported   : {len(best):10d}")
+    print("slowest modules (self ms / cumulative ms):")
+    for name, (self_us, cumulative) in sorted(best.items(), key=lambda item: -item[1][0])[: args.top]:
+        print(f"  {self_us / 1000:8.1f} {cumulative / 1000:8.1f}  {name}")
+
+    eager = [name for name in LAZY_MODULES if name in best]
+    if eager:
+        print(f"imported eagerly (expected lazy): {', '.join(eager)}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,177 @@
+"""Benchmark the URL paths against a local server with simulated network conditions.
+
+Usage:
+    python -m benchmarks.bench_network [--urls N] [--latency MS] [--jitter MS]
+        [--bandwidth KBPS] [--no-range] [--error-rate R] [--no-keep-alive]
+        [--max-workers W] [--full-download] [--scenarios NAME ...] [--output results.json]
+
+Scenarios:
+    process_image_from_url   one URL at a time through VisionModel.process_image_from_url
+    get_token_urls           the multi-URL path of get_token (iter_tokens with max_workers)
+    langchain_handler        LoggingHandler._process_image_from_url (needs langchain)
+
+Each scenario runs cold (empty cache) and warm (same sqlite cache, in-memory tier
+cleared as in a new process). Reported: URLs/sec, HTTP requests and connections,
+body bytes per image, failures, and p50/p99 latency. Latency is measured per call for
+the one-at-a-time scenarios and per request on the server for get_token_urls.
+"""
+import argparse
+import contextlib
+import io
+import json
+import os
+import tempfile
+import time
+from benchmarks.net_server import BenchmarkServer, ServerConfig
+from benchmarks.suite import environment
+from image_token.models.registry import get_model
+from image_token.utils import caching_utils
+from image_token.utils.caching_utils import ImageDimensionCache, get_memory_cache
+from image_token.utils.http_utils import ImageFetchSession
+
+MODEL_NAME = "gpt-4.1-mini"
+SCENARIOS = ("process_image_from_url", "get_token_urls", "langchain_handler")
+
+
+def percentile(values: list, q: float) -> float:
+    """Nearest-rank percentile of ``values``; 0 for an empty list."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, max(0, round(q / 100 * len(ordered)) - 1))]
+
+
+def run_process_image_from_url(urls, db_path, session, args):
+    model = get_model(MODEL_NAME)
+    latencies, tokens = [], []
+    with ImageDimensionCache(path=db_path) as cache:
+        for url in urls:
+            start = time.perf_counter()
+            tokens.append(
+                model.process_image_from_url(
+                    url, model_name=MODEL_NAME, cache=cache, partial=not args.full_download, session=session
+                )
+            )
+            latencies.append(time.perf_counter() - start)
+    return tokens, latencies
+
+
+def run_get_token_urls(urls, db_path, session, args):
+    model = get_model(MODEL_NAME)
+    records = model.iter_tokens(
+        MODEL_NAME,
+        urls,
+        max_workers=args.max_workers,
+        cache_path=db_path,
+        partial=not args.full_download,
+        session=session,
+    )
+    return [record.tokens for record in records], None
+
+
+def run_langchain_handler(urls, db_path, session, args):
+    from image_token.frameworks.langchain_callback import LoggingHandler
+
+    # The handler opens the default cache, so point the default at this run's database.
+    caching_utils.DB_PATH = db_path
+    handler = LoggingHandler(session=session)
+    latencies, tokens = [], []
+    for url in urls:
+        start = time.perf_counter()
+        tokens.append(handler._process_image_from_url(url, MODEL_NAME))
+        latencies.append(time.perf_counter() - start)
+    return tokens, latencies
+
+
+RUNNERS = {
+    "process_image_from_url": run_process_image_from_url,
+    "get_token_urls": run_get_token_urls,
+    "langchain_handler": run_langchain_handler,
+}
+
+
+def run_phase(server, runner, urls, db_path, args) -> dict:
+    get_memory_cache().clear()
+    server.stats.reset()
+    session = ImageFetchSession(pool_maxsize=max(args.max_workers, 10))
+    start = time.perf_counter()
+    # URL errors are reported with print(); keep them out of the results.
+    with contextlib.redirect_stdout(io.StringIO()):
+        tokens, latencies = runner(urls, db_path, session, args)
+    elapsed = time.perf_counter() - start
+    session.close()
+
+    stats = server.stats.snapshot()
+    latency_source = "client"
+    if latencies is None:
+        latencies, latency_source = stats["durations"], "server"
+    failures = sum(1 for value in tokens if value is None or value < 0)
+    return {
+        "urls": len(urls),
+        "seconds": elapsed,
+        "urls_per_sec": len(urls) / elapsed if elapsed > 0 else float("inf"),
+        "requests": stats["requests"],
+        "connections": stats["connections"],
+        "server_errors": stats["errors"],
+        "failures": failures,
+        "bytes": stats["bytes_sent"],
+        "bytes_per_image": stats["bytes_sent"] / len(urls) if urls else 0,
+        "latency_source": latency_source,
+        "p50_ms": percentile(latencies, 50) * 1000,
+        "p99_ms": percentile(latencies, 99) * 1000,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--urls", type=int, default=500)
+    parser.add_argument("--latency", type=float, default=20, help="Milliseconds before each response.")
+    parser.add_argument("--jitter", type=float, default=5, help="Milliseconds of random extra latency.")
+    parser.add_argument("--bandwidth", type=float, default=0, help="KB/s per response; 0 for unlimited.")
+    parser.add_argument("--no-range", action="store_true", help="Ignore Range headers.")
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--no-keep-alive", action="store_true")
+    parser.add_argument("--max-workers", type=int, default=32)
+    parser.add_argument("--full-download", action="store_true")
+    parser.add_argument("--scenarios", nargs="*", choices=SCENARIOS, default=list(SCENARIOS))
+    parser.add_argument("--output", help="Write the results as JSON to this file.")
+    args = parser.parse_args()
+
+    config = ServerConfig(
+        latency=args.latency / 1000,
+        jitter=args.jitter / 1000,
+        bandwidth=args.bandwidth * 1024,
+        support_range=not args.no_range,
+        error_rate=args.error_rate,
+        keep_alive=not args.no_keep_alive,
+    )
+    results = {"environment": environment(), "server": config._asdict(), "results": {}}
+
+    print(f"{'scenario':34} {'urls/s':>10} {'requests':>9} {'conns':>6} {'B/image':>9} "
+          f"{'failed':>7} {'p50 ms':>8} {'p99 ms':>8}")
+    with BenchmarkServer(config) as server, tempfile.TemporaryDirectory() as temp_dir:
+        for scenario in args.scenarios:
+            if scenario == "langchain_handler":
+                try:
+                    import image_token.frameworks.langchain_callback  # noqa: F401
+                except ImportError as err:
+                    print(f"{scenario:34} skipped ({err})")
+                    continue
+            # Every scenario gets its own URLs and database, so none starts warm.
+            offset = SCENARIOS.index(scenario) * args.urls
+            urls = [server.url(offset + i) for i in range(args.urls)]
+            db_path = os.path.join(temp_dir, f"{scenario}.sqlite")
+            for phase in ("cold", "warm"):
+                result = run_phase(server, RUNNERS[scenario], urls, db_path, args)
+                results["results"][f"{scenario}.{phase}"] = result
+                print(f"{scenario + '.' + phase:34} {result['urls_per_sec']:10.0f} {result['requests']:9d} "
+                      f"{result['connections']:6d} {result['bytes_per_image']:9.0f} {result['failures']:7d} "
+                      f"{result['p50_ms']:8.1f} {result['p99_ms']:8.1f}")
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
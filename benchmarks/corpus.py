@@ -0,0 +1,137 @@
+"""Deterministic synthetic image corpora for the benchmarks.
+
+A corpus is described by a CorpusSpec. Every distinct (format, resolution, EXIF size)
+image is encoded once and its bytes are written to as many paths as needed, so
+corpora of a million files can be generated in minutes. Corpora are reused when a
+folder already holds one generated from the same spec.
+"""
+import io
+import json
+import os
+import random
+import shutil
+from typing import NamedTuple
+from PIL import Image
+
+MANIFEST = "corpus.json"
+
+# Files with extensions that list_all_images skips, mixed in at ``noise_ratio``.
+NOISE_FILES = ((".webp", "WEBP"), (".gif", "GIF"), (".txt", None))
+
+# EXIF blocks are carried in the MakerNote tag.
+MAKER_NOTE_TAG = 0x927C
+
+
+class CorpusSpec(NamedTuple):
+    """
+    Describes a synthetic corpus.
+
+    Args:
+        num_files (int): The number of image files.
+        formats (tuple): File extensions of the images, e.g. ".jpg", ".JPEG", ".png".
+        resolutions (tuple): (width, height) of the images.
+        exif_sizes (tuple): Sizes in bytes of the EXIF block of JPEG images; 0 for none.
+        depth (int): Depth of the folder tree the files are spread over.
+        fanout (int): Number of subfolders per folder.
+        noise_ratio (float): Ratio of unsupported files (WebP, GIF, text) added.
+        seed (int): Seed of the random assignment of images to paths.
+    """
+
+    num_files: int = 10_000
+    formats: tuple = (".jpg", ".jpeg", ".png", ".JPG")
+    resolutions: tuple = (
+        (320, 240), (640, 480), (1024, 1024), (1920, 1080), (4032, 3024), (8000, 6000)
+    )
+    exif_sizes: tuple = (0, 4096, 60_000)
+    depth: int = 3
+    fanout: int = 8
+    noise_ratio: float = 0.05
+    seed: int = 0
+
+    def to_json(self) -> dict:
+        return json.loads(json.dumps(self._asdict()))
+
+
+def encode_image(image_format: str, width: int, height: int, exif_size: int = 0) -> bytes:
+    """Encodes a solid-color image, with an EXIF block of about ``exif_size`` bytes for JPEGs."""
+    image = Image.new("RGB", (width, height), (width % 251, height % 241, 128))
+    buffer = io.BytesIO()
+    save_kwargs = {}
+    if image_format == "JPEG" and exif_size:
+        exif = Image.Exif()
+        exif[MAKER_NOTE_TAG] = bytes(exif_size)
+        save_kwargs["exif"] = exif.tobytes()
+    image.save(buffer, format=image_format, **save_kwargs)
+    return buffer.getvalue()
+
+
+def _folder_for(index: int, depth: int, fanout: int) -> str:
+    parts = []
+    for _ in range(depth):
+        parts.append(f"d{index % fanout}")
+        index //= fanout
+    return os.path.join(*parts) if parts else ""
+
+
+def generate_corpus(folder: str, spec: CorpusSpec = CorpusSpec()) -> dict:
+    """
+    Generates a corpus in ``folder``, or reuses the one already there.
+
+    Args:
+        folder (str): The corpus folder. It is emptied if it holds another corpus.
+        spec (CorpusSpec): The corpus to generate.
+
+    Returns:
+        dict: The manifest: the spec and the number of image and noise files.
+    """
+    manifest_path = os.path.join(folder, MANIFEST)
+    if os.path.exists(manifest_path):
+        with open(manifest_path) as f:
+            manifest = json.load(f)
+        if manifest["spec"] == spec.to_json():
+            return manifest
+        shutil.rmtree(folder)
+    os.makedirs(folder, exist_ok=True)
+
+    rng = random.Random(spec.seed)
+    templates = {}
+    for i in range(spec.num_files):
+        ext = rng.choice(spec.formats)
+        width, height = rng.choice(spec.resolutions)
+        image_format = "PNG" if ext.lower() == ".png" else "JPEG"
+        exif_size = rng.choice(spec.exif_sizes) if image_format == "JPEG" else 0
+        key = (image_format, width, height, exif_size)
+        if key not in templates:
+            templates[key] = encode_image(image_format, width, height, exif_size)
+
+        relative = os.path.join(_folder_for(i, spec.depth, spec.fanout), f"img_{i:07d}{ext}")
+        _write(folder, relative, templates[key])
+
+    num_noise = int(spec.num_files * spec.noise_ratio)
+    for i in range(num_noise):
+        ext, image_format = NOISE_FILES[i % len(NOISE_FILES)]
+        key = (image_format, 64, 64, 0)
+        if key not in templates:
+            templates[key] = encode_image(image_format, 64, 64) if image_format else b"not an image\n"
+        relative = os.path.join(_folder_for(i, spec.depth, spec.fanout), f"noise_{i:07d}{ext}")
+        _write(folder, relative, templates[key])
+
+    manifest = {
+        "spec": spec.to_json(),
+        "images": spec.num_files,
+        "noise_files": num_noise,
+    }
+    with open(manifest_path, "w") as f:
+        json.dump(manifest, f)
+    return manifest
+
+
+def _write(folder: str, relative: str, data: bytes):
+    path = os.path.join(folder, relative)
+    try:
+        f = open(path, "wb")
+    except FileNotFoundError:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        f = open(path, "wb")
+    with f:
+        f.write(data)
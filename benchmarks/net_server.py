@@ -0,0 +1,248 @@
+"""A local HTTP image server that simulates CDN latency, bandwidth and failures.
+
+Used by bench_network.py; it can also be run on its own to point other tools at:
+
+    python -m benchmarks.net_server --port 8765 --latency 50 --bandwidth 2000
+"""
+import argparse
+import random
+import re
+import socket
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import NamedTuple, Optional
+from benchmarks.corpus import encode_image
+
+# Image variants served under /img/<n>.<ext>, chosen by n modulo their count.
+DEFAULT_VARIANTS = (
+    ("JPEG", 640, 480, 0),
+    ("JPEG", 1920, 1080, 4096),
+    ("JPEG", 4032, 3024, 60_000),
+    ("PNG", 512, 512, 0),
+    ("PNG", 2048, 1536, 0),
+)
+
+
+class ServerConfig(NamedTuple):
+    """
+    Network behavior of the benchmark server.
+
+    Args:
+        latency (float): Seconds before the response headers are sent.
+        jitter (float): Up to this many seconds are added to the latency at random.
+        bandwidth (float): Bytes per second per response; 0 for unlimited.
+        support_range (bool): Answer Range requests with 206 partial content.
+        error_rate (float): Share of requests answered with 503.
+        keep_alive (bool): Keep connections open between requests.
+        seed (int): Seed of the jitter and error injection.
+    """
+
+    latency: float = 0.02
+    jitter: float = 0.0
+    bandwidth: float = 0
+    support_range: bool = True
+    error_rate: float = 0.0
+    keep_alive: bool = True
+    seed: int = 0
+
+
+class ServerStats:
+    """Counters of a BenchmarkServer; ``durations`` holds the seconds spent per request."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        self.requests = 0
+        self.connections = 0
+        self.errors = 0
+        self.bytes_sent = 0
+        self.durations = []
+
+    def snapshot(self) -> dict:
+        with self.lock:
+            return {
+                "requests": self.requests,
+                "connections": self.connections,
+                "errors": self.errors,
+                "bytes_sent": self.bytes_sent,
+                "durations": list(self.durations),
+            }
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format, *args):
+        pass
+
+    def setup(self):
+        super().setup()
+        # Headers and body are separate writes; without TCP_NODELAY every keep-alive
+        # response would wait ~40 ms for Nagle's algorithm and delayed ACKs.
+        self.connection.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        with self.server.stats.lock:
+            self.server.stats.connections += 1
+
+    def do_GET(self):
+        start = time.perf_counter()
+        server = self.server
+        config = server.config
+        sent = 0
+        fail = False
+        try:
+            with server.rng_lock:
+                delay = config.latency + config.jitter * server.rng.random()
+                fail = server.rng.random() < config.error_rate
+            if delay:
+                time.sleep(delay)
+            if not config.keep_alive:
+                self.close_connection = True
+            if fail:
+                sent = self._send(503, b"unavailable", {})
+                return
+            body = server.body_for(self.path)
+            if body is None:
+                sent = self._send(404, b"not found", {})
+                return
+            sent = self._send_image(body)
+        finally:
+            with server.stats.lock:
+                server.stats.requests += 1
+                server.stats.errors += fail
+                server.stats.bytes_sent += sent
+                server.stats.durations.append(time.perf_counter() - start)
+
+    def _send_image(self, body: bytes) -> int:
+        match = re.match(r"bytes=(\d+)-(\d*)", self.headers.get("Range") or "")
+        if self.server.config.support_range and match:
+            start = int(match.group(1))
+            if start >= len(body):
+                return self._send(416, b"", {"Content-Range": f"bytes */{len(body)}"})
+            end = min(int(match.group(2)) if match.group(2) else len(body) - 1, len(body) - 1)
+            return self._send(
+                206, body[start : end + 1], {"Content-Range": f"bytes {start}-{end}/{len(body)}"}
+            )
+        return self._send(200, body, {})
+
+    def _send(self, status: int, payload: bytes, headers: dict) -> int:
+        self.send_response(status)
+        for name, value in headers.items():
+            self.send_header(name, value)
+        self.send_header("Content-Type", "application/octet-stream")
+        self.send_header("Content-Length", str(len(payload)))
+        if self.close_connection:
+            self.send_header("Connection", "close")
+        self.end_headers()
+
+        bandwidth = self.server.config.bandwidth
+        chunk_size = max(1024, int(bandwidth / 50)) if bandwidth else 64 * 1024
+        sent = 0
+        try:
+            for i in range(0, len(payload), chunk_size):
+                chunk = payload[i : i + chunk_size]
+                self.wfile.write(chunk)
+                sent += len(chunk)
+                if bandwidth:
+                    time.sleep(len(chunk) / bandwidth)
+        except (BrokenPipeError, ConnectionResetError):
+            # Header-only clients close the connection once they have the dimensions.
+            self.close_connection = True
+        return sent
+
+
+class BenchmarkServer(ThreadingHTTPServer):
+    """
+    Serves generated images under ``/img/<n>.<ext>`` with the behavior of ``config``.
+
+    Use as a context manager; the server runs on a background thread.
+
+    Args:
+        config (ServerConfig): The simulated network behavior.
+        port (int): The port to listen on. Defaults to a free port.
+        variants (tuple): (format, width, height, EXIF size) of the images served.
+    """
+
+    daemon_threads = True
+
+    def __init__(self, config: ServerConfig = ServerConfig(), port: int = 0, variants=DEFAULT_VARIANTS):
+        super().__init__(("127.0.0.1", port), _Handler)
+        self.config = config
+        self.stats = ServerStats()
+        self.rng = random.Random(config.seed)
+        self.rng_lock = threading.Lock()
+        self.variants = [
+            (width, height, encode_image(image_format, width, height, exif_size))
+            for image_format, width, height, exif_size in variants
+        ]
+        self.base_url = f"http://127.0.0.1:{self.server_address[1]}"
+        self._thread: Optional[threading.Thread] = None
+
+    def __enter__(self):
+        self._thread = threading.Thread(target=self.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.shutdown()
+        self.server_close()
+
+    def handle_error(self, request, client_address):
+        # Header-only clients drop the connection mid-body; that is expected, not an error.
+        if isinstance(sys.exc_info()[1], (BrokenPipeError, ConnectionResetError)):
+            return
+        super().handle_error(request, client_address)
+
+    def _variant(self, index: int):
+        return self.variants[index % len(self.variants)]
+
+    def body_for(self, path: str) -> Optional[bytes]:
+        match = re.fullmatch(r"/img/(\d+)\.\w+", path.split("?")[0])
+        if match is None:
+            return None
+        return self._variant(int(match.group(1)))[2]
+
+    def url(self, index: int) -> str:
+        """Returns the URL of image ``index``."""
+        ext = "png" if self._variant(index)[2].startswith(b"\x89PNG") else "jpg"
+        return f"{self.base_url}/img/{index}.{ext}"
+
+    def dimensions(self, index: int) -> tuple[int, int]:
+        """Returns the (width, height) of image ``index``."""
+        width, height, _ = self._variant(index)
+        return width, height
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency", type=float, default=20, help="Milliseconds.")
+    parser.add_argument("--jitter", type=float, default=0, help="Milliseconds.")
+    parser.add_argument("--bandwidth", type=float, default=0, help="KB/s per response; 0 for unlimited.")
+    parser.add_argument("--no-range", action="store_true")
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--no-keep-alive", action="store_true")
+    args = parser.parse_args()
+
+    config = ServerConfig(
+        latency=args.latency / 1000,
+        jitter=args.jitter / 1000,
+        bandwidth=args.bandwidth * 1024,
+        support_range=not args.no_range,
+        error_rate=args.error_rate,
+        keep_alive=not args.no_keep_alive,
+    )
+    with BenchmarkServer(config, port=args.port) as server:
+        print(f"serving {server.base_url}/img/<n>.jpg (Ctrl-C to stop)")
+        try:
+            while True:
+                time.sleep(3600)
+        except KeyboardInterrupt:
+            pass
+
+
+if __name__ == "__main__":
+    main()
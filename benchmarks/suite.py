@@ -0,0 +1,236 @@
+"""Benchmark suite over a synthetic corpus, with results that can be compared between commits.
+
+Usage:
+    python -m benchmarks.suite [--files N] [--corpus DIR] [--repeat R] [--only PREFIX ...]
+                               [--output results.json] [--compare baseline.json]
+
+Times list_all_images, read_image_dims, calculate_image_tokens per model family
+(scalar and, with NumPy, batched), ImageDimensionCache writes and reads, and
+end-to-end get_token. Every benchmark is run ``--repeat`` times; the best and median
+times and the best throughput are written as JSON together with the commit, Python
+version and corpus spec. ``--compare`` prints the change against an earlier results
+file and, with ``--fail-on-regression``, exits with status 1 when a benchmark got
+slower than ``--threshold``.
+
+Without ``--corpus`` the corpus is generated in a temporary folder; pass a folder to
+generate it once and reuse it between runs (e.g. for 1M files).
+"""
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Callable, NamedTuple, Optional
+from benchmarks.corpus import CorpusSpec, generate_corpus
+from image_token import get_token
+from image_token.models.registry import get_model
+from image_token.utils.caching_utils import ImageDimensionCache
+from image_token.utils.utils import list_all_images, read_image_dims
+
+# One model per token formula.
+MODEL_FAMILIES = {
+    "patch": "gpt-4.1-mini",
+    "tile": "gpt-4o",
+    "gemini": "gemini-2.5-pro",
+    "gemini_tiled": "gemini-2.0-flash",
+}
+
+
+class Case(NamedTuple):
+    """A benchmark: ``run`` processes ``items`` items; ``setup`` runs untimed before each run."""
+
+    items: int
+    run: Callable[[], object]
+    setup: Optional[Callable[[], object]] = None
+
+
+def time_case(case: Case, repeat: int) -> dict:
+    times = []
+    for _ in range(repeat):
+        if case.setup is not None:
+            case.setup()
+        start = time.perf_counter()
+        case.run()
+        times.append(time.perf_counter() - start)
+    best = min(times)
+    return {
+        "items": case.items,
+        "best_s": best,
+        "median_s": statistics.median(times),
+        "per_sec": case.items / best if best > 0 else float("inf"),
+    }
+
+
+def _consume(iterator):
+    for _ in iterator:
+        pass
+
+
+def _quiet(func):
+    # get_token shows a tqdm progress bar for folders; keep it out of the output.
+    def run():
+        with contextlib.redirect_stderr(io.StringIO()):
+            return func()
+    return run
+
+
+def build_cases(folder: str, work_dir: str, paths: list, dims: list, workers: int) -> dict:
+    cases = {
+        "list_all_images": Case(len(paths), lambda: _consume(list_all_images(folder))),
+        "read_image_dims": Case(len(paths), lambda: [read_image_dims(path) for path in paths]),
+    }
+
+    for family, model_name in MODEL_FAMILIES.items():
+        model = get_model(model_name)
+
+        def scalar(model=model, model_name=model_name):
+            for width, height in dims:
+                model.calculate_image_tokens(model_name, width, height)
+
+        cases[f"tokens.{family}"] = Case(len(dims), scalar)
+
+    try:
+        import numpy as np
+    except ImportError:
+        np = None
+    if np is not None:
+        widths = np.array([width for width, _ in dims])
+        heights = np.array([height for _, height in dims])
+        for family, model_name in MODEL_FAMILIES.items():
+            model = get_model(model_name)
+            cases[f"tokens_batch.{family}"] = Case(
+                len(dims),
+                lambda model=model, model_name=model_name: model.calculate_image_tokens_batch(
+                    model_name, widths, heights
+                ),
+            )
+
+    entries = [(f"https://bench.invalid/{i}.jpg", width, height) for i, (width, height) in enumerate(dims)]
+    urls = [url for url, _, _ in entries]
+    write_db = os.path.join(work_dir, "write.sqlite")
+    read_db = os.path.join(work_dir, "read.sqlite")
+    with ImageDimensionCache(memory_cache=None, path=read_db) as cache:
+        cache.bulk_put(entries)
+
+    def reset_write_db():
+        for suffix in ("", "-wal", "-shm"):
+            with contextlib.suppress(FileNotFoundError):
+                os.remove(write_db + suffix)
+
+    def cache_write():
+        with ImageDimensionCache(memory_cache=None, path=write_db) as cache:
+            for url, width, height in entries:
+                cache.cache_dimensions(url, width, height)
+
+    def cache_read():
+        with ImageDimensionCache(memory_cache=None, path=read_db) as cache:
+            for url in urls:
+                cache.get_cached_dimensions(url)
+
+    def cache_read_many():
+        with ImageDimensionCache(memory_cache=None, path=read_db) as cache:
+            cache.get_many(urls)
+
+    cases["cache.write"] = Case(len(entries), cache_write, setup=reset_write_db)
+    cases["cache.read"] = Case(len(urls), cache_read)
+    cases["cache.read_many"] = Case(len(urls), cache_read_many)
+
+    cases["get_token"] = Case(
+        len(paths), _quiet(lambda: get_token(model_name="gpt-4.1-mini", path=folder))
+    )
+    if workers > 1:
+        cases["get_token.workers"] = Case(
+            len(paths),
+            _quiet(lambda: get_token(model_name="gpt-4.1-mini", path=folder, workers=workers)),
+        )
+    return cases
+
+
+def environment() -> dict:
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    return {
+        "commit": commit,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+    }
+
+
+def compare(results: dict, baseline: dict, threshold: float) -> list:
+    """Prints the change in throughput per benchmark and returns the regressed names."""
+    regressions = []
+    print(f"\n{'benchmark':28} {'baseline/s':>14} {'current/s':>14} {'change':>9}")
+    for name, result in results["results"].items():
+        before = baseline["results"].get(name)
+        if before is None:
+            print(f"{name:28} {'-':>14} {result['per_sec']:14.0f} {'new':>9}")
+            continue
+        change = result["per_sec"] / before["per_sec"] - 1
+        flag = ""
+        if change < -threshold:
+            regressions.append(name)
+            flag = "  REGRESSION"
+        print(f"{name:28} {before['per_sec']:14.0f} {result['per_sec']:14.0f} {change:+9.1%}{flag}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--files", type=int, default=10_000)
+    parser.add_argument("--corpus", help="Folder to generate the corpus in and reuse.")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--only", nargs="*", help="Run only benchmarks starting with these prefixes.")
+    parser.add_argument("--output", help="Write the results as JSON to this file.")
+    parser.add_argument("--compare", help="Results file of an earlier run to compare with.")
+    parser.add_argument("--threshold", type=float, default=0.10)
+    parser.add_argument("--fail-on-regression", action="store_true")
+    args = parser.parse_args()
+
+    spec = CorpusSpec(num_files=args.files, seed=args.seed)
+    with tempfile.TemporaryDirectory() as temp_dir:
+        folder = args.corpus or os.path.join(temp_dir, "corpus")
+        start = time.perf_counter()
+        manifest = generate_corpus(folder, spec)
+        print(f"corpus: {manifest['images']} images, {manifest['noise_files']} other files "
+              f"({time.perf_counter() - start:.1f}s)")
+
+        paths = list(list_all_images(folder))
+        dims = [read_image_dims(path) for path in paths]
+        cases = build_cases(folder, temp_dir, paths, dims, args.workers)
+
+        results = {"environment": environment(), "corpus": manifest, "results": {}}
+        for name, case in cases.items():
+            if args.only and not any(name.startswith(prefix) for prefix in args.only):
+                continue
+            result = time_case(case, args.repeat)
+            results["results"][name] = result
+            print(f"{name:28} {result['per_sec']:14.0f} items/s  (best {result['best_s']:.3f}s)")
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        regressions = compare(results, baseline, args.threshold)
+        if regressions and args.fail_on_regression:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,2 +1,22 @@
-from .main import get_token, get_cost
-from .frameworks.langchain_callback import simulate_image_token_cost
+from .main import (
+    get_token,
+    get_cost,
+    iter_tokens,
+    aget_token,
+    aget_cost,
+    calculate_image_tokens_batch,
+    get_token_multi,
+    compare_cost,
+)
+from .models.registry import ModelCalculator, register_model
+from .utils.metrics import Metrics
+
+
+def __getattr__(name):
+    # The LangChain integration pulls in langchain, openai, tiktoken and dotenv, which
+    # take longer to import than the rest of the package; load it on first access.
+    if name == "simulate_image_token_cost":
+        from .frameworks.langchain_callback import simulate_image_token_cost
+
+        return simulate_image_token_cost
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
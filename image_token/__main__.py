@@ -0,0 +1,4 @@
+import sys
+from image_token.cli import main
+
+sys.exit(main())
@@ -1,9 +1,9 @@
+import asyncio
 from abc import ABC, abstractmethod
+from contextlib import ExitStack
 from pathlib import Path
-import json
+from typing import AsyncIterator, Container, Iterator, Optional
 import tqdm
-import requests
-from requests.exceptions import HTTPError, RequestException
 from image_token.utils.validate import (
     check_if_path_is_file,
     check_if_path_is_folder,
@@ -11,14 +11,90 @@ from image_token.utils.validate import (
     is_multiple_urls,
     check_allowed_extensions,
 )
-from image_token.utils.utils import (
-    list_all_images,
-    read_image_dims,
-    get_image_dimensions_from_bytes
+from image_token.utils.utils import read_image_dims
+from image_token.utils.caching_utils import (
+    AsyncImageDimensionCache,
+    DimensionLRU,
+    ImageDimensionCache,
+    UrlEntry,
 )
-from image_token.utils.caching_utils import ImageDimensionCache
+from image_token.utils.http_utils import (
+    ImageFetchResult,
+    ImageFetchSession,
+    fetch_image_info,
+)
+from image_token.utils.fetcher import (
+    DEFAULT_MAX_PER_HOST,
+    DEFAULT_MAX_WORKERS,
+    fetch_dimensions_concurrently,
+)
+from image_token.utils.parallel import iter_folder_dims
+from image_token.utils.metrics import NULL_METRICS, SIZE_BUCKETS, Metrics
+from image_token.utils.array_utils import as_dimension_arrays, import_numpy
+from image_token.utils.records import TokenRecord
+from image_token.utils.sinks import open_sink
+from image_token.utils.async_utils import (
+    DEFAULT_MAX_CONCURRENCY,
+    AsyncHostLimiter,
+    afetch_image_dimensions,
+)
+
+DEFAULT_TOKEN_MEMO_SIZE = 4096
+
+# URL lists are resolved in batches of this size, so memory stays bounded for long lists.
+URL_BATCH_SIZE = 1024
+
+# Shared by all model instances: (model class, model name, width, height, kwargs) -> tokens.
+_token_memo = DimensionLRU(maxsize=DEFAULT_TOKEN_MEMO_SIZE)
+
+
+def get_token_memo() -> DimensionLRU:
+    """Returns the process-wide memo of computed image token counts."""
+    return _token_memo
+
+
+def configure_token_memo(maxsize: int):
+    """
+    Sets the size of the process-wide token memo.
+
+    Args:
+        maxsize (int): The maximum number of entries. 0 disables memoization.
+    """
+    _token_memo.resize(maxsize)
+
 
 class VisionModel(ABC):
+
+    def cached_image_tokens(self, model_name: str, width: int, height: int, **kwargs) -> int:
+        """
+        Memoized calculate_image_tokens.
+
+        Datasets usually contain few distinct resolutions, so token counts are kept in a
+        bounded process-wide memo keyed by model, dimensions and the keyword arguments
+        (e.g. ``prefix_tokens``). Hit counts are available from ``get_token_memo().stats()``.
+
+        Args:
+            model_name (str): The name of the model.
+            width (int): The width of the image.
+            height (int): The height of the image.
+
+        Returns:
+            int: The number of tokens for the image.
+        """
+        key = (type(self), model_name, width, height, tuple(sorted(kwargs.items())))
+        try:
+            num_tokens = _token_memo.get(key)
+        except TypeError:
+            # Unhashable keyword arguments cannot be memoized.
+            return self.calculate_image_tokens(
+                model_name=model_name, width=width, height=height, **kwargs
+            )
+        if num_tokens is None:
+            num_tokens = self.calculate_image_tokens(
+                model_name=model_name, width=width, height=height, **kwargs
+            )
+            _token_memo.put(key, num_tokens)
+        return num_tokens
     
     def process_image(self, path: str, model_name: str = None , **kwargs):
         """
@@ -35,7 +111,7 @@ class VisionModel(ABC):
 
         width, height = read_image_dims(path=path)
 
-        num_tokens = self.calculate_image_tokens(
+        num_tokens = self.cached_image_tokens(
             model_name=model_name,
             width=width,
             height=height,
@@ -45,85 +121,701 @@ class VisionModel(ABC):
         return num_tokens
 
     def process_image_from_url(
-        self, url: str, model_name: str = None, cache: ImageDimensionCache = None , **kwargs
+        self,
+        url: str,
+        model_name: str = None,
+        cache: ImageDimensionCache = None,
+        partial: bool = True,
+        session: ImageFetchSession = None,
+        **kwargs
     ) -> int:
         """
         Process an image from a URL and calculate number of tokens, using persistent dimension cache.
 
+        If the cache has ``revalidate`` set, a stale entry with an ``ETag`` or
+        ``Last-Modified`` validator is confirmed with a conditional request; a
+        304 Not Modified answer only refreshes the entry.
+
+        Args:
+            url (str): The URL of the image.
+            model_name (str): The name of the model.
+            cache (ImageDimensionCache): An open dimension cache.
+            partial (bool): Only download the image header (Range / streamed early-abort)
+                            instead of the full body. Defaults to True.
+            session (ImageFetchSession): The HTTP session. Defaults to the shared session.
+
+        Returns:
+            int: The number of tokens in the image, or -1 if the image could not be fetched.
         """
         try:
-            dimensions = cache.get_cached_dimensions(url)
+            width, height = self._resolve_url_dimensions(
+                url, cache=cache, partial=partial, session=session
+            )
+
+            num_tokens = self.cached_image_tokens(
+                model_name=model_name,
+                width=width,
+                height=height,
+                **kwargs
+            )
+            return num_tokens
+        except Exception as err:
+            self._report_url_error(err)
 
-            if dimensions:
-                width, height = dimensions
-            else:
-                response = requests.get(url)
-                response.raise_for_status()
+        return -1
 
-                image_bytes = response.content
-                width, height = get_image_dimensions_from_bytes(image_bytes)
-                cache.cache_dimensions(url, width, height)
+    async def aprocess_image_from_url(
+        self,
+        url: str,
+        model_name: str = None,
+        cache: AsyncImageDimensionCache = None,
+        partial: bool = True,
+        limiter: AsyncHostLimiter = None,
+        client=None,
+        **kwargs
+    ) -> int:
+        """
+        Async variant of process_image_from_url.
 
-            num_tokens = self.calculate_image_tokens(
+        Args:
+            url (str): The URL of the image.
+            model_name (str): The name of the model.
+            cache (AsyncImageDimensionCache): An open async dimension cache.
+            partial (bool): Only download the image header. Defaults to True.
+            limiter (AsyncHostLimiter): Optional limit on concurrent fetches. Cache
+                                        hits do not wait for a slot.
+            client (httpx.AsyncClient): The HTTP client. Defaults to the shared client.
+
+        Returns:
+            int: The number of tokens in the image, or -1 if the image could not be fetched.
+        """
+        try:
+            dimensions = await cache.get_cached_dimensions(url)
+            if not dimensions:
+                dimensions = await self._afetch_url_dimensions(
+                    url, cache=cache, partial=partial, limiter=limiter, client=client
+                )
+            width, height = dimensions
+
+            num_tokens = self.cached_image_tokens(
                 model_name=model_name,
                 width=width,
                 height=height,
                 **kwargs
             )
             return num_tokens
-        except HTTPError as http_err:
-            print(f"HTTP error occurred while fetching image: {http_err}")
-        except RequestException as req_err:
-            print(f"Network error occurred: {req_err}")
         except Exception as err:
-            print(f"An unexpected error occurred: {err}")
+            self._report_url_error(err)
 
         return -1
 
+    @staticmethod
+    async def _afetch_url_dimensions(
+        url: str,
+        cache: AsyncImageDimensionCache,
+        partial: bool = True,
+        limiter: AsyncHostLimiter = None,
+        client=None,
+        metrics: Metrics = NULL_METRICS,
+    ) -> tuple[int, int]:
+        """Fetches the dimensions of a URL known to be a cache miss and caches them."""
+        metrics.count("http_fetches")
+        if limiter:
+            async with limiter.slot(url):
+                with metrics.time("network"):
+                    dimensions = await afetch_image_dimensions(url, client=client, partial=partial)
+        else:
+            with metrics.time("network"):
+                dimensions = await afetch_image_dimensions(url, client=client, partial=partial)
+        if dimensions is None:
+            raise ValueError(f"Could not read image dimensions from {url}")
+        await cache.cache_dimensions(url, *dimensions)
+        return dimensions
+
+    def _resolve_url_dimensions(
+        self,
+        url: str,
+        cache: ImageDimensionCache,
+        partial: bool = True,
+        session: ImageFetchSession = None,
+    ) -> tuple[int, int]:
+        entry = cache.get_cached_entry(url)
+        if entry is not None and not cache.is_stale(entry):
+            return entry.width, entry.height
+
+        conditional = cache.revalidate and entry is not None and entry.has_validators
+        result = fetch_image_info(
+            url,
+            partial=partial,
+            session=session,
+            etag=entry.etag if conditional else None,
+            last_modified=entry.last_modified if conditional else None,
+        )
+        return self._store_fetch_result(cache, url, entry, result)
+
+    @staticmethod
+    def _store_fetch_result(
+        cache: ImageDimensionCache, url: str, entry: UrlEntry, result: ImageFetchResult
+    ) -> tuple[int, int]:
+        if result.not_modified:
+            cache.touch_dimensions(url)
+            return entry.width, entry.height
+        if result.dimensions is None:
+            raise ValueError(f"Could not read image dimensions from {url}")
+        cache.cache_dimensions(url, *result.dimensions, result.etag, result.last_modified)
+        return result.dimensions
+
+    @staticmethod
+    def _report_url_error(err: Exception):
+        from requests.exceptions import HTTPError, RequestException
+
+        if isinstance(err, HTTPError):
+            print(f"HTTP error occurred while fetching image: {err}")
+        elif isinstance(err, RequestException):
+            print(f"Network error occurred: {err}")
+        else:
+            print(f"An unexpected error occurred: {err}")
+
+    def process_images_from_urls(
+        self,
+        urls: list[str],
+        model_name: str = None,
+        cache: ImageDimensionCache = None,
+        max_workers: int = DEFAULT_MAX_WORKERS,
+        max_per_host: int = DEFAULT_MAX_PER_HOST,
+        partial: bool = True,
+        session: ImageFetchSession = None,
+        **kwargs
+    ) -> list[int]:
+        """
+        Process a list of image URLs and calculate the tokens for each one.
+
+        Cached dimensions are resolved first with one bulk lookup; only the misses are
+        fetched, by a bounded thread pool. Stale entries are revalidated with
+        conditional requests when the cache has ``revalidate`` set. The cache is read
+        and written from the calling thread only.
+
+        Args:
+            urls (list[str]): The URLs of the images.
+            model_name (str): The name of the model.
+            cache (ImageDimensionCache): An open dimension cache.
+            max_workers (int): The number of concurrent fetches. 1 or None fetches the
+                               URLs one at a time.
+            max_per_host (int): The maximum number of concurrent fetches per host.
+            partial (bool): Only download the image headers. Defaults to True.
+            session (ImageFetchSession): The HTTP session. Defaults to the shared session.
+
+        Returns:
+            list[int]: The number of tokens for each URL, in input order. Images that
+                       could not be fetched count as -1.
+        """
+        tokens = []
+        for _, dims, _ in self._iter_url_dimensions(
+            urls,
+            cache=cache,
+            max_workers=max_workers,
+            max_per_host=max_per_host,
+            partial=partial,
+            session=session,
+        ):
+            if dims is None:
+                tokens.append(-1)
+                continue
+            tokens.append(
+                self.cached_image_tokens(
+                    model_name=model_name, width=dims[0], height=dims[1], **kwargs
+                )
+            )
+        return tokens
+
+    def _iter_url_dimensions(
+        self,
+        urls: list[str],
+        cache: ImageDimensionCache,
+        max_workers: int = DEFAULT_MAX_WORKERS,
+        max_per_host: int = DEFAULT_MAX_PER_HOST,
+        partial: bool = True,
+        session: ImageFetchSession = None,
+        metrics: Metrics = NULL_METRICS,
+    ) -> Iterator[tuple[str, Optional[tuple[int, int]], Optional[Exception]]]:
+        """Yields (url, dimensions, error) in input order, one batch of URLs at a time."""
+        for start in range(0, len(urls), URL_BATCH_SIZE):
+            batch = urls[start : start + URL_BATCH_SIZE]
+            with metrics.time("sqlite"):
+                entries = cache.get_many_entries(batch)
+            dims_by_url = {
+                url: (entry.width, entry.height)
+                for url, entry in entries.items()
+                if not cache.is_stale(entry)
+            }
+            misses = [url for url in dict.fromkeys(batch) if url not in dims_by_url]
+            metrics.count("cache_hits", len(dims_by_url))
+            metrics.count("cache_misses", len(misses))
+            validators = {}
+            if cache.revalidate:
+                validators = {
+                    url: (entries[url].etag, entries[url].last_modified)
+                    for url in misses
+                    if url in entries and entries[url].has_validators
+                }
+
+            errors_by_url = {}
+            for url, result, err in fetch_dimensions_concurrently(
+                misses,
+                max_workers=max_workers,
+                max_per_host=max_per_host,
+                partial=partial,
+                session=session,
+                validators=validators,
+                metrics=metrics,
+            ):
+                metrics.count("http_fetches")
+                if err is None:
+                    metrics.count("http_bytes", result.bytes_read)
+                    metrics.observe("http_bytes_per_image", result.bytes_read, SIZE_BUCKETS)
+                    try:
+                        with metrics.time("sqlite"):
+                            dims_by_url[url] = self._store_fetch_result(
+                                cache, url, entries.get(url), result
+                            )
+                    except ValueError as value_err:
+                        err = value_err
+                if err is not None:
+                    self._report_url_error(err)
+                    metrics.count("errors")
+                    errors_by_url[url] = err
+
+            for url in batch:
+                yield url, dims_by_url.get(url), errors_by_url.get(url)
+
+    async def _aiter_url_dimensions(
+        self,
+        urls: list[str],
+        cache: AsyncImageDimensionCache,
+        partial: bool = True,
+        limiter: AsyncHostLimiter = None,
+        metrics: Metrics = NULL_METRICS,
+    ) -> AsyncIterator[list[tuple[str, Optional[tuple[int, int]], Optional[Exception]]]]:
+        """Async variant of _iter_url_dimensions; yields the results one batch at a time."""
+        for start in range(0, len(urls), URL_BATCH_SIZE):
+            batch = urls[start : start + URL_BATCH_SIZE]
+            with metrics.time("sqlite"):
+                dims_by_url = await cache.get_many(batch)
+            misses = [url for url in dict.fromkeys(batch) if url not in dims_by_url]
+            metrics.count("cache_hits", len(dims_by_url))
+            metrics.count("cache_misses", len(misses))
+            results = await asyncio.gather(
+                *(
+                    self._afetch_url_dimensions(
+                        url, cache=cache, partial=partial, limiter=limiter, metrics=metrics
+                    )
+                    for url in misses
+                ),
+                return_exceptions=True,
+            )
+
+            errors_by_url = {}
+            for url, result in zip(misses, results):
+                if isinstance(result, Exception):
+                    self._report_url_error(result)
+                    metrics.count("errors")
+                    errors_by_url[url] = result
+                else:
+                    dims_by_url[url] = result
+
+            yield [(url, dims_by_url.get(url), errors_by_url.get(url)) for url in batch]
+
     @abstractmethod
     def calculate_image_tokens(self, name: str, h: int, w: int, config: dict):
         """Calculate token count based on image dimensions and configuration."""
         pass
 
-    def get_token(self, model_name, path, save_to=None, **kwargs):
-        result_dict = {}
-        total_tokens = 0
+    def calculate_image_tokens_batch(self, model_name: str, widths, heights, **kwargs):
+        """
+        Calculate the number of tokens for many images at once.
+
+        This default groups the images by unique (width, height) and computes each
+        group once with cached_image_tokens; models override it with a vectorized
+        implementation that returns the same values.
+
+        Args:
+            model_name (str): The name of the model.
+            widths (array-like): The widths of the images.
+            heights (array-like): The heights of the images.
 
+        Returns:
+            numpy.ndarray: The number of tokens for each image, as int64.
+        """
+        widths, heights = as_dimension_arrays(widths, heights)
+        np = import_numpy()
+        dims = np.stack([widths.ravel(), heights.ravel()], axis=1)
+        unique_dims, inverse = np.unique(dims, axis=0, return_inverse=True)
+        unique_tokens = np.array(
+            [
+                self.cached_image_tokens(
+                    model_name=model_name, width=int(width), height=int(height), **kwargs
+                )
+                for width, height in unique_dims
+            ],
+            dtype=np.int64,
+        )
+        return unique_tokens[inverse.ravel()].reshape(widths.shape)
+
+    @staticmethod
+    def _input_kind(path) -> str:
         if check_if_path_is_file(path=path):
-            num_tokens = self.process_image(path=path, model_name=model_name, **kwargs)
-            total_tokens = num_tokens
-            result_dict[str(path)] = total_tokens
-
-        elif check_if_path_is_folder(path=path):
-            image_files = list_all_images(path=path)
-            for image_path in tqdm.tqdm(image_files):
-                num_tokens = self.process_image(path=image_path, model_name=model_name, **kwargs)
-                total_tokens += num_tokens
-                result_dict[str(image_path)] = num_tokens
-
-        elif is_url(path=path):
-            with ImageDimensionCache() as cache:
-                num_tokens = self.process_image_from_url(url=path, model_name=model_name, cache=cache, **kwargs)
-            total_tokens = num_tokens
-            result_dict[path] = total_tokens
+            return "file"
+        if check_if_path_is_folder(path=path):
+            return "folder"
+        if is_url(path=path):
+            return "url"
+        if is_multiple_urls(urls=path):
+            return "urls"
+        raise ValueError(f"Invalid input path or URL: '{path}'.")
 
-        elif is_multiple_urls(urls=path):
-            with ImageDimensionCache() as cache:
-                for url in path:
-                    num_tokens = self.process_image_from_url(url=url, model_name=model_name, cache=cache, **kwargs)
-                    total_tokens += num_tokens
-                    result_dict[url] = num_tokens
+    def iter_dimensions(
+        self,
+        path,
+        max_workers: int = None,
+        max_per_host: int = DEFAULT_MAX_PER_HOST,
+        workers: int = None,
+        executor: str = "process",
+        file_cache: bool = False,
+        revalidate_after: float = None,
+        cache_path: str = None,
+        partial: bool = True,
+        session: ImageFetchSession = None,
+        skip: Container[str] = None,
+        metrics: Metrics = None,
+        record_file_errors: bool = False,
+    ) -> Iterator[tuple[str, Optional[tuple[int, int]], Optional[Exception]]]:
+        """
+        Resolves the dimensions of an image, a folder, a URL or a list of URLs lazily.
 
-        else:
-            raise ValueError(f"Invalid input path or URL: '{path}'.")
+        The input is validated immediately; images are read or fetched as the
+        iterator is consumed. Sources in ``skip`` are left out without being read or
+        fetched. See get_token for the other options.
+
+        Args:
+            record_file_errors (bool): Report unreadable local files like failed URLs,
+                                       with their exception, instead of raising.
+
+        Raises:
+            ValueError: If the path is neither a file, a folder, a URL nor a list of URLs.
+
+        Returns:
+            Iterator[tuple]: (source, (width, height) or None, exception or None) for
+                             every image. Unless ``record_file_errors`` is set, only
+                             URLs produce errors; unreadable local files raise.
+        """
+        kind = self._input_kind(path)
+        url_cache_options = {"path": cache_path}
+        if revalidate_after is not None:
+            url_cache_options.update(ttl=revalidate_after, revalidate=True)
+
+        skip = skip or ()
+        metrics = metrics or NULL_METRICS
+
+        if kind == "file":
+            return self._iter_file_dimensions(path, skip, metrics, record_file_errors)
+        if kind == "folder":
+            return self._iter_folder_dimensions(
+                path, workers, executor, file_cache, cache_path, skip, metrics, record_file_errors
+            )
+        urls = [path] if kind == "url" else path
+        return self._iter_urls_dimensions(
+            [url for url in urls if url not in skip] if skip else urls,
+            url_cache_options,
+            max_workers=max_workers,
+            max_per_host=max_per_host,
+            partial=partial,
+            session=session,
+            metrics=metrics,
+        )
+
+    @staticmethod
+    def _iter_file_dimensions(path, skip, metrics, record_errors):
+        if str(path) in skip:
+            return
+        check_allowed_extensions(path=path)
+        metrics.count("files_seen")
+        try:
+            with metrics.time("header_decode"):
+                dims = read_image_dims(path=path)
+        except Exception as err:
+            if not record_errors:
+                raise
+            metrics.count("errors")
+            yield str(path), None, err
+            return
+        yield str(path), dims, None
+
+    @staticmethod
+    def _iter_folder_dimensions(
+        path, workers, executor, file_cache, cache_path, skip, metrics, record_errors
+    ):
+        with ExitStack() as stack:
+            cache = None
+            if file_cache:
+                cache = stack.enter_context(ImageDimensionCache(path=cache_path))
+            for image_path, width, height in iter_folder_dims(
+                path,
+                workers=workers,
+                executor=executor,
+                cache=cache,
+                skip=skip,
+                metrics=metrics,
+                record_errors=record_errors,
+            ):
+                if width is None:
+                    # An unreadable file, recorded with its exception in place of the height.
+                    yield str(image_path), None, height
+                else:
+                    yield str(image_path), (width, height), None
+
+    def _iter_urls_dimensions(self, urls, url_cache_options, **fetch_options):
+        with ImageDimensionCache(**url_cache_options) as cache:
+            yield from self._iter_url_dimensions(urls, cache=cache, **fetch_options)
+
+    def iter_tokens(
+        self,
+        model_name,
+        path,
+        max_workers: int = None,
+        max_per_host: int = DEFAULT_MAX_PER_HOST,
+        workers: int = None,
+        executor: str = "process",
+        file_cache: bool = False,
+        revalidate_after: float = None,
+        cache_path: str = None,
+        partial: bool = True,
+        session: ImageFetchSession = None,
+        skip: Container[str] = None,
+        metrics: Metrics = None,
+        **kwargs
+    ) -> Iterator[TokenRecord]:
+        """
+        Yields the token count of every image as soon as it is computed.
+
+        Nothing is accumulated, so memory stays constant for arbitrarily large folders
+        and URL lists. Folder images are yielded in scan order and URLs in input order.
+        See get_token for the options.
+
+        Args:
+            model_name (str): The name of the model.
+            path (str | Path | list[str]): The input image(s).
+
+        Raises:
+            ValueError: If the path is neither a file, a folder, a URL nor a list of URLs.
+
+        Returns:
+            Iterator[TokenRecord]: (source, width, height, tokens, error) per image.
+        """
+        dimensions = self.iter_dimensions(
+            path,
+            max_workers=max_workers,
+            max_per_host=max_per_host,
+            workers=workers,
+            executor=executor,
+            file_cache=file_cache,
+            revalidate_after=revalidate_after,
+            cache_path=cache_path,
+            partial=partial,
+            session=session,
+            skip=skip,
+            metrics=metrics,
+        )
+        return self._iter_token_records(model_name, dimensions, metrics=metrics, **kwargs)
+
+    def _iter_token_records(self, model_name, dimensions, metrics: Metrics = None, **kwargs):
+        metrics = metrics or NULL_METRICS
+        image_tokens = metrics.timed("token_math", self.cached_image_tokens)
+        images = 0
+        try:
+            for source, dims, err in dimensions:
+                images += 1
+                if dims is None:
+                    error = str(err) if err is not None else "Could not read image dimensions"
+                    yield TokenRecord(source, None, None, -1, error)
+                    continue
+                num_tokens = image_tokens(
+                    model_name=model_name, width=dims[0], height=dims[1], **kwargs
+                )
+                yield TokenRecord(source, dims[0], dims[1], num_tokens)
+        finally:
+            metrics.count("images", images)
+
+    def get_token(
+        self,
+        model_name,
+        path,
+        save_to=None,
+        max_workers: int = None,
+        max_per_host: int = DEFAULT_MAX_PER_HOST,
+        workers: int = None,
+        executor: str = "process",
+        file_cache: bool = False,
+        revalidate_after: float = None,
+        cache_path: str = None,
+        partial: bool = True,
+        session: ImageFetchSession = None,
+        save_format: str = None,
+        resume: bool = False,
+        metrics: Metrics = None,
+        **kwargs
+    ):
+        """
+        Calculate the total number of tokens for an image, a folder, a URL or a list of URLs.
+
+        Args:
+            model_name (str): The name of the model.
+            path (str | Path | list[str]): The input image(s).
+            save_to (str): The path to save the per-image token counts to. ``.ndjson`` /
+                           ``.jsonl`` and ``.csv`` files are written incrementally, one
+                           record per image; other files get a ``{source: tokens}``
+                           JSON object at the end of the run.
+            max_workers (int): For a list of URLs, the number of concurrent fetches.
+                               Defaults to None (one URL at a time).
+            max_per_host (int): For a list of URLs, the maximum number of concurrent
+                                fetches per host.
+            workers (int): For a folder, the number of workers reading image headers.
+                           Defaults to None (serial).
+            executor (str): For a folder, "process" or "thread" workers.
+            file_cache (bool): For a folder, cache the dimensions of local files keyed by
+                               path, size, mtime and inode, so unchanged files are not
+                               read again on the next run. Defaults to False.
+            revalidate_after (float): For URLs, revalidate cached dimensions older than
+                                      this many seconds with a conditional request
+                                      (ETag / Last-Modified). Defaults to None (cached
+                                      dimensions are trusted forever).
+            cache_path (str): The dimension cache database used for URLs and
+                              ``file_cache``, or ``":memory:"``. Defaults to
+                              ``$IMAGE_CACHE_DIR`` or ``~/.image_cache``.
+            partial (bool): For URLs, only download the image headers. Defaults to True.
+            session (ImageFetchSession): For URLs, the HTTP session. Defaults to the
+                                         shared session.
+            save_format (str): "json", "ndjson" or "csv". Defaults to the format implied
+                               by the extension of ``save_to``.
+            resume (bool): Skip images already present in ``save_to`` and append the
+                           others. Their tokens still count towards the total.
+            metrics (Metrics): Records per-stage timings, counters and histograms of
+                               the run. Defaults to None (nothing is recorded).
+
+        Returns:
+            int: The total number of tokens.
+        """
+        self._input_kind(path)
+        metrics = metrics or NULL_METRICS
+        with ExitStack() as stack:
+            stack.enter_context(metrics.time("total"))
+            sink = None
+            if save_to:
+                sink = stack.enter_context(open_sink(save_to, format=save_format, resume=resume))
+            completed = sink.completed if sink is not None else {}
+            total_tokens = sum(completed.values())
+
+            records = self.iter_tokens(
+                model_name,
+                path,
+                max_workers=max_workers,
+                max_per_host=max_per_host,
+                workers=workers,
+                executor=executor,
+                file_cache=file_cache,
+                revalidate_after=revalidate_after,
+                cache_path=cache_path,
+                partial=partial,
+                session=session,
+                skip=completed,
+                metrics=metrics,
+                **kwargs
+            )
+            if check_if_path_is_folder(path=path):
+                records = tqdm.tqdm(records)
 
-        if save_to:
-            with open(save_to, "w") as f:
-                json.dump(result_dict, f, indent=4)
+            for record in records:
+                total_tokens += record.tokens
+                if sink is not None:
+                    sink.write(record)
 
         return total_tokens
 
+    async def aget_token(
+        self,
+        model_name,
+        path,
+        save_to=None,
+        max_concurrency: int = DEFAULT_MAX_CONCURRENCY,
+        max_per_host: int = DEFAULT_MAX_PER_HOST,
+        cache_path: str = None,
+        partial: bool = True,
+        save_format: str = None,
+        resume: bool = False,
+        metrics: Metrics = None,
+        **kwargs
+    ):
+        """
+        Async variant of get_token.
+
+        URLs are fetched on the event loop with the shared async HTTP client; files and
+        folders are processed by get_token on a worker thread.
+
+        Args:
+            model_name (str): The name of the model.
+            path (str | Path | list[str]): The input image(s).
+            save_to (str): The path to save the per-image token counts to.
+            max_concurrency (int): The maximum number of concurrent URL fetches.
+            max_per_host (int): The maximum number of concurrent fetches per host.
+            cache_path (str): The dimension cache database. See get_token.
+            partial (bool): Only download the image headers. Defaults to True.
+            save_format (str): "json", "ndjson" or "csv". See get_token.
+            resume (bool): Skip images already present in ``save_to``. See get_token.
+            metrics (Metrics): Records per-stage timings and counters. See get_token.
+
+        Returns:
+            int: The total number of tokens.
+        """
+        if is_url(path=path):
+            urls = [path]
+        elif is_multiple_urls(urls=path):
+            urls = list(path)
+        else:
+            return await asyncio.to_thread(
+                self.get_token,
+                model_name=model_name,
+                path=path,
+                save_to=save_to,
+                cache_path=cache_path,
+                save_format=save_format,
+                resume=resume,
+                metrics=metrics,
+                **kwargs
+            )
 
+        metrics = metrics or NULL_METRICS
+        limiter = AsyncHostLimiter(
+            max_concurrency=max_concurrency, max_per_host=max_per_host
+        )
+        with ExitStack() as stack:
+            sink = None
+            if save_to:
+                sink = stack.enter_context(open_sink(save_to, format=save_format, resume=resume))
+            completed = sink.completed if sink is not None else {}
+            total_tokens = sum(completed.values())
+            urls = [url for url in urls if url not in completed]
+
+            async with AsyncImageDimensionCache(path=cache_path) as cache:
+                async for dimensions in self._aiter_url_dimensions(
+                    urls, cache=cache, partial=partial, limiter=limiter, metrics=metrics
+                ):
+                    for record in self._iter_token_records(
+                        model_name, dimensions, metrics=metrics, **kwargs
+                    ):
+                        total_tokens += record.tokens
+                        if sink is not None:
+                            sink.write(record)
+
+        return total_tokens
 
     @abstractmethod
     def calculate_cost(self, input_token: int, ouput_tokens: int, config: dict):
@@ -137,6 +829,7 @@ class VisionModel(ABC):
         approx_output_tokens: int,
         path: Path | str,
         save_to: str = None,
+        **kwargs
     ):
         """
         Calculate and return the estimated cost of generating text from an image or directory of images.
@@ -149,6 +842,8 @@ class VisionModel(ABC):
             save_to (str): The path to save the output to.
             prefix_tokens (int): The number of prefix tokens to use. Defaults to 9.
             input_modality (str): The modality of the input for Gemini models.
+            max_workers (int): For a list of URLs, the number of concurrent fetches.
+            metrics (Metrics): Records per-stage timings and counters. See get_token.
 
         Returns:
             float: The estimated cost in dollars.
@@ -157,6 +852,36 @@ class VisionModel(ABC):
             model_name=model_name,
             path=path,
             save_to=save_to,
+            **kwargs
+        )
+
+        cost = self.calculate_cost(
+            model_name=model_name,
+            input_tokens=total_input_tokens,
+            output_tokens=approx_output_tokens,
+        )
+        return cost
+
+    async def aget_cost(
+        self,
+        model_name: str,
+        system_prompt_tokens: int,
+        approx_output_tokens: int,
+        path: Path | str,
+        save_to: str = None,
+        **kwargs
+    ):
+        """
+        Async variant of get_cost.
+
+        Returns:
+            float: The estimated cost in dollars.
+        """
+        total_input_tokens = system_prompt_tokens + await self.aget_token(
+            model_name=model_name,
+            path=path,
+            save_to=save_to,
+            **kwargs
         )
 
         cost = self.calculate_cost(
@@ -0,0 +1,419 @@
+"""Estimate image tokens and cost from the command line.
+
+Usage:
+    image-token -m gpt-4.1-mini images/
+    image-token -m gpt-4o -m gemini-2.5-flash --format ndjson --urls urls.txt
+    find /data -name '*.png' | image-token -m gpt-4.1-mini --format csv > tokens.csv
+    image-token -m gpt-4o --jsonl batch_requests.jsonl --system-prompt-tokens 300
+
+Inputs are image files, folders and URLs, files with one path or URL per line
+(``--urls``, ``-`` for stdin), and JSONL request files (``--jsonl``). A JSONL line is
+either ``{"path": ...}`` / ``{"url": ...}`` or a chat request in the OpenAI batch format,
+whose ``image_url`` parts (URLs or base64 data URLs) are priced.
+
+Results are streamed as they are computed: a table, or one NDJSON / CSV record per
+image and model. A summary with the total tokens and cost per model follows on stdout
+for the table and on stderr otherwise. The exit status is 1 if any image failed.
+"""
+import argparse
+import base64
+import contextlib
+import csv
+import json
+import sys
+import time
+
+FORMATS = ("table", "ndjson", "csv")
+RECORD_FIELDS = ["source", "model", "width", "height", "tokens", "error"]
+
+# URLs read from lists or stdin are fetched in batches of this size, so output starts
+# before a long list has been read to the end.
+URL_CHUNK_SIZE = 10_000
+
+# Streamed output is flushed at least this often, in seconds.
+FLUSH_INTERVAL = 1.0
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        prog="image-token",
+        description="Estimate image tokens and cost for files, folders, URLs and JSONL request files.",
+        epilog="Paths and URLs are read from stdin when no input is given.",
+    )
+    parser.add_argument(
+        "inputs", nargs="*", help="image files, folders or URLs; '-' reads stdin"
+    )
+    parser.add_argument(
+        "-m",
+        "--model",
+        dest="models",
+        action="append",
+        default=[],
+        help="model to price with; repeat it or separate models with commas",
+    )
+    parser.add_argument(
+        "--urls",
+        action="append",
+        default=[],
+        metavar="FILE",
+        help="file with one path or URL per line ('-' for stdin)",
+    )
+    parser.add_argument(
+        "--jsonl", action="append", default=[], metavar="FILE", help="JSONL request file"
+    )
+    parser.add_argument(
+        "--format",
+        choices=FORMATS,
+        help="output format; defaults to the --output extension, else table",
+    )
+    parser.add_argument("-o", "--output", help="write the records to this file")
+
+    fetching = parser.add_argument_group("reading and fetching")
+    fetching.add_argument("--workers", type=int, help="workers reading folder images")
+    fetching.add_argument("--executor", choices=("process", "thread"), default="process")
+    fetching.add_argument(
+        "--max-workers", type=int, default=16, help="concurrent URL fetches (default: 16)"
+    )
+    fetching.add_argument("--max-per-host", type=int, help="concurrent URL fetches per host")
+    fetching.add_argument(
+        "--full-download",
+        action="store_true",
+        help="download whole images instead of their headers",
+    )
+
+    caching = parser.add_argument_group("caching")
+    caching.add_argument(
+        "--cache",
+        dest="cache_path",
+        metavar="PATH",
+        help="dimension cache database, or ':memory:' (default: ~/.image_cache)",
+    )
+    caching.add_argument(
+        "--file-cache", action="store_true", help="cache dimensions of local files in folders"
+    )
+    caching.add_argument(
+        "--revalidate-after",
+        type=float,
+        metavar="SECONDS",
+        help="revalidate cached URL dimensions older than this",
+    )
+
+    pricing = parser.add_argument_group("pricing")
+    pricing.add_argument(
+        "--prefix-tokens", type=int, help="prefix tokens per image for OpenAI models"
+    )
+    pricing.add_argument(
+        "--system-prompt-tokens", type=int, default=0, help="system prompt tokens in the cost"
+    )
+    pricing.add_argument(
+        "--output-tokens", type=int, default=0, help="approximate output tokens in the cost"
+    )
+    parser.add_argument(
+        "--list-models", action="store_true", help="list the supported models and exit"
+    )
+    return parser
+
+
+def _clean_lines(lines):
+    # Lines are numbered before blank lines and comments are dropped.
+    for line_number, line in enumerate(lines, 1):
+        line = line.strip()
+        if line and not line.startswith("#"):
+            yield line_number, line
+
+
+def _read_numbered_lines(path: str):
+    if path == "-":
+        yield from _clean_lines(sys.stdin)
+        return
+    with open(path) as f:
+        yield from _clean_lines(f)
+
+
+def _read_lines(path: str):
+    for _, line in _read_numbered_lines(path):
+        yield line
+
+
+def _iter_request_images(request: dict):
+    # Chat completions ("image_url") and responses ("input_image") content parts.
+    body = request.get("body", request)
+    for message in body.get("messages", body.get("input", [])) or []:
+        content = message.get("content") if isinstance(message, dict) else None
+        if not isinstance(content, list):
+            continue
+        for part in content:
+            if not isinstance(part, dict) or part.get("type") not in ("image_url", "input_image"):
+                continue
+            image_url = part.get("image_url")
+            if isinstance(image_url, dict):
+                image_url = image_url.get("url")
+            if image_url:
+                yield image_url
+
+
+def _data_url_dimensions(data_url: str):
+    from image_token.utils.utils import get_image_dimensions_from_bytes
+
+    try:
+        dims = get_image_dimensions_from_bytes(base64.b64decode(data_url.partition(",")[2]))
+    except ValueError as err:
+        return None, err
+    if dims is None:
+        return None, ValueError("Could not read image dimensions")
+    return dims, None
+
+
+def _iter_jsonl_sources(path: str):
+    for line_number, line in _read_numbered_lines(path):
+        label = f"{path}:{line_number}"
+        try:
+            request = json.loads(line)
+        except json.JSONDecodeError as err:
+            yield "resolved", (label, None, err)
+            continue
+        if not isinstance(request, dict):
+            yield "resolved", (label, None, ValueError("Expected a JSON object"))
+            continue
+        for key in ("path", "url", "source"):
+            if isinstance(request.get(key), str):
+                yield "source", request[key]
+                break
+        else:
+            label = request.get("custom_id") or label
+            for index, image_url in enumerate(_iter_request_images(request)):
+                if image_url.startswith("data:"):
+                    dims, err = _data_url_dimensions(image_url)
+                    yield "resolved", (f"{label}#{index}", dims, err)
+                else:
+                    yield "source", image_url
+
+
+def iter_sources(args):
+    """Yields ("source", path or URL) and ("resolved", (label, dims, error)) items in input order."""
+    inputs = list(args.inputs)
+    if not inputs and not args.urls and not args.jsonl:
+        inputs = ["-"]
+    for item in inputs:
+        if item == "-":
+            for line in _read_lines("-"):
+                yield "source", line
+        else:
+            yield "source", item
+    for path in args.urls:
+        for line in _read_lines(path):
+            yield "source", line
+    for path in args.jsonl:
+        yield from _iter_jsonl_sources(path)
+
+
+def iter_dimensions(args, sources):
+    """Resolves the dimensions of every source, fetching consecutive URLs together."""
+    from image_token.models.registry import get_model
+    from image_token.utils.validate import is_url
+
+    model = get_model(args.models[0])
+    options = {
+        "max_workers": args.max_workers,
+        "workers": args.workers,
+        "executor": args.executor,
+        "file_cache": args.file_cache,
+        "revalidate_after": args.revalidate_after,
+        "cache_path": args.cache_path,
+        "partial": not args.full_download,
+        "record_file_errors": True,
+    }
+    if args.max_per_host is not None:
+        options["max_per_host"] = args.max_per_host
+
+    urls = []
+    for kind, value in sources:
+        if kind == "source" and is_url(value):
+            urls.append(value)
+            if len(urls) >= URL_CHUNK_SIZE:
+                yield from model.iter_dimensions(urls, **options)
+                urls = []
+            continue
+        if urls:
+            yield from model.iter_dimensions(urls, **options)
+            urls = []
+        if kind == "resolved":
+            yield value
+            continue
+        try:
+            yield from model.iter_dimensions(value, **options)
+        except (ValueError, OSError) as err:
+            yield value, None, err
+    if urls:
+        yield from model.iter_dimensions(urls, **options)
+
+
+class _Writer:
+    def __init__(self, stream, models):
+        self.stream = stream
+        self.models = models
+        self._last_flush = time.monotonic()
+
+    def write(self, source, dims, tokens, error):
+        self._write(source, dims, tokens, error)
+        if time.monotonic() - self._last_flush >= FLUSH_INTERVAL:
+            self.stream.flush()
+            self._last_flush = time.monotonic()
+
+    def _write(self, source, dims, tokens, error):
+        raise NotImplementedError
+
+
+class TableWriter(_Writer):
+    """One row per image with a token column per model."""
+
+    def __init__(self, stream, models):
+        super().__init__(stream, models)
+        self._widths = [max(len(model), 8) for model in models]
+        header = ["WIDTH".rjust(6), "HEIGHT".rjust(6)]
+        header += [model.rjust(width) for model, width in zip(models, self._widths)]
+        self.stream.write("  ".join(header + ["SOURCE"]) + "\n")
+
+    def _write(self, source, dims, tokens, error):
+        width, height = dims if dims is not None else ("-", "-")
+        row = [str(width).rjust(6), str(height).rjust(6)]
+        for model, column_width in zip(self.models, self._widths):
+            row.append(str(tokens[model] if error is None else "-").rjust(column_width))
+        row.append(source if error is None else f"{source}  ERROR: {error}")
+        self.stream.write("  ".join(row) + "\n")
+
+
+class NdjsonWriter(_Writer):
+    """One JSON object per image and model."""
+
+    def _write(self, source, dims, tokens, error):
+        width, height = dims if dims is not None else (None, None)
+        for model in self.models:
+            record = [source, model, width, height, tokens.get(model, -1), error]
+            self.stream.write(json.dumps(dict(zip(RECORD_FIELDS, record))) + "\n")
+
+
+class CsvWriter(_Writer):
+    """One CSV row per image and model."""
+
+    def __init__(self, stream, models):
+        super().__init__(stream, models)
+        self._writer = csv.writer(stream)
+        self._writer.writerow(RECORD_FIELDS)
+
+    def _write(self, source, dims, tokens, error):
+        width, height = dims if dims is not None else ("", "")
+        for model in self.models:
+            self._writer.writerow(
+                [source, model, width, height, tokens.get(model, -1), error or ""]
+            )
+
+
+WRITERS = {"table": TableWriter, "ndjson": NdjsonWriter, "csv": CsvWriter}
+
+
+def write_summary(stream, models, totals, num_images, num_errors, args):
+    from image_token.models.registry import get_calculator
+
+    stream.write(f"\n{num_images} images, {num_errors} failed\n")
+    name_width = max(len(model) for model in models)
+    stream.write(f"{'MODEL'.ljust(name_width)}  {'TOKENS'.rjust(12)}  {'COST ($)'.rjust(12)}\n")
+    for model in models:
+        cost = get_calculator(model).cost(
+            args.system_prompt_tokens + totals[model], args.output_tokens
+        )
+        stream.write(f"{model.ljust(name_width)}  {totals[model]:12d}  {cost:12.6f}\n")
+
+
+def _parse_models(parser, args):
+    from image_token.models.registry import get_calculator
+
+    models = [model.strip() for value in args.models for model in value.split(",") if model.strip()]
+    if not models:
+        parser.error("at least one model is required (-m/--model); see --list-models")
+    for model in models:
+        try:
+            get_calculator(model)
+        except ValueError as err:
+            parser.error(str(err))
+    return list(dict.fromkeys(models))
+
+
+def _output_format(args):
+    if args.format:
+        return args.format
+    if args.output:
+        from image_token.utils.sinks import infer_format
+
+        output_format = infer_format(args.output)
+        return output_format if output_format in WRITERS else "table"
+    return "table"
+
+
+def run(args, out) -> int:
+    """Streams the records of every input to ``out`` and returns the exit status."""
+    from image_token.models.registry import get_model
+
+    token_kwargs = {}
+    if args.prefix_tokens is not None:
+        token_kwargs["prefix_tokens"] = args.prefix_tokens
+    instances = {model: get_model(model) for model in args.models}
+    totals = dict.fromkeys(args.models, 0)
+    num_images = num_errors = 0
+
+    output_format = _output_format(args)
+    writer = WRITERS[output_format](out, args.models)
+    summary = out if output_format == "table" else sys.stderr
+
+    # URL errors are reported with print(); keep them off the record stream.
+    with contextlib.redirect_stdout(sys.stderr):
+        for source, dims, err in iter_dimensions(args, iter_sources(args)):
+            num_images += 1
+            tokens = {}
+            error = None
+            if dims is None:
+                num_errors += 1
+                error = str(err) if err is not None else "Could not read image dimensions"
+            else:
+                for model, instance in instances.items():
+                    tokens[model] = instance.cached_image_tokens(
+                        model_name=model, width=dims[0], height=dims[1], **token_kwargs
+                    )
+                    totals[model] += tokens[model]
+            writer.write(str(source), dims, tokens, error)
+
+    out.flush()
+    write_summary(summary, args.models, totals, num_images, num_errors, args)
+    summary.flush()
+    return 1 if num_errors else 0
+
+
+def main(argv=None) -> int:
+    parser = build_parser()
+    args = parser.parse_args(argv)
+
+    try:
+        if args.list_models:
+            from image_token.models.registry import registered_models
+
+            print("\n".join(registered_models()))
+            return 0
+
+        args.models = _parse_models(parser, args)
+        if not args.inputs and not args.urls and not args.jsonl and sys.stdin.isatty():
+            parser.error("no inputs given")
+
+        if args.output:
+            with open(args.output, "w", newline="") as out:
+                return run(args, out)
+        return run(args, sys.stdout)
+    except BrokenPipeError:
+        # The reader went away (e.g. piped into head); exit quietly.
+        sys.stdout = None
+        return 1
+    except KeyboardInterrupt:
+        return 130
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -10,6 +10,7 @@ from image_token.models.openai_helper import OpenAiModel
 from image_token.utils.config import openai_config
 from urllib.parse import urlparse
 from image_token.utils.caching_utils import ImageDimensionCache
+from image_token.utils.http_utils import ImageFetchSession
 
 
 from dotenv import load_dotenv
@@ -20,12 +21,13 @@ load_dotenv()
 class LoggingHandler(BaseCallbackHandler):
 
     model = None
-    def __init__(self):
+    def __init__(self, session: ImageFetchSession = None):
         super().__init__()
         self.total_tokens = 0
         self.total_cost = 0.0
         self.prefix_tokens = 13
         self.model = OpenAiModel()
+        self.session = session
         
 
     def _get_model_name(self, kwargs):
@@ -48,7 +50,7 @@ class LoggingHandler(BaseCallbackHandler):
             return None
         with ImageDimensionCache() as cache:
             return self.model.process_image_from_url(
-                url, model_name=model_name, cache=cache
+                url, model_name=model_name, cache=cache, session=self.session
             )
 
     def _calculate_image_tokens(self, model_name, width, height):
@@ -1,7 +1,22 @@
-from image_token.models.openai_helper import OpenAiModel
-from image_token.models.gemini_helper import GeminiModel
-from image_token.utils.config import openai_config , gemini_config
+from image_token.models.registry import get_model
 from pathlib import Path
+import tqdm
+from image_token.utils.validate import check_if_path_is_folder
+
+# get_token options that control how dimensions are resolved; all other keyword
+# arguments are passed to calculate_image_tokens.
+DIMENSION_OPTIONS = (
+    "max_workers",
+    "max_per_host",
+    "workers",
+    "executor",
+    "file_cache",
+    "revalidate_after",
+    "cache_path",
+    "partial",
+    "session",
+    "metrics",
+)
 
 _current_model = None
 
@@ -10,17 +25,17 @@ def set_model(name: str):
     _current_model = name.lower()
 
 def _get_model(model_name):
-    if model_name in openai_config:
-        return OpenAiModel()
-    elif model_name in gemini_config:
-        return GeminiModel()
-    else:
-        raise ValueError(f"Unsupported model: {_current_model}")
+    # Models are resolved once through the registry and shared across calls.
+    return get_model(model_name)
 
 def get_token(model_name: str, path: str|Path, save_to: str = None , **kwargs):
     model = _get_model(model_name)
     return model.get_token(model_name=model_name , path = path , save_to=save_to , **kwargs)
 
+def iter_tokens(model_name: str, path: str|Path, **kwargs):
+    model = _get_model(model_name)
+    return model.iter_tokens(model_name=model_name , path = path , **kwargs)
+
 def get_cost(model_name: str,system_prompt_tokens: int,approx_output_tokens: int,path: Path | str,save_to: str = None, **kwargs):
     model = _get_model(model_name)
     return model.get_cost(
@@ -31,3 +46,92 @@ def get_cost(model_name: str,system_prompt_tokens: int,approx_output_tokens: int
         save_to,
         **kwargs
     )
+
+def calculate_image_tokens_batch(model_name: str, widths, heights, **kwargs):
+    model = _get_model(model_name)
+    return model.calculate_image_tokens_batch(model_name, widths, heights, **kwargs)
+
+async def aget_token(model_name: str, path: str|Path, save_to: str = None , **kwargs):
+    model = _get_model(model_name)
+    return await model.aget_token(model_name=model_name , path = path , save_to=save_to , **kwargs)
+
+async def aget_cost(model_name: str,system_prompt_tokens: int,approx_output_tokens: int,path: Path | str,save_to: str = None, **kwargs):
+    model = _get_model(model_name)
+    return await model.aget_cost(
+        model_name,
+        system_prompt_tokens,
+        approx_output_tokens,
+        path,
+        save_to,
+        **kwargs
+    )
+
+def get_token_multi(models: list[str], path: str|Path, **kwargs):
+    """
+    Calculate the total number of tokens of the same input for several models.
+
+    Each image is read or downloaded once; its dimensions are then priced by every
+    requested model, OpenAI and Gemini alike.
+
+    Args:
+        models (list[str]): The names of the models.
+        path (str | Path | list[str]): The input image(s).
+        **kwargs: get_token options (e.g. ``max_workers``, ``workers``, ``file_cache``)
+                  and token options (e.g. ``prefix_tokens``).
+
+    Raises:
+        ValueError: If a model is not supported or the path is invalid.
+
+    Returns:
+        dict[str, int]: The total number of tokens per model, in the order given.
+    """
+    instances = {model_name: _get_model(model_name) for model_name in models}
+    options = {key: kwargs.pop(key) for key in DIMENSION_OPTIONS if key in kwargs}
+    totals = dict.fromkeys(instances, 0)
+    if not instances:
+        return totals
+
+    dimensions = next(iter(instances.values())).iter_dimensions(path, **options)
+    if check_if_path_is_folder(path=path):
+        dimensions = tqdm.tqdm(dimensions)
+
+    for _, dims, _ in dimensions:
+        for model_name, model in instances.items():
+            if dims is None:
+                totals[model_name] += -1
+                continue
+            totals[model_name] += model.cached_image_tokens(
+                model_name=model_name, width=dims[0], height=dims[1], **kwargs
+            )
+    return totals
+
+def compare_cost(models: list[str], system_prompt_tokens: int, approx_output_tokens: int, path: Path | str, **kwargs):
+    """
+    Estimate the cost of the same input for several models in a single pass.
+
+    Args:
+        models (list[str]): The names of the models.
+        system_prompt_tokens (int): The number of tokens in the system prompt.
+        approx_output_tokens (int): The approximate number of tokens in the output.
+        path (str | Path | list[str]): The input image(s).
+        **kwargs: Options passed to get_token_multi.
+
+    Returns:
+        dict[str, dict]: Per model, ``image_tokens``, ``input_tokens``,
+                         ``output_tokens`` and ``cost`` in dollars.
+    """
+    image_tokens = get_token_multi(models, path, **kwargs)
+    breakdown = {}
+    for model_name, num_tokens in image_tokens.items():
+        input_tokens = system_prompt_tokens + num_tokens
+        breakdown[model_name] = {
+            "image_tokens": num_tokens,
+            "input_tokens": input_tokens,
+            "output_tokens": approx_output_tokens,
+            "cost": _get_model(model_name).calculate_cost(
+                model_name=model_name,
+                input_tokens=input_tokens,
+                output_tokens=approx_output_tokens,
+            ),
+        }
+    return breakdown
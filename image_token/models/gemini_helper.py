@@ -1,11 +1,13 @@
 from image_token.base.base import VisionModel
 from image_token.utils.config import gemini_config
 import math
+from image_token.utils.array_utils import as_dimension_arrays, import_numpy
+from image_token.models.registry import ModelCalculator, get_calculator
 
 
 class GeminiModel(VisionModel):
 
-    def calculate_image_tokens(self, model_name: str, width: int, height: int):
+    def calculate_image_tokens(self, model_name: str, width: int, height: int, **kwargs):
         """Calculate the number of image tokens for Gemini models.
 
         This function calculates the number of image tokens required for Gemini models based on the image dimensions and model version.
@@ -25,25 +27,23 @@ class GeminiModel(VisionModel):
                 - Otherwise, the image is divided into tiles, and 258 tokens are added per tile.
                 - The tile size is determined by the smaller side of the image, with a minimum of 256 and a maximum of 768.
         """
+        return _gemini_calculator(model_name).image_tokens(width, height, **kwargs)
 
-        num_tokens = 0
-        model_version = model_name.split("-")[1]
-        if model_version != "2.0":
-            num_tokens += 258
-        else:
-            if width <= 384 and height <= 384:
-                num_tokens += 258
+    def calculate_image_tokens_batch(self, model_name: str, widths, heights, **kwargs):
+        """Calculate the number of image tokens for many images at once.
 
-            smaller_side = min(width, height)
-            tile_size = min(max(smaller_side / 1.5, 256), 768)
+        Vectorized with NumPy; returns exactly what calculate_image_tokens returns
+        for each (width, height) pair.
 
-            tiles_w = math.ceil(width / tile_size)
-            tiles_h = math.ceil(height / tile_size)
-
-            total_tiles = tiles_w * tiles_h + 1
-            num_tokens += total_tiles * 258
+        Args:
+            model_name (str): The name of the Gemini model (e.g., "gemini-2.0-flash").
+            widths (array-like): The widths of the images.
+            heights (array-like): The heights of the images.
 
-        return num_tokens
+        Returns:
+            numpy.ndarray: The estimated number of image tokens for each image, as int64.
+        """
+        return _gemini_calculator(model_name).image_tokens_batch(widths, heights, **kwargs)
 
     def calculate_cost(
         self,
@@ -62,24 +62,98 @@ class GeminiModel(VisionModel):
         Returns:
             float: The estimated cost in dollars.
         """
-        model_config = gemini_config[model_name]
-        tier = None
-        for t in model_config["pricing_tiers"]:
-            if input_tokens <= t["up_to_tokens"]:
-                tier = t
-                break
-
-        if not tier:
-            raise ValueError(
-                "No suitable pricing tier found for the given number of input tokens."
-            )
+        return _gemini_calculator(model_name).cost(input_tokens, output_tokens)
+
 
-        input_cost_rate = tier.get("input_cost_per_million_tokens", 0)
+class GeminiCalculator(ModelCalculator):
+    """
+    Gemini models: 258 tokens per image, or per 258-token tile for Gemini 2.0.
 
+    ``pricing_tiers`` holds ``(up_to_tokens, input_cost, output_cost)`` tuples in
+    ascending order, with costs in dollars per million tokens.
+    """
 
-        output_cost_rate = tier.get("output_cost_per_million_tokens", 0)
+    __slots__ = ("tiled", "pricing_tiers")
+
+    kind = "gemini"
+
+    def __init__(self, name, pricing_tiers, tiled=None, model_class=GeminiModel):
+        super().__init__(name, model_class=model_class)
+        if tiled is None:
+            tiled = name.split("-")[1] == "2.0"
+        self._set(tiled=tiled, pricing_tiers=tuple(tuple(tier) for tier in pricing_tiers))
+
+    def image_tokens(self, width: int, height: int, **kwargs) -> int:
+        num_tokens = 0
+        if not self.tiled:
+            num_tokens += 258
+        else:
+            if width <= 384 and height <= 384:
+                num_tokens += 258
+
+            smaller_side = min(width, height)
+            tile_size = min(max(smaller_side / 1.5, 256), 768)
+
+            tiles_w = math.ceil(width / tile_size)
+            tiles_h = math.ceil(height / tile_size)
+
+            total_tiles = tiles_w * tiles_h + 1
+            num_tokens += total_tiles * 258
+
+        return num_tokens
+
+    def image_tokens_batch(self, widths, heights, **kwargs):
+        widths, heights = as_dimension_arrays(widths, heights)
+        np = import_numpy()
+
+        if not self.tiled:
+            return np.full(widths.shape, 258, dtype=np.int64)
+
+        small = (widths <= 384) & (heights <= 384)
+
+        smaller_side = np.minimum(widths, heights)
+        tile_size = np.minimum(np.maximum(smaller_side / 1.5, 256), 768)
+
+        tiles_w = np.ceil(widths / tile_size).astype(np.int64)
+        tiles_h = np.ceil(heights / tile_size).astype(np.int64)
+
+        total_tiles = tiles_w * tiles_h + 1
+        return np.where(small, 258, 0) + total_tiles * 258
+
+    def cost(self, input_tokens: int, output_tokens: int) -> float:
+        tier = next((tier for tier in self.pricing_tiers if input_tokens <= tier[0]), None)
+        if tier is None:
+            raise ValueError(
+                "No suitable pricing tier found for the given number of input tokens."
+            )
+        _, input_cost_rate, output_cost_rate = tier
 
         input_cost = (input_tokens / 1000000) * input_cost_rate
         output_cost = (output_tokens / 1000000) * output_cost_rate
 
         return input_cost + output_cost
+
+
+def builtin_gemini_calculators() -> list[ModelCalculator]:
+    """Returns the calculators of the Gemini models in ``gemini_config``."""
+    return [
+        GeminiCalculator(
+            model_name,
+            pricing_tiers=[
+                (
+                    tier["up_to_tokens"],
+                    tier.get("input_cost_per_million_tokens", 0),
+                    tier.get("output_cost_per_million_tokens", 0),
+                )
+                for tier in model_config["pricing_tiers"]
+            ],
+        )
+        for model_name, model_config in gemini_config.items()
+    ]
+
+
+def _gemini_calculator(model_name: str) -> GeminiCalculator:
+    calculator = get_calculator(model_name)
+    if not isinstance(calculator, GeminiCalculator):
+        raise ValueError(f"Model {model_name} is not a Gemini model.")
+    return calculator
@@ -1,7 +1,9 @@
 from image_token.base.base import VisionModel
 from image_token.utils.config import openai_config
 import math
+from image_token.utils.array_utils import as_dimension_arrays, import_numpy
 from image_token.utils.config import patch_models, tile_models
+from image_token.models.registry import ModelCalculator, get_calculator
 
 
 class OpenAiModel(VisionModel):
@@ -24,32 +26,27 @@ class OpenAiModel(VisionModel):
         Returns:
             int: The number of tokens for the image.
         """
-        prefix_tokens = kwargs.get("prefix_tokens", 9)
+        return _openai_calculator(model_name).image_tokens(width, height, **kwargs)
 
-        if model_name in patch_models:
-            model_config = openai_config[model_name]
-            max_tokens = model_config["max_tokens"]
-            num_tokens = self.calculate_image_tokens_patch(
-                width=width, height=height, max_tokens=max_tokens
-            )
-            return int(num_tokens * model_config["factor"]) + prefix_tokens
+    def calculate_image_tokens_batch(self, model_name: str, widths, heights, **kwargs):
+        """
+        Calculate the number of tokens for many images at once.
 
-        elif model_name in tile_models:
-            num_tokens = self.calculate_image_tokens_tile(
-                width=width,
-                height=height,
-                tile_models=tile_models,
-                model_name=model_name,
-            )
-            return num_tokens + prefix_tokens
-        else:
-            raise ValueError(
-                f"Model {model_name} is not supported for image token calculation."
-            )
+        Vectorized with NumPy; returns exactly what calculate_image_tokens returns
+        for each (width, height) pair.
 
-    def calculate_image_tokens_patch(
-        self, width, height, max_tokens=1536, patch_size=32
-    ):
+        Args:
+            model_name (str): The name of the model.
+            widths (array-like): The widths of the images.
+            heights (array-like): The heights of the images.
+
+        Returns:
+            numpy.ndarray: The number of tokens for each image, as int64.
+        """
+        return _openai_calculator(model_name).image_tokens_batch(widths, heights, **kwargs)
+
+    @staticmethod
+    def calculate_image_tokens_patch(width, height, max_tokens=1536, patch_size=32):
         # Step 1: Calculate number of patches without scaling
         """
         Calculates the number of image tokens based on the dimensions of the image.
@@ -103,6 +100,107 @@ class OpenAiModel(VisionModel):
         # Final token count is number of patches
         return final_patches_w * final_patches_h
 
+    @staticmethod
+    def calculate_image_tokens_patch_batch(widths, heights, max_tokens=1536, patch_size=32):
+        """
+        Vectorized calculate_image_tokens_patch over int64 arrays of dimensions.
+
+        Every step uses the same float64 operations in the same order as the scalar
+        version, so the results are identical.
+
+        Args:
+            widths (numpy.ndarray): The widths of the images.
+            heights (numpy.ndarray): The heights of the images.
+            max_tokens (int, optional): The maximum number of tokens allowed.
+                                        Defaults to 1536.
+            patch_size (int, optional): The size of each patch. Defaults to 32.
+
+        Returns:
+            numpy.ndarray: The number of image tokens for each image.
+        """
+        np = import_numpy()
+        patches_w = (widths + patch_size - 1) // patch_size
+        patches_h = (heights + patch_size - 1) // patch_size
+        total_patches = patches_w * patches_h
+
+        # Only images over the token budget are scaled.
+        scaled = total_patches > max_tokens
+        if not scaled.any():
+            return total_patches
+        widths = widths[scaled]
+        heights = heights[scaled]
+
+        shrink_factor = np.sqrt((max_tokens * patch_size**2) / (widths * heights))
+        scaled_width = widths * shrink_factor
+        scaled_height = heights * shrink_factor
+
+        patches_w_scaled = scaled_width / patch_size
+        patches_h_scaled = scaled_height / patch_size
+
+        scale_adjust_w = np.trunc(patches_w_scaled) / patches_w_scaled
+        scale_adjust_h = np.trunc(patches_h_scaled) / patches_h_scaled
+
+        final_patches_w = np.trunc(scaled_width * scale_adjust_w / patch_size)
+        final_patches_h = np.trunc(scaled_height * scale_adjust_h / patch_size)
+
+        total_patches = total_patches.copy()
+        total_patches[scaled] = final_patches_w * final_patches_h
+        return total_patches
+
+    def calculate_image_tokens_tile_batch(
+        self, widths, heights, tile_models, model_name, tile_size=512
+    ):
+        """
+        Vectorized calculate_image_tokens_tile over int64 arrays of dimensions.
+
+        Args:
+            widths (numpy.ndarray): The widths of the images.
+            heights (numpy.ndarray): The heights of the images.
+            tile_models (dict): A dictionary containing tile model configurations.
+            model_name (str): The name of the model to use for token calculation.
+            tile_size (int, optional): The size of each tile. Defaults to 512.
+
+        Returns:
+            numpy.ndarray: The number of image tokens for each image.
+        """
+        tile_count = self.calculate_tile_count_batch(widths, heights, tile_size=tile_size)
+        base = tile_models[model_name]["base"]
+        per_tile = tile_models[model_name]["tile"]
+        return base + tile_count * per_tile
+
+    @staticmethod
+    def calculate_tile_count_batch(widths, heights, tile_size=512):
+        """
+        Vectorized calculate_tile_count over int64 arrays of dimensions.
+
+        Args:
+            widths (numpy.ndarray): The widths of the images.
+            heights (numpy.ndarray): The heights of the images.
+            tile_size (int, optional): The size of each tile. Defaults to 512.
+
+        Returns:
+            numpy.ndarray: The number of tiles for each image, as int64.
+        """
+        np = import_numpy()
+
+        # Step 1: Scale to fit in 2048x2048
+        max_side = 2048
+        too_large = (widths > max_side) | (heights > max_side)
+        scale_factor = max_side / np.maximum(widths, heights)
+        width_resized = np.where(too_large, widths * scale_factor, widths)
+        height_resized = np.where(too_large, heights * scale_factor, heights)
+
+        # Step 2: Resize shortest side to 768
+        shortest = np.minimum(width_resized, height_resized)
+        scale_factor_2 = 768 / shortest
+        final_width = np.where(shortest > 768, width_resized * scale_factor_2, width_resized)
+        final_height = np.where(shortest > 768, height_resized * scale_factor_2, height_resized)
+
+        # Step 3: Count tiles (each 512x512)
+        tiles_w = np.ceil(final_width / tile_size)
+        tiles_h = np.ceil(final_height / tile_size)
+        return (tiles_w * tiles_h).astype(np.int64)
+
     def calculate_image_tokens_tile(
         self, width, height, tile_models, model_name, tile_size=512
     ):
@@ -126,6 +224,24 @@ class OpenAiModel(VisionModel):
             - Finally, it counts how many 512x512 tiles fit into the resized image.
             - The number of tokens is calculated based on the base token count and the number of tiles.
         """
+        tile_count = self.calculate_tile_count(width, height, tile_size=tile_size)
+        base = tile_models[model_name]["base"]
+        per_tile = tile_models[model_name]["tile"]
+        return base + tile_count * per_tile
+
+    @staticmethod
+    def calculate_tile_count(width, height, tile_size=512):
+        """
+        Calculate the number of tiles an image is split into by the tile models.
+
+        Args:
+            width (int): The width of the image.
+            height (int): The height of the image.
+            tile_size (int, optional): The size of each tile. Defaults to 512.
+
+        Returns:
+            int: The number of tiles.
+        """
 
         # Step 1: Scale to fit in 2048x2048
         max_side = 2048
@@ -148,11 +264,7 @@ class OpenAiModel(VisionModel):
         # Step 3: Count tiles (each 512x512)
         tiles_w = math.ceil(final_width / tile_size)
         tiles_h = math.ceil(final_height / tile_size)
-        tile_count = tiles_w * tiles_h
-
-        base = tile_models[model_name]["base"]
-        per_tile = tile_models[model_name]["tile"]
-        return base + tile_count * per_tile
+        return tiles_w * tiles_h
 
     def calculate_cost(
         self, model_name: str, input_tokens: int, output_tokens: int
@@ -173,7 +285,105 @@ class OpenAiModel(VisionModel):
         Returns:
             float: The cost of generating text from the image or directory of images.
         """
-        model_config = openai_config[model_name]
-        input_cost = (input_tokens / 10**6) * model_config["input_tokens"]
-        output_cost = (output_tokens / 10**6) * model_config["output_tokens"]
+        return _openai_calculator(model_name).cost(input_tokens, output_tokens)
+
+
+class _OpenAiCalculator(ModelCalculator):
+    """Pricing shared by the OpenAI calculators, in dollars per million tokens."""
+
+    __slots__ = ("input_cost", "output_cost")
+
+    def __init__(self, name, input_cost, output_cost, model_class=OpenAiModel):
+        super().__init__(name, model_class=model_class)
+        self._set(input_cost=input_cost, output_cost=output_cost)
+
+    def cost(self, input_tokens: int, output_tokens: int) -> float:
+        input_cost = (input_tokens / 10**6) * self.input_cost
+        output_cost = (output_tokens / 10**6) * self.output_cost
         return input_cost + output_cost
+
+
+class PatchCalculator(_OpenAiCalculator):
+    """
+    OpenAI models billed per 32px patch, capped at ``max_tokens`` patches and
+    multiplied by ``factor``.
+    """
+
+    __slots__ = ("factor", "max_tokens")
+
+    kind = "patch"
+
+    def __init__(self, name, factor, max_tokens, input_cost, output_cost, model_class=OpenAiModel):
+        super().__init__(name, input_cost, output_cost, model_class=model_class)
+        self._set(factor=factor, max_tokens=max_tokens)
+
+    def image_tokens(self, width: int, height: int, prefix_tokens: int = 9, **kwargs) -> int:
+        num_tokens = OpenAiModel.calculate_image_tokens_patch(
+            width=width, height=height, max_tokens=self.max_tokens
+        )
+        return int(num_tokens * self.factor) + prefix_tokens
+
+    def image_tokens_batch(self, widths, heights, prefix_tokens: int = 9, **kwargs):
+        widths, heights = as_dimension_arrays(widths, heights)
+        np = import_numpy()
+        num_tokens = OpenAiModel.calculate_image_tokens_patch_batch(
+            widths=widths, heights=heights, max_tokens=self.max_tokens
+        )
+        return np.trunc(num_tokens * self.factor).astype(np.int64) + prefix_tokens
+
+
+class TileCalculator(_OpenAiCalculator):
+    """OpenAI models billed ``base`` tokens plus ``tile`` tokens per 512px tile."""
+
+    __slots__ = ("base", "tile")
+
+    kind = "tile"
+
+    def __init__(self, name, base, tile, input_cost, output_cost, model_class=OpenAiModel):
+        super().__init__(name, input_cost, output_cost, model_class=model_class)
+        self._set(base=base, tile=tile)
+
+    def image_tokens(self, width: int, height: int, prefix_tokens: int = 9, **kwargs) -> int:
+        tile_count = OpenAiModel.calculate_tile_count(width, height)
+        return self.base + tile_count * self.tile + prefix_tokens
+
+    def image_tokens_batch(self, widths, heights, prefix_tokens: int = 9, **kwargs):
+        widths, heights = as_dimension_arrays(widths, heights)
+        tile_count = OpenAiModel.calculate_tile_count_batch(widths, heights)
+        return self.base + tile_count * self.tile + prefix_tokens
+
+
+def builtin_openai_calculators() -> list[ModelCalculator]:
+    """Returns the calculators of the OpenAI models in ``openai_config``."""
+    calculators = []
+    for model_name, model_config in openai_config.items():
+        if model_name in patch_models:
+            calculators.append(
+                PatchCalculator(
+                    model_name,
+                    factor=model_config["factor"],
+                    max_tokens=model_config["max_tokens"],
+                    input_cost=model_config["input_tokens"],
+                    output_cost=model_config["output_tokens"],
+                )
+            )
+        elif model_name in tile_models:
+            calculators.append(
+                TileCalculator(
+                    model_name,
+                    base=tile_models[model_name]["base"],
+                    tile=tile_models[model_name]["tile"],
+                    input_cost=model_config["input_tokens"],
+                    output_cost=model_config["output_tokens"],
+                )
+            )
+    return calculators
+
+
+def _openai_calculator(model_name: str) -> _OpenAiCalculator:
+    calculator = get_calculator(model_name)
+    if not isinstance(calculator, _OpenAiCalculator):
+        raise ValueError(
+            f"Model {model_name} is not supported for image token calculation."
+        )
+    return calculator
@@ -0,0 +1,181 @@
+import threading
+from image_token.base.base import VisionModel, get_token_memo
+
+
+class ModelCalculator:
+    """
+    Immutable token and cost calculator for a single model.
+
+    A model name is resolved once into a calculator holding its formula kind,
+    constants and pricing, which is then shared by every call and thread. Subclasses
+    declare their constants in ``__slots__`` and set them with ``_set`` in
+    ``__init__``; afterwards the calculator cannot be modified.
+
+    Register a subclass instance with ``register_model`` to support another model.
+
+    Args:
+        name (str): The model name.
+        model_class (type): The VisionModel subclass that runs get_token and get_cost
+                            for this model. Defaults to RegisteredModel.
+    """
+
+    __slots__ = ("name", "model_class")
+
+    kind = None
+
+    def __init__(self, name: str, model_class: type = None):
+        self._set(name=name, model_class=model_class or RegisteredModel)
+
+    def _set(self, **values):
+        for attr, value in values.items():
+            object.__setattr__(self, attr, value)
+
+    def __setattr__(self, attr, value):
+        raise AttributeError(f"{type(self).__name__} is immutable")
+
+    def __delattr__(self, attr):
+        raise AttributeError(f"{type(self).__name__} is immutable")
+
+    def __repr__(self):
+        return f"{type(self).__name__}({self.name!r})"
+
+    def image_tokens(self, width: int, height: int, **kwargs) -> int:
+        """
+        Calculate the number of tokens for an image.
+
+        Args:
+            width (int): The width of the image.
+            height (int): The height of the image.
+
+        Returns:
+            int: The number of tokens for the image.
+        """
+        raise NotImplementedError
+
+    def cost(self, input_tokens: int, output_tokens: int) -> float:
+        """
+        Calculate the cost of a request.
+
+        Args:
+            input_tokens (int): The number of input tokens.
+            output_tokens (int): The number of output tokens.
+
+        Returns:
+            float: The cost in dollars.
+        """
+        raise NotImplementedError
+
+
+class RegisteredModel(VisionModel):
+    """Runs get_token and get_cost for any registered calculator."""
+
+    def calculate_image_tokens(self, model_name: str, width: int, height: int, **kwargs):
+        return get_calculator(model_name).image_tokens(width, height, **kwargs)
+
+    def calculate_image_tokens_batch(self, model_name: str, widths, heights, **kwargs):
+        image_tokens_batch = getattr(get_calculator(model_name), "image_tokens_batch", None)
+        if image_tokens_batch is None:
+            return super().calculate_image_tokens_batch(model_name, widths, heights, **kwargs)
+        return image_tokens_batch(widths, heights, **kwargs)
+
+    def calculate_cost(self, model_name: str, input_tokens: int, output_tokens: int) -> float:
+        return get_calculator(model_name).cost(input_tokens, output_tokens)
+
+
+_calculators = {}
+_models = {}
+_lock = threading.Lock()
+_builtins_loaded = False
+
+
+def _load_builtin_models():
+    # Called with _lock held. The helpers import this module, so they are imported here.
+    global _builtins_loaded
+    if _builtins_loaded:
+        return
+    from image_token.models.gemini_helper import builtin_gemini_calculators
+    from image_token.models.openai_helper import builtin_openai_calculators
+
+    for calculator in (*builtin_openai_calculators(), *builtin_gemini_calculators()):
+        _calculators.setdefault(calculator.name, calculator)
+    _builtins_loaded = True
+
+
+def register_model(calculator: ModelCalculator, replace: bool = False):
+    """
+    Registers a model, making it available to get_token, get_cost and the other APIs.
+
+    Args:
+        calculator (ModelCalculator): The calculator of the model.
+        replace (bool): Replace a model already registered under the same name. Token
+                        counts memoized for the old model are discarded.
+
+    Raises:
+        ValueError: If the model is already registered and ``replace`` is not set.
+    """
+    with _lock:
+        _load_builtin_models()
+        if calculator.name in _calculators:
+            if not replace:
+                raise ValueError(f"Model {calculator.name} is already registered.")
+            get_token_memo().clear()
+        _calculators[calculator.name] = calculator
+
+
+def unregister_model(model_name: str):
+    """Removes a registered model. Unknown names are ignored."""
+    with _lock:
+        _load_builtin_models()
+        if _calculators.pop(model_name, None) is not None:
+            get_token_memo().clear()
+
+
+def get_calculator(model_name: str) -> ModelCalculator:
+    """
+    Returns the shared calculator of a model.
+
+    Args:
+        model_name (str): The name of the model.
+
+    Raises:
+        ValueError: If the model is not supported.
+
+    Returns:
+        ModelCalculator: The calculator.
+    """
+    calculator = _calculators.get(model_name)
+    if calculator is None:
+        with _lock:
+            _load_builtin_models()
+        calculator = _calculators.get(model_name)
+        if calculator is None:
+            raise ValueError(f"Unsupported model: {model_name}")
+    return calculator
+
+
+def get_model(model_name: str) -> VisionModel:
+    """
+    Returns the shared VisionModel instance that runs a model.
+
+    Args:
+        model_name (str): The name of the model.
+
+    Raises:
+        ValueError: If the model is not supported.
+
+    Returns:
+        VisionModel: The model instance; one per model class, reused across calls.
+    """
+    model_class = get_calculator(model_name).model_class
+    model = _models.get(model_class)
+    if model is None:
+        with _lock:
+            model = _models.setdefault(model_class, model_class())
+    return model
+
+
+def registered_models() -> list[str]:
+    """Returns the names of all registered models."""
+    with _lock:
+        _load_builtin_models()
+        return list(_calculators)
@@ -0,0 +1,35 @@
+def import_numpy():
+    try:
+        import numpy
+    except ImportError as err:
+        raise ImportError(
+            "Batch token calculation requires numpy. "
+            "Install it with `pip install image-token[numpy]`."
+        ) from err
+    return numpy
+
+
+def as_dimension_arrays(widths, heights):
+    """
+    Converts widths and heights to equally shaped int64 arrays.
+
+    Args:
+        widths (array-like): The image widths.
+        heights (array-like): The image heights.
+
+    Raises:
+        ValueError: If the shapes differ or a dimension is not positive.
+
+    Returns:
+        tuple[numpy.ndarray, numpy.ndarray]: The widths and heights.
+    """
+    np = import_numpy()
+    widths = np.asarray(widths, dtype=np.int64)
+    heights = np.asarray(heights, dtype=np.int64)
+    if widths.shape != heights.shape:
+        raise ValueError(
+            f"widths and heights must have the same shape, got {widths.shape} and {heights.shape}"
+        )
+    if widths.size and (widths.min() <= 0 or heights.min() <= 0):
+        raise ValueError("Image dimensions must be positive.")
+    return widths, heights
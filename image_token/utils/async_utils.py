@@ -0,0 +1,172 @@
+import asyncio
+import weakref
+from contextlib import asynccontextmanager
+from typing import Optional
+from urllib.parse import urlparse
+from image_token.utils.http_utils import INITIAL_RANGE_BYTES, STREAM_CHUNK_BYTES
+from image_token.utils.image_header import (
+    MAX_HEADER_BYTES,
+    get_image_dimensions_from_header,
+)
+from image_token.utils.utils import get_image_dimensions_from_bytes
+
+DEFAULT_MAX_CONCURRENCY = 64
+DEFAULT_MAX_CONNECTIONS = 100
+DEFAULT_TIMEOUT = 30.0
+
+# One shared client per event loop; httpx clients cannot be used across loops.
+_async_clients = weakref.WeakKeyDictionary()
+
+
+def _import_httpx():
+    try:
+        import httpx
+    except ImportError as err:
+        raise ImportError(
+            "The async API requires httpx. Install it with `pip install image-token[async]`."
+        ) from err
+    return httpx
+
+
+def get_async_client():
+    """
+    Returns the shared async HTTP client for the running event loop.
+
+    The client keeps a pool of keep-alive connections that is reused by every
+    async fetch on the same loop.
+
+    Returns:
+        httpx.AsyncClient: The shared client.
+    """
+    loop = asyncio.get_running_loop()
+    client = _async_clients.get(loop)
+    if client is None or client.is_closed:
+        httpx = _import_httpx()
+        client = httpx.AsyncClient(
+            limits=httpx.Limits(
+                max_connections=DEFAULT_MAX_CONNECTIONS,
+                max_keepalive_connections=DEFAULT_MAX_CONNECTIONS,
+            ),
+            timeout=DEFAULT_TIMEOUT,
+            follow_redirects=True,
+        )
+        _async_clients[loop] = client
+    return client
+
+
+async def aclose_async_client():
+    """Closes the shared async HTTP client of the running event loop, if any."""
+    client = _async_clients.pop(asyncio.get_running_loop(), None)
+    if client is not None:
+        await client.aclose()
+
+
+class AsyncHostLimiter:
+    """Caps the number of in-flight requests in total and per host."""
+
+    def __init__(self, max_concurrency: int, max_per_host: int):
+        self.max_per_host = max_per_host
+        self._total = asyncio.Semaphore(max_concurrency)
+        self._hosts = {}
+
+    @asynccontextmanager
+    async def slot(self, url: str):
+        host = urlparse(url).netloc
+        semaphore = self._hosts.get(host)
+        if semaphore is None:
+            semaphore = self._hosts[host] = asyncio.Semaphore(self.max_per_host)
+        # The host slot is taken first: tasks queued behind a busy host must not hold
+        # global slots that requests to other hosts could use.
+        async with semaphore, self._total:
+            yield
+
+
+async def _astream_dimensions(response, buffer: bytearray) -> Optional[tuple[int, int]]:
+    async for chunk in response.aiter_bytes(STREAM_CHUNK_BYTES):
+        buffer += chunk
+        dims = get_image_dimensions_from_header(buffer)
+        if dims is not None:
+            return dims
+    return None
+
+
+async def _afetch_image_dimensions(
+    client, url, partial, range_bytes, max_header_bytes
+) -> Optional[tuple[int, int]]:
+    if not partial:
+        response = await client.get(url)
+        response.raise_for_status()
+        return get_image_dimensions_from_bytes(response.content)
+
+    buffer = bytearray()
+    while len(buffer) < max_header_bytes:
+        start = len(buffer)
+        end = start + range_bytes - 1
+        headers = {"Range": f"bytes={start}-{end}"}
+        async with client.stream("GET", url, headers=headers) as response:
+            if response.status_code == 416:
+                break
+            response.raise_for_status()
+
+            if response.status_code != 206:
+                buffer = bytearray()
+                dims = await _astream_dimensions(response, buffer)
+                if dims is not None:
+                    return dims
+                return get_image_dimensions_from_bytes(bytes(buffer))
+
+            dims = await _astream_dimensions(response, buffer)
+            if dims is not None:
+                return dims
+
+        if len(buffer) <= end:
+            return get_image_dimensions_from_bytes(bytes(buffer))
+        range_bytes *= 2
+
+    if len(buffer) < max_header_bytes:
+        return get_image_dimensions_from_bytes(bytes(buffer))
+    return await _afetch_image_dimensions(
+        client, url, False, range_bytes, max_header_bytes
+    )
+
+
+async def afetch_image_dimensions(
+    url: str,
+    client=None,
+    partial: bool = True,
+    range_bytes: int = INITIAL_RANGE_BYTES,
+    max_header_bytes: int = MAX_HEADER_BYTES,
+) -> Optional[tuple[int, int]]:
+    """
+    Async variant of ``fetch_image_dimensions``.
+
+    Errors are raised as ``requests`` exceptions so that sync and async callers
+    handle them the same way.
+
+    Args:
+        url (str): The URL of the image.
+        client (httpx.AsyncClient): The client to use. Defaults to the shared client.
+        partial (bool): If False, download the full body as a single request.
+        range_bytes (int): Size of the first range request.
+        max_header_bytes (int): Give up on partial reads after this many bytes.
+
+    Raises:
+        requests.exceptions.HTTPError: If the server returns an error status.
+        requests.exceptions.RequestException: If the request fails.
+
+    Returns:
+        tuple[int, int]: The (width, height) of the image, or None if the body is
+                         not a readable image.
+    """
+    from requests.exceptions import HTTPError, RequestException
+
+    httpx = _import_httpx()
+    client = client or get_async_client()
+    try:
+        return await _afetch_image_dimensions(
+            client, url, partial, range_bytes, max_header_bytes
+        )
+    except httpx.HTTPStatusError as err:
+        raise HTTPError(str(err)) from err
+    except httpx.HTTPError as err:
+        raise RequestException(str(err)) from err
@@ -1,65 +1,902 @@
+import asyncio
+import math
 import sqlite3
-from typing import Optional
+import threading
+import time
+import warnings
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Iterable, NamedTuple, Optional
 from pathlib import Path
 import os
 
-CACHE_DIR = Path(os.getenv("IMAGE_CACHE_DIR", Path.home() / ".image_cache"))
-CACHE_DIR.mkdir(parents=True, exist_ok=True)
-DB_PATH = CACHE_DIR / "ImageTokenDimensionCache.sqlite"
+DB_FILE_NAME = "ImageTokenDimensionCache.sqlite"
 
+# Pass as ``path`` to keep the cache in memory for the lifetime of the connection.
+MEMORY_DB = ":memory:"
+
+# Overrides the default database location of caches created without a path.
+DB_PATH = None
+
+
+# Bump when the schema changes; _init_cache only runs DDL for older databases.
+SCHEMA_VERSION = 3
+
+# Buffered writes are flushed once this many are pending or this many seconds passed.
+DEFAULT_FLUSH_SIZE = 500
+DEFAULT_FLUSH_INTERVAL = 1.0
+
+# Number of keys bound per "IN (...)" lookup; below sqlite's historic 999 variable cap.
+LOOKUP_CHUNK_SIZE = 500
+
+# How long a connection waits for a lock held by another process, in milliseconds.
+BUSY_TIMEOUT_MS = 5000
+
+DEFAULT_MEMORY_CACHE_SIZE = 100_000
+
+# Minimum number of seconds between size-policy evictions while the cache is open.
+EVICT_INTERVAL = 60.0
+
+
+def get_cache_dir() -> Path:
+    """
+    Returns the default cache directory: ``$IMAGE_CACHE_DIR``, else ``~/.image_cache``.
+
+    The directory is resolved when called and is not created.
+    """
+    return Path(os.getenv("IMAGE_CACHE_DIR", Path.home() / ".image_cache"))
+
+
+def get_db_path() -> Path:
+    """Returns the database used by caches created without a path."""
+    if DB_PATH is not None:
+        return Path(DB_PATH)
+    return get_cache_dir() / DB_FILE_NAME
+
+
+class DimensionLRU:
+    """
+    A thread-safe, bounded in-memory LRU map used in front of the sqlite cache.
+
+    Args:
+        maxsize (int): The maximum number of entries. 0 disables the cache.
+    """
+
+    def __init__(self, maxsize: int = DEFAULT_MEMORY_CACHE_SIZE):
+        self.maxsize = maxsize
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get(self, key):
+        """Return the value for key and mark it most recently used, else None."""
+        with self._lock:
+            value = self._entries.get(key)
+            if value is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key, value):
+        """Store a value, evicting the least recently used entries if full."""
+        if self.maxsize <= 0:
+            return
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def pop(self, key):
+        """Remove key if present."""
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self):
+        """Remove all entries and reset the statistics."""
+        with self._lock:
+            self._entries.clear()
+            self.hits = self.misses = self.evictions = 0
+
+    def resize(self, maxsize: int):
+        """Change the maximum number of entries, evicting if needed."""
+        with self._lock:
+            self.maxsize = maxsize
+            while len(self._entries) > max(maxsize, 0):
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def stats(self) -> dict:
+        """
+        Returns the cache statistics.
+
+        Returns:
+            dict: ``size``, ``maxsize``, ``hits``, ``misses``, ``evictions`` and ``hit_ratio``.
+        """
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._entries),
+                "maxsize": self.maxsize,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_ratio": self.hits / lookups if lookups else 0.0,
+            }
+
+
+# Shared by every ImageDimensionCache in the process.
+_memory_cache = DimensionLRU()
+
+
+def get_memory_cache() -> DimensionLRU:
+    """Returns the process-wide in-memory dimension cache."""
+    return _memory_cache
+
+
+def configure_memory_cache(maxsize: int):
+    """
+    Sets the size of the process-wide in-memory dimension cache.
+
+    Args:
+        maxsize (int): The maximum number of entries. 0 disables the in-memory tier.
+    """
+    _memory_cache.resize(maxsize)
+
+
+class UrlEntry(NamedTuple):
+    """
+    A cached URL entry as kept in memory and in the write buffer.
+
+    ``created_at`` is when the dimensions were fetched or last revalidated;
+    ``etag`` and ``last_modified`` are the validators the server sent with them.
+    """
+
+    width: int
+    height: int
+    created_at: float
+    etag: Optional[str] = None
+    last_modified: Optional[str] = None
+
+    @property
+    def has_validators(self) -> bool:
+        return self.etag is not None or self.last_modified is not None
+
+
+class _LookupStats:
+    """Process-wide hit/miss counters across all ImageDimensionCache instances."""
 
-class ImageDimensionCache:
     def __init__(self):
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+    def record(self, hits: int = 0, misses: int = 0):
+        with self._lock:
+            self.hits += hits
+            self.misses += misses
+
+
+_lookup_stats = _LookupStats()
+
+
+class ImageDimensionCache:
+    """
+    Persistent sqlite cache of image dimensions for URLs and local files.
+
+    Lookups go to a process-wide in-memory LRU first; the sqlite connection is only
+    opened when an entry is not in memory or buffered writes need flushing, so a hot
+    loop of repeated lookups never touches sqlite.
+
+    Writes are buffered and flushed in a single transaction with ``executemany`` once
+    ``flush_size`` writes are pending or ``flush_interval`` seconds have passed, and
+    always when the context exits. Lookups see buffered writes.
+
+    Every row stores when it was inserted and last looked up. Hits from every tier are
+    recorded and written with the buffered writes, so the hottest entries, which are
+    served from memory, stay the most recently accessed rows. With ``ttl`` set,
+    URL entries older than ``ttl`` seconds are treated as misses; local file entries
+    are validated by their stat fingerprint instead. With ``max_entries`` or
+    ``max_bytes`` set, the least recently accessed rows are evicted on exit if the
+    session wrote or looked up anything, and at most every ``EVICT_INTERVAL`` seconds
+    in between.
+
+    URL entries keep the ``ETag`` and ``Last-Modified`` validators of the response.
+    With ``revalidate`` set, expired entries that have validators are kept instead of
+    purged, so callers can confirm them with a conditional request (see
+    ``get_cached_entry`` and ``touch_dimensions``).
+
+    Args:
+        flush_size (int): Flush after this many buffered writes.
+        flush_interval (float): Flush when the oldest buffered write is this many
+                                seconds old.
+        memory_cache (DimensionLRU): The in-memory tier. Defaults to the process-wide
+                                     cache; pass None to disable it. Entries are
+                                     keyed by database, so caches on different
+                                     files (or ``":memory:"``) never share them.
+        ttl (float): Expire entries after this many seconds. Defaults to None (never).
+        max_entries (int): Keep at most this many rows across both tables.
+        max_bytes (int): Keep the used size of the database below this many bytes.
+        revalidate (bool): Keep expired URL entries that can be revalidated.
+        path (str | Path): The sqlite database, or ``":memory:"`` for a cache that
+                           lives only as long as the connection. Defaults to
+                           ``get_db_path()``, resolved and created on first use.
+    """
+
+    def __init__(
+        self,
+        flush_size: int = DEFAULT_FLUSH_SIZE,
+        flush_interval: float = DEFAULT_FLUSH_INTERVAL,
+        memory_cache: Optional[DimensionLRU] = _memory_cache,
+        ttl: Optional[float] = None,
+        max_entries: Optional[int] = None,
+        max_bytes: Optional[int] = None,
+        revalidate: bool = False,
+        path: Optional[str | Path] = None,
+    ):
+        self.path = path
+        self._db_path = None
+        self._memory_namespace = None
         self._connection = None
+        self._active = False
+        self.memory_cache = memory_cache
+        self.flush_size = flush_size
+        self.flush_interval = flush_interval
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.revalidate = revalidate
+        self._pending_urls = {}
+        self._pending_files = {}
+        self._touched_urls = set()
+        self._touched_files = set()
+        # Whether anything was written to sqlite since the size policy was last applied.
+        self._modified = False
+        self._last_flush = time.monotonic()
+        self._last_evict = time.monotonic()
 
     def __enter__(self):
-        """Open connection when entering context."""
-        self._connection = sqlite3.connect(DB_PATH)
-        self._init_cache()
+        """Enter context; the connection is opened on first use."""
+        self._active = True
         return self
 
     def __exit__(self, exc_type, exc_val, exc_tb):
-        """Close connection when exiting context."""
-        if self._connection:
-            self._connection.close()
-            self._connection = None
+        """Flush buffered writes and close connection when exiting context."""
+        try:
+            if self._active:
+                self.flush()
+                if self._has_size_policy() and self._modified:
+                    self.evict()
+        finally:
+            self._active = False
+            if self._connection:
+                self._connection.close()
+                self._connection = None
 
-    def _init_cache(self):
-        """Create the cache table if it doesn't exist."""
-        self._connection.execute("""
-            CREATE TABLE IF NOT EXISTS dimension_cache (
-                url TEXT PRIMARY KEY,
-                width INTEGER NOT NULL,
-                height INTEGER NOT NULL
+    def _db(self) -> sqlite3.Connection:
+        """Return the sqlite connection, opening it on first use."""
+        self._check_connection()
+        if self._connection is None:
+            self._db_path = self._resolve_path()
+            self._connection = sqlite3.connect(self._db_path, timeout=BUSY_TIMEOUT_MS / 1000)
+            self._connection.execute("PRAGMA journal_mode=WAL")
+            self._connection.execute("PRAGMA synchronous=NORMAL")
+            self._connection.execute(f"PRAGMA busy_timeout={BUSY_TIMEOUT_MS}")
+            self._init_cache()
+        return self._connection
+
+    def _resolve_path(self) -> str:
+        """Resolve the database location, creating its directory if needed."""
+        if str(self.path) == MEMORY_DB:
+            return MEMORY_DB
+        path = Path(self.path) if self.path is not None else get_db_path()
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+        except OSError as err:
+            if self.path is not None:
+                raise
+            # The default location is not writable (e.g. a read-only home directory);
+            # caching still works for the lifetime of the connection.
+            warnings.warn(
+                f"Cannot create cache directory {path.parent} ({err}); using an in-memory cache.",
+                stacklevel=2,
             )
-        """)
-        self._connection.commit()
+            return MEMORY_DB
+        return str(path)
+
+    def _memory_key(self, key):
+        # Resolved without opening the database, so memory hits stay connection-free.
+        if self._memory_namespace is None:
+            if str(self.path) == MEMORY_DB:
+                # A ":memory:" database is private to this cache.
+                self._memory_namespace = object()
+            else:
+                path = self.path if self.path is not None else get_db_path()
+                self._memory_namespace = os.path.abspath(path)
+        return self._memory_namespace, key
+
+    def _memory_get(self, key):
+        if self.memory_cache is None:
+            return None
+        return self.memory_cache.get(self._memory_key(key))
+
+    def _memory_put(self, key, value):
+        if self.memory_cache is not None:
+            self.memory_cache.put(self._memory_key(key), value)
+
+    def _memory_pop(self, key):
+        if self.memory_cache is not None:
+            self.memory_cache.pop(self._memory_key(key))
+
+    def _init_cache(self):
+        """Create or migrate the cache tables."""
+        connection = self._connection
+        version = connection.execute("PRAGMA user_version").fetchone()[0]
+        if version >= SCHEMA_VERSION:
+            return
+
+        with connection:
+            connection.execute("""
+                CREATE TABLE IF NOT EXISTS dimension_cache (
+                    url TEXT PRIMARY KEY,
+                    width INTEGER NOT NULL,
+                    height INTEGER NOT NULL
+                )
+            """)
+            connection.execute("""
+                CREATE TABLE IF NOT EXISTS file_dimension_cache (
+                    path TEXT PRIMARY KEY,
+                    size INTEGER NOT NULL,
+                    mtime_ns INTEGER NOT NULL,
+                    inode INTEGER NOT NULL,
+                    width INTEGER NOT NULL,
+                    height INTEGER NOT NULL
+                )
+            """)
+            if version < 2:
+                # Existing rows count as inserted and accessed at migration time.
+                now = time.time()
+                for table in ("dimension_cache", "file_dimension_cache"):
+                    columns = {
+                        row[1] for row in connection.execute(f"PRAGMA table_info({table})")
+                    }
+                    for column in ("created_at", "accessed_at"):
+                        if column not in columns:
+                            connection.execute(
+                                f"ALTER TABLE {table} ADD COLUMN {column} REAL NOT NULL DEFAULT 0"
+                            )
+                    connection.execute(
+                        f"UPDATE {table} SET created_at = ?, accessed_at = ? WHERE created_at = 0",
+                        (now, now),
+                    )
+                    connection.execute(
+                        f"CREATE INDEX IF NOT EXISTS {table}_accessed_at ON {table} (accessed_at)"
+                    )
+            if version < 3:
+                columns = {
+                    row[1] for row in connection.execute("PRAGMA table_info(dimension_cache)")
+                }
+                for column in ("etag", "last_modified"):
+                    if column not in columns:
+                        connection.execute(
+                            f"ALTER TABLE dimension_cache ADD COLUMN {column} TEXT"
+                        )
+            connection.execute(f"PRAGMA user_version={SCHEMA_VERSION}")
+
+    def _check_connection(self):
+        if not self._active:
+            raise RuntimeError("Cache not initialized.")
+
+    def is_stale(self, entry: UrlEntry) -> bool:
+        """Return True if the entry is older than the cache ttl."""
+        return self.ttl is not None and entry.created_at < time.time() - self.ttl
+
+    def _has_size_policy(self) -> bool:
+        return self.max_entries is not None or self.max_bytes is not None
+
+    def _maybe_flush(self):
+        pending = len(self._pending_urls) + len(self._pending_files)
+        if (
+            pending >= self.flush_size
+            or time.monotonic() - self._last_flush >= self.flush_interval
+        ):
+            self.flush()
+            if (
+                self._has_size_policy()
+                and time.monotonic() - self._last_evict >= EVICT_INTERVAL
+            ):
+                self.evict()
+
+    def flush(self):
+        """Write all buffered entries and access times in one transaction."""
+        self._check_connection()
+
+        if self._pending_urls or self._pending_files or self._touched_urls or self._touched_files:
+            now = time.time()
+            connection = self._db()
+            with connection:
+                connection.executemany(
+                    "INSERT OR REPLACE INTO dimension_cache "
+                    "(url, width, height, created_at, accessed_at, etag, last_modified) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    [
+                        (
+                            url,
+                            entry.width,
+                            entry.height,
+                            entry.created_at,
+                            now,
+                            entry.etag,
+                            entry.last_modified,
+                        )
+                        for url, entry in self._pending_urls.items()
+                    ],
+                )
+                connection.executemany(
+                    "INSERT OR REPLACE INTO file_dimension_cache "
+                    "(path, size, mtime_ns, inode, width, height, created_at, accessed_at) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                    [(path, *entry, now, now) for path, entry in self._pending_files.items()],
+                )
+                connection.executemany(
+                    "UPDATE dimension_cache SET accessed_at = ? WHERE url = ?",
+                    [(now, url) for url in self._touched_urls],
+                )
+                connection.executemany(
+                    "UPDATE file_dimension_cache SET accessed_at = ? WHERE path = ?",
+                    [(now, path) for path in self._touched_files],
+                )
+            self._pending_urls.clear()
+            self._pending_files.clear()
+            self._touched_urls.clear()
+            self._touched_files.clear()
+            self._modified = True
+        self._last_flush = time.monotonic()
+
+    def _lookup_entry(self, url: str) -> Optional[UrlEntry]:
+        self._check_connection()
+
+        entry = self._memory_get(url) or self._pending_urls.get(url)
+        if entry is None:
+            row = self._db().execute(
+                "SELECT width, height, created_at, etag, last_modified "
+                "FROM dimension_cache WHERE url = ?",
+                (url,),
+            ).fetchone()
+            if row is not None:
+                entry = UrlEntry(*row)
+                self._memory_put(url, entry)
+        if entry is not None:
+            self._touched_urls.add(url)
+        return entry
+
+    def get_cached_entry(self, url: str) -> Optional[UrlEntry]:
+        """
+        Return the cached entry for a URL, including a stale one, else None.
+
+        Args:
+            url (str): The URL of the image.
+
+        Returns:
+            UrlEntry: The dimensions, when they were fetched and their validators.
+                      Use ``is_stale`` to check the entry against the ttl.
+        """
+        entry = self._lookup_entry(url)
+        if entry is None or self.is_stale(entry):
+            _lookup_stats.record(misses=1)
+        else:
+            _lookup_stats.record(hits=1)
+        return entry
 
     def get_cached_dimensions(self, url: str) -> Optional[tuple[int, int]]:
         """Return (width, height) from cache if available, else None."""
-        if not self._connection:
-            raise RuntimeError("Cache not initialized.")
+        entry = self.get_cached_entry(url)
+        if entry is None or self.is_stale(entry):
+            return None
+        return entry.width, entry.height
 
-        cursor = self._connection.execute(
-            "SELECT width, height FROM dimension_cache WHERE url = ?", (url,)
-        )
-        return cursor.fetchone()
+    def get_many_entries(self, urls: Iterable[str]) -> dict[str, UrlEntry]:
+        """
+        Look up the entries of many URLs at once, including stale ones.
 
-    def cache_dimensions(self, url: str, width: int, height: int):
-        """Store the (width, height) for a URL in the cache."""
-        if not self._connection:
-            raise RuntimeError("Cache not initialized.")
+        Args:
+            urls (Iterable[str]): The URLs to look up.
 
-        self._connection.execute(
-            "INSERT OR REPLACE INTO dimension_cache (url, width, height) VALUES (?, ?, ?)",
-            (url, width, height),
-        )
-        self._connection.commit()
+        Returns:
+            dict[str, UrlEntry]: The entry of every URL found in the cache.
+                                 Misses are not included.
+        """
+        self._check_connection()
+
+        entries = {}
+        lookup = []
+        unique_urls = dict.fromkeys(urls)
+        for url in unique_urls:
+            entry = self._memory_get(url) or self._pending_urls.get(url)
+            if entry is not None:
+                entries[url] = entry
+            else:
+                lookup.append(url)
+        self._touched_urls.update(entries)
+
+        for start in range(0, len(lookup), LOOKUP_CHUNK_SIZE):
+            chunk = lookup[start : start + LOOKUP_CHUNK_SIZE]
+            placeholders = ",".join("?" * len(chunk))
+            cursor = self._db().execute(
+                "SELECT url, width, height, created_at, etag, last_modified "
+                f"FROM dimension_cache WHERE url IN ({placeholders})",
+                chunk,
+            )
+            for url, *row in cursor:
+                entries[url] = UrlEntry(*row)
+                self._touched_urls.add(url)
+                self._memory_put(url, entries[url])
+
+        fresh = sum(1 for entry in entries.values() if not self.is_stale(entry))
+        _lookup_stats.record(hits=fresh, misses=len(unique_urls) - fresh)
+        return entries
+
+    def get_many(self, urls: Iterable[str]) -> dict[str, tuple[int, int]]:
+        """
+        Look up many URLs at once.
+
+        Args:
+            urls (Iterable[str]): The URLs to look up.
+
+        Returns:
+            dict[str, tuple[int, int]]: (width, height) for every URL found in the cache.
+                                        Misses and stale entries are not included.
+        """
+        return {
+            url: (entry.width, entry.height)
+            for url, entry in self.get_many_entries(urls).items()
+            if not self.is_stale(entry)
+        }
+
+    def cache_dimensions(
+        self,
+        url: str,
+        width: int,
+        height: int,
+        etag: Optional[str] = None,
+        last_modified: Optional[str] = None,
+    ):
+        """
+        Store the (width, height) for a URL in the cache.
+
+        Args:
+            url (str): The URL of the image.
+            width (int): The width of the image.
+            height (int): The height of the image.
+            etag (str): The ``ETag`` header of the response, if any.
+            last_modified (str): The ``Last-Modified`` header of the response, if any.
+        """
+        self._check_connection()
+
+        entry = UrlEntry(width, height, time.time(), etag, last_modified)
+        self._pending_urls[url] = entry
+        self._memory_put(url, entry)
+        self._maybe_flush()
+
+    def touch_dimensions(self, url: str):
+        """
+        Mark a cached URL entry as fresh, e.g. after the server answered 304 Not Modified.
+
+        Args:
+            url (str): The URL of the image.
+        """
+        entry = self._lookup_entry(url)
+        if entry is not None:
+            self.cache_dimensions(
+                url, entry.width, entry.height, entry.etag, entry.last_modified
+            )
+
+    def bulk_put(self, items: Iterable[tuple[str, int, int]]):
+        """
+        Store many (url, width, height) entries in a single transaction.
+
+        Args:
+            items (Iterable[tuple[str, int, int]]): The entries to store.
+        """
+        self._check_connection()
+
+        self.flush()
+        now = time.time()
+        entries = {url: UrlEntry(width, height, now) for url, width, height in items}
+        connection = self._db()
+        with connection:
+            connection.executemany(
+                "INSERT OR REPLACE INTO dimension_cache "
+                "(url, width, height, created_at, accessed_at) VALUES (?, ?, ?, ?, ?)",
+                [(url, entry.width, entry.height, now, now) for url, entry in entries.items()],
+            )
+        self._modified = True
+        for url, entry in entries.items():
+            self._memory_put(url, entry)
 
     def delete_dimensions(self, url: str):
         """Delete the cache for a URL"""
-        if not self._connection:
+        self._check_connection()
+
+        self._pending_urls.pop(url, None)
+        self._touched_urls.discard(url)
+        self._memory_pop(url)
+        connection = self._db()
+        with connection:
+            connection.execute("DELETE FROM dimension_cache WHERE url = ?", (url,))
+
+    def get_cached_file_dimensions(
+        self, path: str, size: int, mtime_ns: int, inode: int
+    ) -> Optional[tuple[int, int]]:
+        """
+        Return (width, height) of a local file from cache if available, else None.
+
+        The entry is only returned if the file still has the stored size, mtime and
+        inode; a changed file is a cache miss.
+
+        Args:
+            path (str): The path to the image file.
+            size (int): The current size of the file in bytes.
+            mtime_ns (int): The current modification time of the file in nanoseconds.
+            inode (int): The current inode number of the file.
+        """
+        self._check_connection()
+
+        path = os.path.abspath(path)
+        fingerprint = (size, mtime_ns, inode)
+        entry = self._memory_get(("file", path)) or self._pending_files.get(path)
+        if entry is None:
+            row = self._db().execute(
+                "SELECT size, mtime_ns, inode, width, height FROM file_dimension_cache "
+                "WHERE path = ?",
+                (path,),
+            ).fetchone()
+            if row is not None:
+                entry = tuple(row)
+                self._memory_put(("file", path), entry)
+
+        if entry is None or entry[:3] != fingerprint:
+            _lookup_stats.record(misses=1)
+            return None
+        self._touched_files.add(path)
+        _lookup_stats.record(hits=1)
+        return entry[3:]
+
+    def cache_file_dimensions(
+        self, path: str, size: int, mtime_ns: int, inode: int, width: int, height: int
+    ):
+        """Store the (width, height) for a local file with its stat fingerprint."""
+        self._check_connection()
+
+        path = os.path.abspath(path)
+        entry = (size, mtime_ns, inode, width, height)
+        self._pending_files[path] = entry
+        self._memory_put(("file", path), entry)
+        self._maybe_flush()
+
+    def delete_file_dimensions(self, path: str):
+        """Delete the cache for a local file"""
+        self._check_connection()
+
+        path = os.path.abspath(path)
+        self._pending_files.pop(path, None)
+        self._touched_files.discard(path)
+        self._memory_pop(("file", path))
+        connection = self._db()
+        with connection:
+            connection.execute("DELETE FROM file_dimension_cache WHERE path = ?", (path,))
+
+    def _count_entries(self) -> int:
+        connection = self._db()
+        return sum(
+            connection.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+            for table in ("dimension_cache", "file_dimension_cache")
+        )
+
+    def _used_bytes(self) -> int:
+        connection = self._db()
+        page_size = connection.execute("PRAGMA page_size").fetchone()[0]
+        page_count = connection.execute("PRAGMA page_count").fetchone()[0]
+        free_pages = connection.execute("PRAGMA freelist_count").fetchone()[0]
+        return (page_count - free_pages) * page_size
+
+    def _evict_least_recent(self, count: int) -> int:
+        """Delete the ``count`` least recently accessed rows across both tables."""
+        if count <= 0:
+            return 0
+        connection = self._db()
+        # Rows written in one flush share their accessed_at, so ties are broken by
+        # rowid and exactly ``count`` rows are selected.
+        tables = ("dimension_cache", "file_dimension_cache")
+        victims = connection.execute(
+            "SELECT 0, rowid, accessed_at FROM dimension_cache "
+            "UNION ALL SELECT 1, rowid, accessed_at FROM file_dimension_cache "
+            "ORDER BY 3, 1, 2 LIMIT ?",
+            (count,),
+        ).fetchall()
+        removed = 0
+        with connection:
+            for index, table in enumerate(tables):
+                rowids = [(rowid,) for source, rowid, _ in victims if source == index]
+                if rowids:
+                    cursor = connection.executemany(f"DELETE FROM {table} WHERE rowid = ?", rowids)
+                    removed += cursor.rowcount
+        return removed
+
+    def evict(self) -> int:
+        """
+        Apply the TTL and size policies.
+
+        Removes expired rows (keeping URL entries with validators when ``revalidate``
+        is set), then the least recently accessed rows until the cache
+        holds at most ``max_entries`` rows and uses at most ``max_bytes`` bytes.
+        Evicted entries may still be served from the in-memory tier of this process.
+
+        Returns:
+            int: The number of rows removed.
+        """
+        self.flush()
+        connection = self._db()
+        removed = 0
+
+        if self.ttl is not None:
+            cutoff = time.time() - self.ttl
+            revalidatable = (
+                " AND etag IS NULL AND last_modified IS NULL" if self.revalidate else ""
+            )
+            with connection:
+                removed += connection.execute(
+                    f"DELETE FROM dimension_cache WHERE created_at < ?{revalidatable}",
+                    (cutoff,),
+                ).rowcount
+                removed += connection.execute(
+                    "DELETE FROM file_dimension_cache WHERE created_at < ?", (cutoff,)
+                ).rowcount
+
+        if self.max_entries is not None:
+            removed += self._evict_least_recent(self._count_entries() - self.max_entries)
+
+        if self.max_bytes is not None:
+            used = self._used_bytes()
+            if used > self.max_bytes:
+                entries = self._count_entries()
+                excess = math.ceil(entries * (1 - self.max_bytes / used))
+                removed += self._evict_least_recent(excess)
+
+        self._last_evict = time.monotonic()
+        return removed
+
+    def vacuum(self):
+        """Flush, checkpoint the write-ahead log and rebuild the database file to reclaim space."""
+        self.flush()
+        connection = self._db()
+        connection.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+        connection.execute("VACUUM")
+
+    def stats(self) -> dict:
+        """
+        Returns cache statistics.
+
+        Returns:
+            dict: ``url_entries`` and ``file_entries`` stored on disk, ``disk_bytes``
+                  of the database and its write-ahead log, ``hits``, ``misses`` and
+                  ``hit_ratio`` of lookups since the process started, and ``memory``
+                  statistics of the in-memory tier.
+        """
+        self.flush()
+        connection = self._db()
+        url_entries = connection.execute("SELECT COUNT(*) FROM dimension_cache").fetchone()[0]
+        file_entries = connection.execute(
+            "SELECT COUNT(*) FROM file_dimension_cache"
+        ).fetchone()[0]
+        disk_bytes = 0
+        if self._db_path != MEMORY_DB:
+            disk_bytes = sum(
+                os.path.getsize(f"{self._db_path}{suffix}")
+                for suffix in ("", "-wal")
+                if os.path.exists(f"{self._db_path}{suffix}")
+            )
+        lookups = _lookup_stats.hits + _lookup_stats.misses
+        return {
+            "url_entries": url_entries,
+            "file_entries": file_entries,
+            "entries": url_entries + file_entries,
+            "disk_bytes": disk_bytes,
+            "hits": _lookup_stats.hits,
+            "misses": _lookup_stats.misses,
+            "hit_ratio": _lookup_stats.hits / lookups if lookups else 0.0,
+            "memory": self.memory_cache.stats() if self.memory_cache is not None else None,
+        }
+
+
+class AsyncImageDimensionCache:
+    """
+    Asyncio wrapper around ImageDimensionCache.
+
+    The sqlite connection lives on a dedicated worker thread, so cache lookups never
+    block the event loop and the connection is only ever used from one thread.
+    Keyword arguments are passed to ``ImageDimensionCache``.
+    """
+
+    def __init__(self, **kwargs):
+        self._cache = ImageDimensionCache(**kwargs)
+        self._executor = None
+        # URLs served inline from the in-memory tier, handed to the cache thread with
+        # the next call so that their access time is recorded.
+        self._touched = set()
+
+    async def __aenter__(self):
+        """Open connection on the cache thread when entering context."""
+        self._executor = ThreadPoolExecutor(
+            max_workers=1, thread_name_prefix="image-token-cache"
+        )
+        await self._run(self._cache.__enter__)
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        """Close connection and stop the cache thread when exiting context."""
+        try:
+            await self._run(self._cache.__exit__, exc_type, exc_val, exc_tb)
+        finally:
+            self._executor.shutdown(wait=False)
+            self._executor = None
+
+    async def _run(self, func, *args):
+        if not self._executor:
             raise RuntimeError("Cache not initialized.")
+        if self._touched:
+            # The executor has a single thread, so this runs before func.
+            self._executor.submit(self._cache._touched_urls.update, self._touched)
+            self._touched = set()
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, func, *args)
+
+    async def get_cached_dimensions(self, url: str) -> Optional[tuple[int, int]]:
+        """Return (width, height) from cache if available, else None."""
+        # The in-memory tier is thread-safe and never blocks, so it is read inline.
+        entry = self._cache._memory_get(url)
+        if entry is not None and not self._cache.is_stale(entry):
+            _lookup_stats.record(hits=1)
+            self._touched.add(url)
+            return entry.width, entry.height
+        return await self._run(self._cache.get_cached_dimensions, url)
+
+    async def get_many(self, urls: Iterable[str]) -> dict[str, tuple[int, int]]:
+        """Look up many URLs at once. Misses are not included in the result."""
+        return await self._run(self._cache.get_many, list(urls))
+
+    async def cache_dimensions(self, url: str, width: int, height: int):
+        """Store the (width, height) for a URL in the cache."""
+        await self._run(self._cache.cache_dimensions, url, width, height)
+
+    async def bulk_put(self, items: Iterable[tuple[str, int, int]]):
+        """Store many (url, width, height) entries in a single transaction."""
+        await self._run(self._cache.bulk_put, list(items))
+
+    async def flush(self):
+        """Write all buffered entries in one transaction."""
+        await self._run(self._cache.flush)
+
+    async def delete_dimensions(self, url: str):
+        """Delete the cache for a URL"""
+        await self._run(self._cache.delete_dimensions, url)
+
+    async def evict(self) -> int:
+        """Apply the TTL and size policies. Returns the number of rows removed."""
+        return await self._run(self._cache.evict)
+
+    async def vacuum(self):
+        """Reclaim unused space in the database file."""
+        await self._run(self._cache.vacuum)
 
-        self._connection.execute("DELETE FROM dimension_cache WHERE url = ?", (url,))
-        self._connection.commit()
+    async def stats(self) -> dict:
+        """Returns cache statistics. See ``ImageDimensionCache.stats``."""
+        return await self._run(self._cache.stats)
@@ -0,0 +1,101 @@
+from collections import defaultdict, deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Iterable, Iterator, Optional
+from urllib.parse import urlparse
+from image_token.utils.http_utils import (
+    ImageFetchResult,
+    ImageFetchSession,
+    fetch_image_info,
+)
+from image_token.utils.metrics import NULL_METRICS, Metrics
+
+DEFAULT_MAX_WORKERS = 16
+DEFAULT_MAX_PER_HOST = 8
+
+
+def fetch_dimensions_concurrently(
+    urls: Iterable[str],
+    max_workers: int = DEFAULT_MAX_WORKERS,
+    max_per_host: int = DEFAULT_MAX_PER_HOST,
+    partial: bool = True,
+    session: ImageFetchSession = None,
+    validators: dict[str, tuple[Optional[str], Optional[str]]] = None,
+    metrics: Metrics = None,
+) -> Iterator[tuple[str, Optional[ImageFetchResult], Optional[Exception]]]:
+    """
+    Fetches the dimensions of many remote images with a bounded thread pool.
+
+    Results are yielded in completion order on the calling thread, so callers can
+    write them to a (single-threaded) ``ImageDimensionCache`` as they arrive.
+    Duplicate URLs are fetched once. With ``max_workers`` of 1 or less the URLs are
+    fetched one by one on the calling thread.
+
+    URLs are queued per host and only handed to the pool while their host has a free
+    slot, taking hosts in turn, so a host with many URLs never ties up workers that
+    other hosts could use.
+
+    Args:
+        urls (Iterable[str]): The image URLs.
+        max_workers (int): The number of worker threads.
+        max_per_host (int): The maximum number of concurrent requests to one host.
+        partial (bool): Only download the image headers. See ``fetch_image_dimensions``.
+        session (ImageFetchSession): The session shared by the workers. Defaults to
+                                     the process-wide session.
+        validators (dict): Optional (etag, last_modified) of cached copies by URL.
+                           These URLs are fetched with a conditional request.
+        metrics (Metrics): Records the time of every fetch as the ``network`` stage.
+
+    Yields:
+        tuple: (url, ImageFetchResult or None, exception or None).
+    """
+    validators = validators or {}
+    metrics = metrics or NULL_METRICS
+
+    def fetch(url):
+        etag, last_modified = validators.get(url, (None, None))
+        with metrics.time("network"):
+            return fetch_image_info(
+                url,
+                partial=partial,
+                session=session,
+                etag=etag,
+                last_modified=last_modified,
+            )
+
+    if max_workers is None or max_workers <= 1:
+        for url in dict.fromkeys(urls):
+            try:
+                yield url, fetch(url), None
+            except Exception as err:
+                yield url, None, err
+        return
+
+    queues = defaultdict(deque)
+    for url in dict.fromkeys(urls):
+        queues[urlparse(url).netloc].append(url)
+    # Hosts with queued URLs and a free slot, in turn.
+    ready = deque(queues)
+    active = dict.fromkeys(queues, 0)
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        futures = {}
+        while ready or futures:
+            while ready and len(futures) < max_workers:
+                host = ready.popleft()
+                url = queues[host].popleft()
+                futures[executor.submit(fetch, url)] = (url, host)
+                active[host] += 1
+                if queues[host] and active[host] < max_per_host:
+                    ready.append(host)
+
+            done, _ = wait(futures, return_when=FIRST_COMPLETED)
+            for future in done:
+                url, host = futures.pop(future)
+                active[host] -= 1
+                if queues[host] and active[host] == max_per_host - 1:
+                    # The host was waiting for this slot.
+                    ready.append(host)
+                try:
+                    yield url, future.result(), None
+                except Exception as err:
+                    yield url, None, err
@@ -0,0 +1,363 @@
+import threading
+from typing import TYPE_CHECKING, NamedTuple, Optional
+from image_token.utils.image_header import (
+    MAX_HEADER_BYTES,
+    get_image_dimensions_from_header,
+)
+from image_token.utils.utils import get_image_dimensions_from_bytes
+
+if TYPE_CHECKING:
+    import requests
+
+# Size of the first Range request. Doubled on every follow-up request until the
+# header parser succeeds or MAX_HEADER_BYTES is reached.
+INITIAL_RANGE_BYTES = 16 * 1024
+
+STREAM_CHUNK_BYTES = 8 * 1024
+
+# Number of hosts with a cached connection pool, and keep-alive connections per host.
+DEFAULT_POOL_CONNECTIONS = 16
+DEFAULT_POOL_MAXSIZE = 32
+
+# (connect, read) timeouts in seconds.
+DEFAULT_TIMEOUT = (5.0, 30.0)
+
+
+class _ConnectionCounter:
+    def __init__(self):
+        self.requests = 0
+        self.connections = 0
+        self._lock = threading.Lock()
+
+    def add_request(self):
+        with self._lock:
+            self.requests += 1
+
+    def add_connection(self):
+        with self._lock:
+            self.connections += 1
+
+
+def _counting_pool_class(base, counter):
+    class CountingConnectionPool(base):
+        def _new_conn(self):
+            counter.add_connection()
+            return super()._new_conn()
+
+    return CountingConnectionPool
+
+
+_counting_adapter_class = None
+
+
+def _counting_adapter(counter: _ConnectionCounter, **kwargs):
+    # requests is imported on first use, so that importing the package stays fast.
+    global _counting_adapter_class
+    if _counting_adapter_class is None:
+        from requests.adapters import HTTPAdapter
+        from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+
+        class CountingHTTPAdapter(HTTPAdapter):
+            def __init__(self, counter: _ConnectionCounter, **kwargs):
+                self._counter = counter
+                super().__init__(**kwargs)
+
+            def init_poolmanager(self, *args, **kwargs):
+                super().init_poolmanager(*args, **kwargs)
+                self.poolmanager.pool_classes_by_scheme = {
+                    "http": _counting_pool_class(HTTPConnectionPool, self._counter),
+                    "https": _counting_pool_class(HTTPSConnectionPool, self._counter),
+                }
+
+        _counting_adapter_class = CountingHTTPAdapter
+    return _counting_adapter_class(counter, **kwargs)
+
+
+class ImageFetchSession:
+    """
+    A reusable HTTP session for image fetches.
+
+    Wraps a ``requests.Session`` with keep-alive connection pools sized per host and
+    default timeouts, and counts how many requests reused an open connection. The
+    session is thread-safe for the GET requests issued by the fetch helpers.
+
+    Args:
+        pool_connections (int): The number of hosts to keep a connection pool for.
+        pool_maxsize (int): The number of keep-alive connections kept per host.
+        timeout (float | tuple[float, float]): Default (connect, read) timeout.
+        max_retries (int): Retries for failed connections.
+        headers (dict): Extra headers sent with every request.
+    """
+
+    def __init__(
+        self,
+        pool_connections: int = DEFAULT_POOL_CONNECTIONS,
+        pool_maxsize: int = DEFAULT_POOL_MAXSIZE,
+        timeout=DEFAULT_TIMEOUT,
+        max_retries: int = 0,
+        headers: dict = None,
+    ):
+        import requests
+
+        self.timeout = timeout
+        self._counter = _ConnectionCounter()
+        self.session = requests.Session()
+        if headers:
+            self.session.headers.update(headers)
+        adapter = _counting_adapter(
+            self._counter,
+            pool_connections=pool_connections,
+            pool_maxsize=pool_maxsize,
+            max_retries=max_retries,
+        )
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def get(self, url: str, **kwargs) -> "requests.Response":
+        """Send a GET request with the session defaults."""
+        kwargs.setdefault("timeout", self.timeout)
+        self._counter.add_request()
+        return self.session.get(url, **kwargs)
+
+    def stats(self) -> dict:
+        """
+        Returns connection reuse counters.
+
+        Returns:
+            dict: ``requests`` sent, ``connections`` opened and ``reused`` requests
+                  that were served over an already open connection.
+        """
+        requests_sent = self._counter.requests
+        connections = self._counter.connections
+        return {
+            "requests": requests_sent,
+            "connections": connections,
+            "reused": max(requests_sent - connections, 0),
+        }
+
+    def close(self):
+        """Close all pooled connections."""
+        self.session.close()
+
+
+_default_session = None
+_default_session_lock = threading.Lock()
+
+
+def get_default_session() -> ImageFetchSession:
+    """Returns the process-wide session shared by all image fetches."""
+    global _default_session
+    with _default_session_lock:
+        if _default_session is None:
+            _default_session = ImageFetchSession()
+        return _default_session
+
+
+def set_default_session(session: Optional[ImageFetchSession]):
+    """
+    Replaces the process-wide session, e.g. to tune pool sizes or timeouts for a CDN.
+
+    Args:
+        session (ImageFetchSession): The new session, or None to create a default
+                                     one on next use.
+    """
+    global _default_session
+    with _default_session_lock:
+        previous, _default_session = _default_session, session
+    if previous is not None and previous is not session:
+        previous.close()
+
+
+def _drain(response) -> int:
+    # Reading the (small) rest of a range response lets the connection go back to
+    # the pool instead of being closed.
+    drained = 0
+    for chunk in response.iter_content(chunk_size=STREAM_CHUNK_BYTES):
+        drained += len(chunk)
+    return drained
+
+
+def _stream_dimensions(response, buffer: bytearray) -> Optional[tuple[int, int]]:
+    """Append the response body to buffer, stopping as soon as the header parses."""
+    for chunk in response.iter_content(chunk_size=STREAM_CHUNK_BYTES):
+        buffer += chunk
+        dims = get_image_dimensions_from_header(buffer)
+        if dims is not None:
+            return dims
+    return None
+
+
+class ImageFetchResult(NamedTuple):
+    """
+    The outcome of an image fetch.
+
+    ``dimensions`` is None when the server answered 304 Not Modified
+    (``not_modified``) or the body is not a readable image. ``bytes_read`` is the
+    number of body bytes downloaded over all requests of the fetch.
+    """
+
+    dimensions: Optional[tuple[int, int]]
+    etag: Optional[str] = None
+    last_modified: Optional[str] = None
+    not_modified: bool = False
+    bytes_read: int = 0
+
+
+def _conditional_headers(etag: Optional[str], last_modified: Optional[str]) -> dict:
+    headers = {}
+    if etag is not None:
+        headers["If-None-Match"] = etag
+    if last_modified is not None:
+        headers["If-Modified-Since"] = last_modified
+    return headers
+
+
+def _fetch_result(response, dimensions) -> ImageFetchResult:
+    return ImageFetchResult(
+        dimensions,
+        etag=response.headers.get("ETag"),
+        last_modified=response.headers.get("Last-Modified"),
+    )
+
+
+def fetch_image_info(
+    url: str,
+    partial: bool = True,
+    range_bytes: int = INITIAL_RANGE_BYTES,
+    max_header_bytes: int = MAX_HEADER_BYTES,
+    session: ImageFetchSession = None,
+    etag: Optional[str] = None,
+    last_modified: Optional[str] = None,
+) -> ImageFetchResult:
+    """
+    Fetches the dimensions of a remote image together with its cache validators.
+
+    Works like ``fetch_image_dimensions``. When ``etag`` or ``last_modified`` is given
+    the first request is conditional (``If-None-Match`` / ``If-Modified-Since``); if
+    the server answers 304 Not Modified no body is transferred and the result has
+    ``not_modified`` set.
+
+    Args:
+        url (str): The URL of the image.
+        partial (bool): If False, download the full body as a single request.
+        range_bytes (int): Size of the first range request.
+        max_header_bytes (int): Give up on partial reads after this many bytes.
+        session (ImageFetchSession): The session to use. Defaults to the shared session.
+        etag (str): The ``ETag`` of the cached copy.
+        last_modified (str): The ``Last-Modified`` date of the cached copy.
+
+    Raises:
+        requests.exceptions.HTTPError: If the server returns an error status.
+
+    Returns:
+        ImageFetchResult: The dimensions and the validators of the response.
+    """
+    session = session or get_default_session()
+    headers = _conditional_headers(etag, last_modified)
+
+    if not partial:
+        response = session.get(url, headers=headers)
+        if response.status_code == 304:
+            return ImageFetchResult(None, etag, last_modified, not_modified=True)
+        response.raise_for_status()
+        content = response.content
+        return _fetch_result(response, get_image_dimensions_from_bytes(content))._replace(
+            bytes_read=len(content)
+        )
+
+    buffer = bytearray()
+    result = None
+    # Body bytes of earlier requests that are no longer in the buffer.
+    discarded = 0
+    while len(buffer) < max_header_bytes:
+        start = len(buffer)
+        end = start + range_bytes - 1
+        headers["Range"] = f"bytes={start}-{end}"
+        with session.get(url, headers=headers, stream=True) as response:
+            if response.status_code == 304:
+                return ImageFetchResult(None, etag, last_modified, not_modified=True)
+            if response.status_code == 416:
+                # Requested range starts past the end of the image.
+                break
+            response.raise_for_status()
+            # Only the first request is conditional; its validators describe the body.
+            headers = {}
+            result = result or _fetch_result(response, None)
+
+            if response.status_code != 206:
+                # Range ignored: the body starts at byte 0 and runs to the end.
+                discarded += len(buffer)
+                buffer = bytearray()
+                dims = _stream_dimensions(response, buffer)
+                if dims is None:
+                    dims = get_image_dimensions_from_bytes(bytes(buffer))
+                return result._replace(dimensions=dims, bytes_read=discarded + len(buffer))
+
+            dims = _stream_dimensions(response, buffer)
+            if dims is not None:
+                drained = _drain(response)
+                return result._replace(
+                    dimensions=dims, bytes_read=discarded + len(buffer) + drained
+                )
+
+        if len(buffer) <= end:
+            # Short read: the whole image is already in the buffer.
+            return result._replace(
+                dimensions=get_image_dimensions_from_bytes(bytes(buffer)),
+                bytes_read=discarded + len(buffer),
+            )
+        range_bytes *= 2
+
+    if len(buffer) < max_header_bytes:
+        dims = get_image_dimensions_from_bytes(bytes(buffer))
+        return (result or ImageFetchResult(None))._replace(
+            dimensions=dims, bytes_read=discarded + len(buffer)
+        )
+    full = fetch_image_info(url, partial=False, session=session)
+    return full._replace(bytes_read=discarded + len(buffer) + full.bytes_read)
+
+
+def fetch_image_dimensions(
+    url: str,
+    partial: bool = True,
+    range_bytes: int = INITIAL_RANGE_BYTES,
+    max_header_bytes: int = MAX_HEADER_BYTES,
+    session: ImageFetchSession = None,
+) -> Optional[tuple[int, int]]:
+    """
+    Fetches the dimensions of a remote image, downloading as little of it as possible.
+
+    In partial mode the image is requested with ``Range: bytes=0-N`` and streamed;
+    the connection is closed as soon as the header parser can read the dimensions.
+    If the header lies deeper than N bytes (e.g. JPEGs with large EXIF blocks) the
+    next range is requested with twice the size. Servers that ignore ``Range`` are
+    streamed from the start and aborted early in the same way. Only when the header
+    is not found within ``max_header_bytes`` is the whole image downloaded.
+
+    Args:
+        url (str): The URL of the image.
+        partial (bool): If False, download the full body as a single request.
+        range_bytes (int): Size of the first range request.
+        max_header_bytes (int): Give up on partial reads after this many bytes.
+        session (ImageFetchSession): The session to use. Defaults to the shared session.
+
+    Raises:
+        requests.exceptions.HTTPError: If the server returns an error status.
+
+    Returns:
+        tuple[int, int]: The (width, height) of the image, or None if the body is
+                         not a readable image.
+    """
+    return fetch_image_info(
+        url,
+        partial=partial,
+        range_bytes=range_bytes,
+        max_header_bytes=max_header_bytes,
+        session=session,
+    ).dimensions
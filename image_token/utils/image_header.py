@@ -0,0 +1,149 @@
+import struct
+from typing import Optional
+
+# Number of bytes read up front; enough for PNG, GIF, BMP and WebP headers and for
+# most JPEGs whose SOF marker sits right after a small APP0/APP1 segment.
+HEADER_PROBE_BYTES = 512
+
+# Upper bound for growing the probe buffer before giving up and handing the file to
+# Pillow. JPEG APP segments are capped at 64 KiB each, so this covers a handful of them.
+MAX_HEADER_BYTES = 1024 * 1024
+
+# SOFn markers carry the frame dimensions. C4 (DHT), C8 (JPG) and CC (DAC) share the
+# range but are not frame headers.
+_JPEG_SOF_MARKERS = frozenset(
+    (0xC0, 0xC1, 0xC2, 0xC3, 0xC5, 0xC6, 0xC7, 0xC9, 0xCA, 0xCB, 0xCD, 0xCE, 0xCF)
+)
+
+# Markers without a length field.
+_JPEG_STANDALONE_MARKERS = frozenset((0x01, 0xD0, 0xD1, 0xD2, 0xD3, 0xD4, 0xD5, 0xD6, 0xD7))
+
+
+def sniff_image_format(data: bytes) -> Optional[str]:
+    """
+    Identifies the image format from its leading magic bytes.
+
+    Args:
+        data (bytes): The first bytes of the image.
+
+    Returns:
+        str: One of "png", "jpeg", "gif", "bmp" or "webp", or None if the
+             signature is not recognised.
+    """
+    if data[:8] == b"\x89PNG\r\n\x1a\n":
+        return "png"
+    if data[:3] == b"\xff\xd8\xff":
+        return "jpeg"
+    if data[:6] in (b"GIF87a", b"GIF89a"):
+        return "gif"
+    if data[:2] == b"BM":
+        return "bmp"
+    if data[:4] == b"RIFF" and data[8:12] == b"WEBP":
+        return "webp"
+    return None
+
+
+def _png_dims(data: bytes) -> Optional[tuple[int, int]]:
+    if len(data) < 24 or data[12:16] != b"IHDR":
+        return None
+    return struct.unpack(">II", data[16:24])
+
+
+def _gif_dims(data: bytes) -> Optional[tuple[int, int]]:
+    if len(data) < 10:
+        return None
+    return struct.unpack("<HH", data[6:10])
+
+
+def _bmp_dims(data: bytes) -> Optional[tuple[int, int]]:
+    if len(data) < 18:
+        return None
+    header_size = struct.unpack("<I", data[14:18])[0]
+    if header_size == 12:
+        if len(data) < 22:
+            return None
+        return struct.unpack("<HH", data[18:22])
+    if len(data) < 26:
+        return None
+    width, height = struct.unpack("<ii", data[18:26])
+    # Negative height marks a top-down bitmap.
+    return abs(width), abs(height)
+
+
+def _webp_dims(data: bytes) -> Optional[tuple[int, int]]:
+    if len(data) < 30:
+        return None
+    chunk = data[12:16]
+    if chunk == b"VP8 ":
+        if data[23:26] != b"\x9d\x01\x2a":
+            return None
+        width, height = struct.unpack("<HH", data[26:30])
+        return width & 0x3FFF, height & 0x3FFF
+    if chunk == b"VP8L":
+        if data[20] != 0x2F:
+            return None
+        bits = int.from_bytes(data[21:25], "little")
+        return (bits & 0x3FFF) + 1, ((bits >> 14) & 0x3FFF) + 1
+    if chunk == b"VP8X":
+        width = int.from_bytes(data[24:27], "little") + 1
+        height = int.from_bytes(data[27:30], "little") + 1
+        return width, height
+    return None
+
+
+def _jpeg_dims(data: bytes) -> Optional[tuple[int, int]]:
+    offset = 2
+    size = len(data)
+    while offset + 4 <= size:
+        if data[offset] != 0xFF:
+            return None
+        marker = data[offset + 1]
+        if marker == 0xFF:
+            # Fill byte before a marker.
+            offset += 1
+            continue
+        if marker in _JPEG_STANDALONE_MARKERS:
+            offset += 2
+            continue
+        if marker == 0xD9 or marker == 0xDA:
+            # End of image or start of scan before any frame header.
+            return None
+        segment_length = struct.unpack(">H", data[offset + 2 : offset + 4])[0]
+        if marker in _JPEG_SOF_MARKERS:
+            if offset + 9 > size:
+                return None
+            height, width = struct.unpack(">HH", data[offset + 5 : offset + 9])
+            return width, height
+        offset += 2 + segment_length
+    return None
+
+
+_PARSERS = {
+    "png": _png_dims,
+    "jpeg": _jpeg_dims,
+    "gif": _gif_dims,
+    "bmp": _bmp_dims,
+    "webp": _webp_dims,
+}
+
+
+def get_image_dimensions_from_header(data: bytes) -> Optional[tuple[int, int]]:
+    """
+    Reads the image dimensions from the leading bytes of an image without decoding it.
+
+    Supports PNG (IHDR), JPEG (SOFn marker scan), GIF, BMP and WebP (VP8, VP8L, VP8X).
+
+    Args:
+        data (bytes): The first bytes of the image. May be a prefix of the file.
+
+    Returns:
+        tuple[int, int]: The (width, height) of the image, or None if the format is
+                         unknown or the buffer ends before the dimensions.
+    """
+    image_format = sniff_image_format(data)
+    if image_format is None:
+        return None
+    dims = _PARSERS[image_format](data)
+    if dims is None or dims[0] <= 0 or dims[1] <= 0:
+        return None
+    return dims
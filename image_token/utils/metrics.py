@@ -0,0 +1,256 @@
+import functools
+import math
+import threading
+import time
+from bisect import bisect_left
+from contextlib import nullcontext
+from typing import Callable
+
+# Upper bounds in seconds of the stage timer histograms.
+TIME_BUCKETS = (0.0001, 0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0)
+
+# Upper bounds in bytes of size histograms, e.g. the bytes downloaded per image.
+SIZE_BUCKETS = (1024, 4096, 16384, 65536, 262144, 1048576, 4194304)
+
+
+class Histogram:
+    """
+    Counts observations into buckets with fixed upper bounds.
+
+    Args:
+        buckets (tuple): The upper bounds, in increasing order. An implicit
+                         ``+Inf`` bucket catches larger values.
+    """
+
+    __slots__ = ("bounds", "counts", "sum", "count")
+
+    def __init__(self, buckets: tuple = TIME_BUCKETS):
+        self.bounds = tuple(buckets) + (math.inf,)
+        self.counts = [0] * len(self.bounds)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float):
+        self.counts[bisect_left(self.bounds, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def cumulative(self) -> list[tuple[float, int]]:
+        """Returns (upper bound, number of observations <= bound) per bucket."""
+        total = 0
+        buckets = []
+        for bound, count in zip(self.bounds, self.counts):
+            total += count
+            buckets.append((bound, total))
+        return buckets
+
+
+class _Timer:
+    __slots__ = ("_metrics", "_stage", "_start")
+
+    def __init__(self, metrics: "Metrics", stage: str):
+        self._metrics = metrics
+        self._stage = stage
+
+    def __enter__(self):
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self._metrics.add_time(self._stage, time.perf_counter() - self._start)
+
+
+class Metrics:
+    """
+    Collects per-stage timings, counters and histograms of a run.
+
+    Pass an instance as ``metrics`` to get_token, get_cost or iter_tokens; one
+    instance can be shared by several runs and threads. Stages are:
+
+    - ``listing``: scanning folders for image files, one observation per batch.
+    - ``header_decode``: reading image headers from disk, one observation per file.
+      With ``workers`` it is the time spent waiting for the pool, one per chunk.
+    - ``network``: fetching URLs, one observation per URL. Concurrent fetches add up,
+      so the total can exceed the wall time.
+    - ``sqlite``: dimension cache lookups and writes.
+    - ``token_math``: computing token counts from dimensions.
+    - ``total``: the whole get_token call.
+
+    Counters are ``files_seen``, ``files_skipped_extension``, ``dirs_unreadable``,
+    ``cache_hits``, ``cache_misses``, ``http_fetches``, ``http_bytes`` (body bytes downloaded),
+    ``images`` and ``errors``. ``http_bytes_per_image`` is a histogram.
+
+    Args:
+        time_buckets (tuple): Upper bounds in seconds of the stage histograms.
+    """
+
+    def __init__(self, time_buckets: tuple = TIME_BUCKETS):
+        self.time_buckets = time_buckets
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        """Discards everything recorded so far."""
+        with self._lock:
+            self.stages: dict[str, Histogram] = {}
+            self.counters: dict[str, float] = {}
+            self.histograms: dict[str, Histogram] = {}
+
+    def time(self, stage: str) -> _Timer:
+        """Returns a context manager that adds the time spent in it to ``stage``."""
+        return _Timer(self, stage)
+
+    def timed(self, stage: str, func: Callable) -> Callable:
+        """
+        Wraps ``func`` so that every call is recorded as an observation of ``stage``.
+
+        Per-item loops wrap their function once instead of entering a timer per item,
+        so that nothing is added to them when metrics are disabled.
+        """
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                self.add_time(stage, time.perf_counter() - start)
+
+        return wrapper
+
+    def add_time(self, stage: str, seconds: float):
+        """Adds one observation of ``seconds`` to ``stage``."""
+        with self._lock:
+            histogram = self.stages.get(stage)
+            if histogram is None:
+                histogram = self.stages[stage] = Histogram(self.time_buckets)
+            histogram.observe(seconds)
+
+    def count(self, name: str, value: float = 1):
+        """Increments the counter ``name`` by ``value``."""
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + value
+
+    def observe(self, name: str, value: float, buckets: tuple = SIZE_BUCKETS):
+        """
+        Adds ``value`` to the histogram ``name``.
+
+        Args:
+            name (str): The histogram.
+            value (float): The observed value.
+            buckets (tuple): The upper bounds, used when the histogram is created.
+        """
+        with self._lock:
+            histogram = self.histograms.get(name)
+            if histogram is None:
+                histogram = self.histograms[name] = Histogram(buckets)
+            histogram.observe(value)
+
+    def to_dict(self) -> dict:
+        """
+        Returns a JSON-serializable snapshot.
+
+        Returns:
+            dict: ``stages`` ({stage: {"seconds", "count", "buckets"}}), ``counters``
+                  and ``histograms`` ({name: {"sum", "count", "buckets"}}). Buckets map
+                  each upper bound (``"+Inf"`` for the last) to the cumulative count.
+        """
+        with self._lock:
+            return {
+                "stages": {
+                    stage: {
+                        "seconds": histogram.sum,
+                        "count": histogram.count,
+                        "buckets": _buckets_dict(histogram),
+                    }
+                    for stage, histogram in self.stages.items()
+                },
+                "counters": dict(self.counters),
+                "histograms": {
+                    name: {
+                        "sum": histogram.sum,
+                        "count": histogram.count,
+                        "buckets": _buckets_dict(histogram),
+                    }
+                    for name, histogram in self.histograms.items()
+                },
+            }
+
+    def to_prometheus(self, prefix: str = "image_token") -> str:
+        """
+        Renders the metrics in the Prometheus text exposition format.
+
+        Stages become the ``<prefix>_stage_seconds`` histogram with a ``stage`` label,
+        counters ``<prefix>_<name>_total`` and histograms ``<prefix>_<name>``.
+
+        Args:
+            prefix (str): The prefix of the metric names.
+
+        Returns:
+            str: The exposition text, ending with a newline.
+        """
+        lines = []
+        with self._lock:
+            if self.stages:
+                name = f"{prefix}_stage_seconds"
+                lines.append(f"# HELP {name} Time spent per stage.")
+                lines.append(f"# TYPE {name} histogram")
+                for stage, histogram in sorted(self.stages.items()):
+                    lines.extend(_histogram_lines(name, histogram, f'stage="{stage}"'))
+            for counter, value in sorted(self.counters.items()):
+                name = f"{prefix}_{counter}_total"
+                lines.append(f"# TYPE {name} counter")
+                lines.append(f"{name} {_format_value(value)}")
+            for histogram_name, histogram in sorted(self.histograms.items()):
+                name = f"{prefix}_{histogram_name}"
+                lines.append(f"# TYPE {name} histogram")
+                lines.extend(_histogram_lines(name, histogram, ""))
+        return "\n".join(lines) + "\n" if lines else ""
+
+
+class _NullMetrics:
+    """Stands in for a Metrics when none is given; records nothing."""
+
+    _context = nullcontext()
+
+    def time(self, stage: str):
+        return self._context
+
+    def timed(self, stage: str, func: Callable) -> Callable:
+        return func
+
+    def add_time(self, stage: str, seconds: float):
+        pass
+
+    def count(self, name: str, value: float = 1):
+        pass
+
+    def observe(self, name: str, value: float, buckets: tuple = SIZE_BUCKETS):
+        pass
+
+
+NULL_METRICS = _NullMetrics()
+
+
+def _format_bound(bound: float) -> str:
+    return "+Inf" if bound == math.inf else repr(float(bound))
+
+
+def _format_value(value: float) -> str:
+    return str(value) if isinstance(value, int) else repr(float(value))
+
+
+def _buckets_dict(histogram: Histogram) -> dict:
+    return {_format_bound(bound): count for bound, count in histogram.cumulative()}
+
+
+def _histogram_lines(name: str, histogram: Histogram, labels: str) -> list[str]:
+    separator = "," if labels else ""
+    lines = [
+        f'{name}_bucket{{{labels}{separator}le="{_format_bound(bound)}"}} {count}'
+        for bound, count in histogram.cumulative()
+    ]
+    suffix = f"{{{labels}}}" if labels else ""
+    lines.append(f"{name}_sum{suffix} {_format_value(histogram.sum)}")
+    lines.append(f"{name}_count{suffix} {histogram.count}")
+    return lines
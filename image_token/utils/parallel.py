@@ -0,0 +1,276 @@
+from array import array
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor
+from contextlib import ExitStack
+from itertools import islice
+from typing import Container, Iterable, Iterator
+from image_token.utils.caching_utils import ImageDimensionCache
+from image_token.utils.metrics import NULL_METRICS, Metrics
+from image_token.utils.utils import read_image_dims, scan_images
+from image_token.utils.validate import check_allowed_extensions
+
+DEFAULT_CHUNK_SIZE = 256
+
+EXECUTORS = {
+    "process": ProcessPoolExecutor,
+    "thread": ThreadPoolExecutor,
+}
+
+
+# Width and height reported by workers for files that could not be read.
+UNREADABLE = -1
+
+
+def _read_dims_chunk(paths: list[str], record_errors: bool = False) -> tuple[array, array]:
+    """
+    Worker entry point: returns the widths and heights of a chunk as flat arrays.
+
+    With ``record_errors`` an unreadable file gets UNREADABLE as its width and height
+    instead of failing the chunk.
+    """
+    widths = array("l")
+    heights = array("l")
+    for path in paths:
+        check_allowed_extensions(path=path)
+        try:
+            width, height = read_image_dims(path=path)
+        except Exception:
+            if not record_errors:
+                raise
+            width = height = UNREADABLE
+        widths.append(width)
+        heights.append(height)
+    return widths, heights
+
+
+def _read_dims_or_error(path: str):
+    """Returns the (width, height) of a file, or the exception raised reading it."""
+    try:
+        return read_image_dims(path=path)
+    except Exception as err:
+        return err
+
+
+def _chunked(items: Iterable, chunk_size: int) -> Iterator[list]:
+    iterator = iter(items)
+    while True:
+        chunk = list(islice(iterator, chunk_size))
+        if not chunk:
+            return
+        yield chunk
+
+
+class DimensionReaderPool:
+    """
+    A pool of workers that read image dimensions.
+
+    Args:
+        workers (int): The number of worker processes or threads.
+        executor (str): "process" or "thread". Defaults to "process".
+        chunk_size (int): The number of files handed to a worker at a time.
+
+    Raises:
+        ValueError: If the executor type is unknown.
+    """
+
+    def __init__(
+        self, workers: int, executor: str = "process", chunk_size: int = DEFAULT_CHUNK_SIZE
+    ):
+        if executor not in EXECUTORS:
+            raise ValueError(
+                f"Invalid executor: {executor}. Supported executors are : {list(EXECUTORS)}"
+            )
+        self.workers = workers
+        self.executor = executor
+        self.chunk_size = chunk_size
+        self._pool = None
+
+    def __enter__(self):
+        self._pool = EXECUTORS[self.executor](max_workers=self.workers)
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self._pool.shutdown(cancel_futures=exc_type is not None)
+        self._pool = None
+
+    def submit(self, paths: list[str], record_errors: bool = False) -> Future:
+        """
+        Hands one chunk of files to a worker.
+
+        Args:
+            paths (list[str]): The image file paths of the chunk.
+            record_errors (bool): See ``read``.
+
+        Returns:
+            Future: Resolves to the (widths, heights) arrays of the chunk.
+        """
+        return self._pool.submit(_read_dims_chunk, paths, record_errors)
+
+    def read(
+        self, paths: Iterable[str], record_errors: bool = False
+    ) -> Iterator[tuple[list[str], array, array]]:
+        """
+        Reads the dimensions of the given files.
+
+        The paths are consumed lazily; at most ``2 * workers`` chunks are in flight,
+        so memory stays bounded for arbitrarily large inputs. Workers send back two
+        integer arrays per chunk instead of per-file objects.
+
+        Args:
+            paths (Iterable[str]): The image file paths.
+            record_errors (bool): Report unreadable files with UNREADABLE as width and
+                                  height instead of raising.
+
+        Raises:
+            ValueError: If a file has an invalid extension.
+
+        Yields:
+            tuple: (chunk paths, widths, heights), in input order.
+        """
+        pending = deque()
+        for chunk in _chunked(paths, self.chunk_size):
+            pending.append((chunk, self.submit(chunk, record_errors)))
+            if len(pending) >= 2 * self.workers:
+                chunk, future = pending.popleft()
+                yield (chunk, *future.result())
+        while pending:
+            chunk, future = pending.popleft()
+            yield (chunk, *future.result())
+
+
+def read_image_dims_parallel(
+    paths: Iterable[str],
+    workers: int,
+    executor: str = "process",
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+) -> Iterator[tuple[list[str], array, array]]:
+    """
+    Reads image dimensions on a pool of workers. See ``DimensionReaderPool.read``.
+
+    Args:
+        paths (Iterable[str]): The image file paths.
+        workers (int): The number of worker processes or threads.
+        executor (str): "process" or "thread". Defaults to "process".
+        chunk_size (int): The number of files handed to a worker at a time.
+
+    Yields:
+        tuple: (chunk paths, widths, heights), in input order.
+    """
+    with DimensionReaderPool(workers, executor=executor, chunk_size=chunk_size) as pool:
+        yield from pool.read(paths)
+
+
+def iter_folder_dims(
+    path: str,
+    workers: int = None,
+    executor: str = "process",
+    cache: ImageDimensionCache = None,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    skip: Container[str] = None,
+    metrics: Metrics = None,
+    record_errors: bool = False,
+) -> Iterator[tuple[str, int, int]]:
+    """
+    Yields the dimensions of every image under a folder, in scan order.
+
+    Args:
+        path (str): The path to the folder containing the images.
+        workers (int): The number of workers reading headers. None or 1 reads serially.
+        executor (str): "process" or "thread" workers.
+        cache (ImageDimensionCache): An open cache. Files whose path, size, mtime and
+                                     inode match a cached entry are not read at all.
+        chunk_size (int): The number of files handed to a worker at a time.
+        skip (Container[str]): Paths to leave out without reading them.
+        metrics (Metrics): Records the ``listing``, ``header_decode`` and ``sqlite``
+                           stages and the ``files_seen`` and cache counters.
+        record_errors (bool): Yield unreadable files as (file path, None, exception)
+                              and carry on, instead of raising.
+
+    Yields:
+        tuple: (file path, width, height).
+    """
+    parallel = workers is not None and workers > 1
+    metrics = metrics or NULL_METRICS
+    read_dims = metrics.timed(
+        "header_decode", _read_dims_or_error if record_errors else read_image_dims
+    )
+
+    def finish(batch, dims, misses, future):
+        if future is not None:
+            with metrics.time("header_decode"):
+                widths, heights = future.result()
+            for i, width, height in zip(misses, widths, heights):
+                if width == UNREADABLE:
+                    # Read the file again here for the exception.
+                    dims[i] = _read_dims_or_error(batch[i].path)
+                else:
+                    dims[i] = (width, height)
+
+        if cache is not None:
+            with metrics.time("sqlite"):
+                for i in misses:
+                    entry = batch[i]
+                    if isinstance(dims[i], Exception):
+                        continue
+                    cache.cache_file_dimensions(
+                        entry.path, entry.size, entry.mtime_ns, entry.inode, *dims[i]
+                    )
+
+        for entry, found in zip(batch, dims):
+            if isinstance(found, Exception):
+                metrics.count("errors")
+                yield entry.path, None, found
+            else:
+                yield entry.path, *found
+
+    with ExitStack() as stack:
+        if parallel:
+            pool = stack.enter_context(
+                DimensionReaderPool(workers, executor=executor, chunk_size=chunk_size)
+            )
+        entries = scan_images(path, metrics=metrics)
+        if skip:
+            entries = (entry for entry in entries if entry.path not in skip)
+        batches = _chunked(entries, chunk_size)
+        # Chunks waiting to be yielded, in scan order, and how many of them have a
+        # future still in flight. Listing and cache lookups go on while workers read,
+        # and only the oldest chunk is waited for once 2 * workers are in flight.
+        pending = deque()
+        in_flight = 0
+        while True:
+            with metrics.time("listing"):
+                batch = next(batches, None)
+            if batch is None:
+                break
+            metrics.count("files_seen", len(batch))
+
+            dims = [None] * len(batch)
+            if cache is not None:
+                with metrics.time("sqlite"):
+                    for i, entry in enumerate(batch):
+                        dims[i] = cache.get_cached_file_dimensions(
+                            entry.path, entry.size, entry.mtime_ns, entry.inode
+                        )
+            misses = [i for i, found in enumerate(dims) if not found]
+            if cache is not None:
+                metrics.count("cache_hits", len(batch) - len(misses))
+                metrics.count("cache_misses", len(misses))
+
+            future = None
+            if parallel and misses:
+                future = pool.submit([batch[i].path for i in misses], record_errors)
+                in_flight += 1
+            else:
+                for i in misses:
+                    check_allowed_extensions(path=batch[i].path)
+                    dims[i] = read_dims(path=batch[i].path)
+            pending.append((batch, dims, misses, future))
+
+            while pending and (pending[0][3] is None or in_flight >= 2 * workers):
+                head = pending.popleft()
+                if head[3] is not None:
+                    in_flight -= 1
+                yield from finish(*head)
+
+        while pending:
+            yield from finish(*pending.popleft())
@@ -0,0 +1,16 @@
+from typing import NamedTuple, Optional
+
+
+class TokenRecord(NamedTuple):
+    """
+    The result for one image, as yielded by ``iter_tokens``.
+
+    ``width`` and ``height`` are None and ``tokens`` is -1 when the image could not be
+    read; ``error`` then holds the reason.
+    """
+
+    source: str
+    width: Optional[int]
+    height: Optional[int]
+    tokens: int
+    error: Optional[str] = None
@@ -0,0 +1,209 @@
+import csv
+import json
+import os
+import time
+from typing import Optional
+from image_token.utils.records import TokenRecord
+
+CSV_FIELDS = list(TokenRecord._fields)
+
+# Streaming sinks flush buffered records at least this often, in seconds.
+DEFAULT_FLUSH_INTERVAL = 1.0
+
+
+def infer_format(path: str) -> str:
+    """
+    Infers the output format from a file name.
+
+    Args:
+        path (str): The output file path.
+
+    Returns:
+        str: "ndjson" for .ndjson / .jsonl, "csv" for .csv, else "json".
+    """
+    ext = os.path.splitext(str(path))[1].lower()
+    if ext in (".ndjson", ".jsonl"):
+        return "ndjson"
+    if ext == ".csv":
+        return "csv"
+    return "json"
+
+
+class JsonSink:
+    """
+    Writes ``{source: tokens}`` as one indented JSON object when closed.
+
+    This is the original ``save_to`` format; it keeps every result in memory.
+    """
+
+    def __init__(self, path: str, resume: bool = False):
+        self.path = path
+        self.completed = {}
+        if resume and os.path.exists(path):
+            with open(path) as f:
+                self.completed = json.load(f)
+        self._results = dict(self.completed)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def write(self, record: TokenRecord):
+        self._results[record.source] = record.tokens
+
+    def close(self):
+        with open(self.path, "w") as f:
+            json.dump(self._results, f, indent=4)
+
+
+class _StreamingSink:
+    """Appends records to a file and flushes them as they are produced."""
+
+    def __init__(
+        self, path: str, resume: bool = False, flush_interval: float = DEFAULT_FLUSH_INTERVAL
+    ):
+        self.path = path
+        self.flush_interval = flush_interval
+        self.completed = {}
+        if resume and os.path.exists(path):
+            _truncate_partial_line(path)
+            self.completed = {
+                record.source: record.tokens for record in self._read_records(path)
+            }
+            self._file = open(path, "a", newline="")
+            if os.path.getsize(path) == 0:
+                self._write_header()
+        else:
+            self._file = open(path, "w", newline="")
+            self._write_header()
+        self._last_flush = time.monotonic()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def _write_header(self):
+        pass
+
+    def _read_records(self, path: str):
+        raise NotImplementedError
+
+    def _write_record(self, record: TokenRecord):
+        raise NotImplementedError
+
+    def write(self, record: TokenRecord):
+        """Append a record; buffered records are flushed every ``flush_interval`` seconds."""
+        self._write_record(record)
+        if time.monotonic() - self._last_flush >= self.flush_interval:
+            self.flush()
+
+    def flush(self):
+        self._file.flush()
+        self._last_flush = time.monotonic()
+
+    def close(self):
+        if not self._file.closed:
+            self._file.close()
+
+
+class NdjsonSink(_StreamingSink):
+    """Writes one JSON object per line: source, width, height, tokens and error."""
+
+    def _read_records(self, path: str):
+        with open(path) as f:
+            for line in f:
+                if line.strip():
+                    yield TokenRecord(**json.loads(line))
+
+    def _write_record(self, record: TokenRecord):
+        self._file.write(json.dumps(record._asdict()) + "\n")
+
+
+class CsvSink(_StreamingSink):
+    """Writes a CSV file with the columns source, width, height, tokens and error."""
+
+    def __init__(self, path: str, resume: bool = False, **kwargs):
+        self._writer = None
+        super().__init__(path, resume=resume, **kwargs)
+
+    def _csv_writer(self):
+        if self._writer is None:
+            self._writer = csv.writer(self._file)
+        return self._writer
+
+    def _write_header(self):
+        self._csv_writer().writerow(CSV_FIELDS)
+
+    def _read_records(self, path: str):
+        with open(path, newline="") as f:
+            for row in csv.DictReader(f):
+                yield TokenRecord(
+                    source=row["source"],
+                    width=int(row["width"]) if row["width"] else None,
+                    height=int(row["height"]) if row["height"] else None,
+                    tokens=int(row["tokens"]),
+                    error=row["error"] or None,
+                )
+
+    def _write_record(self, record: TokenRecord):
+        self._csv_writer().writerow(
+            ["" if value is None else value for value in record]
+        )
+
+
+SINKS = {
+    "json": JsonSink,
+    "ndjson": NdjsonSink,
+    "csv": CsvSink,
+}
+
+
+def _truncate_partial_line(path: str):
+    # A run that died mid-write can leave an incomplete last line; drop it so that
+    # appended records start on a fresh line.
+    with open(path, "rb+") as f:
+        f.seek(0, os.SEEK_END)
+        size = f.tell()
+        if size == 0:
+            return
+        f.seek(size - 1)
+        if f.read(1) == b"\n":
+            return
+        position = size
+        while position > 0:
+            step = min(8192, position)
+            position -= step
+            f.seek(position)
+            chunk = f.read(step)
+            newline = chunk.rfind(b"\n")
+            if newline != -1:
+                f.truncate(position + newline + 1)
+                return
+        f.truncate(0)
+
+
+def open_sink(path: str, format: Optional[str] = None, resume: bool = False):
+    """
+    Opens an output sink for per-image results.
+
+    Args:
+        path (str): The output file path.
+        format (str): "json", "ndjson" or "csv". Defaults to the format implied by the
+                      file extension, see ``infer_format``.
+        resume (bool): Keep the records already in the file and append to it. The
+                       sources and tokens already written are in ``sink.completed``.
+
+    Raises:
+        ValueError: If the format is unknown.
+
+    Returns:
+        JsonSink | NdjsonSink | CsvSink: The sink, to be used as a context manager.
+    """
+    format = format or infer_format(path)
+    if format not in SINKS:
+        raise ValueError(f"Invalid format: {format}. Supported formats are : {list(SINKS)}")
+    return SINKS[format](str(path), resume=resume)
@@ -1,12 +1,22 @@
 import os
+import re
+from fnmatch import translate
+from typing import Iterable, Iterator, NamedTuple, Optional
 from PIL import Image
 from io import BytesIO
-import requests
-from requests.exceptions import HTTPError, RequestException
 from image_token.utils.caching_utils import ImageDimensionCache
-import tiktoken
+from image_token.utils.image_header import (
+    HEADER_PROBE_BYTES,
+    MAX_HEADER_BYTES,
+    get_image_dimensions_from_header,
+)
+from image_token.utils.metrics import NULL_METRICS, Metrics
+from image_token.utils.validate import ALLOWED_EXTENSIONS
 
 def calculate_text_tokens(model_name: str, text: str):
+    # tiktoken is slow to import and only needed by the LangChain integration.
+    import tiktoken
+
     enc = tiktoken.encoding_for_model("gpt-4o")
     tokens = enc.encode(text)
     num_tokens = len(tokens)
@@ -16,16 +26,153 @@ def read_image_dims(path: str) -> tuple[int, int]:
     """
     Reads the dimensions of an image from the specified file path.
 
+    Only the file header is read: the probe buffer starts at a few hundred bytes and
+    is grown while the header parser needs more data (e.g. JPEGs with large EXIF
+    blocks). Pillow is used as a fallback when the header cannot be parsed.
+
     Args:
         path (str): The file path to the image.
 
     Returns:
         tuple[int, int]: A tuple containing the width and height of the image.
     """
+    with open(path, "rb") as f:
+        data = f.read(HEADER_PROBE_BYTES)
+        while True:
+            dims = get_image_dimensions_from_header(data)
+            if dims is not None:
+                return dims
+            if len(data) >= MAX_HEADER_BYTES:
+                break
+            more = f.read(len(data))
+            if not more:
+                break
+            data += more
+
+    with Image.open(path) as img:
+        return img.size
+
+
+class ImageEntry(NamedTuple):
+    """An image file found by scan_images, with the stat data read during the scan."""
+
+    path: str
+    size: int
+    mtime_ns: int
+    inode: int
+
+
+def _compile_patterns(patterns: Optional[Iterable[str]]):
+    if not patterns:
+        return None
+    if isinstance(patterns, str):
+        patterns = [patterns]
+    return re.compile("|".join(translate(pattern) for pattern in patterns))
+
+
+def scan_images(
+    path: str,
+    extensions: Iterable[str] = ALLOWED_EXTENSIONS,
+    include: Optional[Iterable[str]] = None,
+    exclude: Optional[Iterable[str]] = None,
+    max_depth: Optional[int] = None,
+    follow_symlinks: bool = False,
+    min_size: Optional[int] = None,
+    max_size: Optional[int] = None,
+    metrics: Metrics = None,
+) -> Iterator[ImageEntry]:
+    """
+    Yields the image files under a folder using os.scandir.
+
+    Each file is stat-ed at most once and the result is yielded with the entry, so
+    later stages do not need to stat it again. Directories that cannot be read are
+    skipped, as os.walk does.
 
-    img = Image.open(path)
-    width, height = img.size
-    return width, height
+    Args:
+        path (str): The path to the folder containing the images.
+        extensions (Iterable[str]): Allowed file extensions, matched case-insensitively.
+        include (Iterable[str]): Glob patterns; if given, only files whose path relative
+                                 to ``path`` matches one of them are yielded.
+        exclude (Iterable[str]): Glob patterns for files and directories to skip. A
+                                 matching directory is not descended into.
+        max_depth (int): How many directory levels to descend. 0 only scans ``path``
+                         itself. Defaults to None (no limit).
+        follow_symlinks (bool): Descend into symlinked directories. Defaults to False.
+                                Symlinked files are always yielded, like os.walk lists
+                                them.
+        min_size (int): Skip files smaller than this many bytes.
+        max_size (int): Skip files larger than this many bytes.
+        metrics (Metrics): Counts files left out for their extension as
+                           ``files_skipped_extension`` and directories that could
+                           not be read as ``dirs_unreadable``.
+
+    Yields:
+        ImageEntry: The path, size, mtime_ns and inode of an image file.
+    """
+    extensions = frozenset(ext.lower() for ext in extensions)
+    metrics = metrics or NULL_METRICS
+    include_re = _compile_patterns(include)
+    exclude_re = _compile_patterns(exclude)
+    root = os.fspath(path)
+    root_prefix = len(os.path.join(root, ""))
+    visited = set()
+    if follow_symlinks:
+        st = os.stat(root)
+        visited.add((st.st_dev, st.st_ino))
+
+    stack = [(root, 0)]
+    while stack:
+        folder, depth = stack.pop()
+        sub_dirs = []
+        skipped = 0
+        try:
+            entries = os.scandir(folder)
+        except OSError:
+            metrics.count("dirs_unreadable")
+            continue
+        with entries:
+            for entry in entries:
+                rel_path = entry.path[root_prefix:]
+                if exclude_re and exclude_re.match(rel_path):
+                    continue
+                try:
+                    if entry.is_dir(follow_symlinks=follow_symlinks):
+                        if max_depth is None or depth < max_depth:
+                            sub_dirs.append(entry)
+                        continue
+                    if not entry.is_file():
+                        continue
+                except OSError:
+                    continue
+                if os.path.splitext(entry.name)[1].lower() not in extensions:
+                    skipped += 1
+                    continue
+                if include_re and not include_re.match(rel_path):
+                    continue
+                try:
+                    st = entry.stat()
+                except OSError:
+                    continue
+                if min_size is not None and st.st_size < min_size:
+                    continue
+                if max_size is not None and st.st_size > max_size:
+                    continue
+                yield ImageEntry(entry.path, st.st_size, st.st_mtime_ns, st.st_ino)
+        if skipped:
+            metrics.count("files_skipped_extension", skipped)
+
+        for entry in reversed(sub_dirs):
+            if follow_symlinks:
+                # Guard against symlink loops.
+                try:
+                    st = entry.stat()
+                except OSError:
+                    continue
+                key = (st.st_dev, st.st_ino)
+                if key in visited:
+                    continue
+                visited.add(key)
+            stack.append((entry.path, depth + 1))
 
 
 def list_all_images(path: str, sub_dir: bool = True):
@@ -40,35 +187,27 @@ def list_all_images(path: str, sub_dir: bool = True):
     Yields:
         str: A file path to an image file.
     """
-    if sub_dir:
-        for root, dirs, files in os.walk(path):
-            for file in files:
-                if (
-                    file.endswith(".jpg")
-                    or file.endswith(".jpeg")
-                    or file.endswith(".png")
-                ):
-                    yield os.path.join(root, file)
-    else:
-        for file in os.listdir(path):
-            if file.endswith(".jpg") or file.endswith(".jpeg") or file.endswith(".png"):
-                yield os.path.join(path, file)
+    for entry in scan_images(path, max_depth=None if sub_dir else 0):
+        yield entry.path
 
 
 def get_image_dimensions_from_bytes(image_bytes: bytes) -> tuple[int, int]:
     """
-    Reads the image bytes from request
+    Reads the image dimensions from the image bytes of a request.
+
+    The header is parsed directly; Pillow is only used when the header is unusual.
 
     Args:
-        input_bytes(int): The number of input tokens.
+        image_bytes (bytes): The raw image bytes.
 
     Returns:
-        tuple: [height , width].
+        tuple: [width , height], or None if the bytes are not a readable image.
     """
+    dims = get_image_dimensions_from_header(image_bytes)
+    if dims is not None:
+        return dims
     try:
-        print("bytes called")
         with Image.open(BytesIO(image_bytes)) as img:
             return img.size
     except Exception as e:
         return None
-
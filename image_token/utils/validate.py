@@ -2,6 +2,8 @@ import os
 from image_token.utils.config import openai_config
 from urllib.parse import urlparse
 
+ALLOWED_EXTENSIONS = frozenset((".jpg", ".jpeg", ".png"))
+
 
 def check_if_file_or_folder_exists(path: str):
     """
@@ -79,8 +81,7 @@ def check_allowed_extensions(path: str):
         ValueError: If the file does not have a valid extension.
     """
 
-    allowed_extensions = [".jpg", ".jpeg", ".png"]
-    if not any(path.endswith(ext) for ext in allowed_extensions):
+    if os.path.splitext(path)[1].lower() not in ALLOWED_EXTENSIONS:
         raise ValueError(f"Invalid file extension: {path}")
 
 
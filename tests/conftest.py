@@ -1,4 +1,12 @@
+import hashlib
+import re
+import threading
+import time
+import pytest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from io import BytesIO
 from pathlib import Path
+from PIL import Image
 
 # Constants
 JPG_FILE_PATH = str(Path("tests") / "image_folder" / "kitten.jpg")
@@ -203,4 +211,118 @@ test_inputs = {
 #             (64, 64): 15, (128, 256): 60, (256, 128): 60,
 #             (300, 500): 268, (800, 200): 292, (512, 512): 423,
 #             (1024, 1024): 1667,
-#         }
\ No newline at end of file
+#         }
+
+
+def encode_image(width, height, image_format, **save_kwargs):
+    buffer = BytesIO()
+    Image.new("RGB", (width, height), (10, 200, 90)).save(
+        buffer, format=image_format, **save_kwargs
+    )
+    return buffer.getvalue()
+
+
+class ImageRequestHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_GET(self):
+        server = self.server
+        with server.lock:
+            server.request_count += 1
+            server.active += 1
+            server.max_active = max(server.max_active, server.active)
+        try:
+            if server.delay:
+                time.sleep(server.delay)
+            self._send_image()
+        finally:
+            with server.lock:
+                server.active -= 1
+
+    def _send_image(self):
+        server = self.server
+        body = server.images.get(self.path)
+        if body is None:
+            self.send_error(404)
+            return
+
+        etag = '"%s"' % hashlib.md5(body).hexdigest()
+        if self.headers.get("If-None-Match") == etag:
+            with server.lock:
+                server.not_modified += 1
+            self.send_response(304)
+            self.send_header("ETag", etag)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+
+        range_header = self.headers.get("Range")
+        match = re.match(r"bytes=(\d+)-(\d*)", range_header or "")
+        if server.support_range and match:
+            start = int(match.group(1))
+            end = int(match.group(2)) if match.group(2) else len(body) - 1
+            if start >= len(body):
+                self.send_response(416)
+                self.send_header("Content-Range", f"bytes */{len(body)}")
+                self.send_header("Content-Length", "0")
+                self.end_headers()
+                return
+            end = min(end, len(body) - 1)
+            payload = body[start : end + 1]
+            self.send_response(206)
+            self.send_header("Content-Range", f"bytes {start}-{end}/{len(body)}")
+        else:
+            payload = body
+            self.send_response(200)
+
+        self.send_header("Content-Type", "application/octet-stream")
+        self.send_header("ETag", etag)
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        try:
+            for i in range(0, len(payload), 4096):
+                self.wfile.write(payload[i : i + 4096])
+                with server.lock:
+                    server.bytes_sent += min(4096, len(payload) - i)
+        except (BrokenPipeError, ConnectionResetError):
+            pass
+
+
+@pytest.fixture
+def image_server():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), ImageRequestHandler)
+    server.daemon_threads = True
+    server.images = {}
+    server.support_range = True
+    server.request_count = 0
+    server.not_modified = 0
+    server.bytes_sent = 0
+    server.delay = 0
+    server.active = 0
+    server.max_active = 0
+    server.lock = threading.Lock()
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    server.base_url = f"http://127.0.0.1:{server.server_address[1]}"
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture
+def image_dim_reads(monkeypatch):
+    """Records the path of every image header read by the folder readers."""
+    import image_token.utils.parallel as parallel
+
+    reads = []
+    original_read_image_dims = parallel.read_image_dims
+
+    def counting_read_image_dims(path):
+        reads.append(path)
+        return original_read_image_dims(path=path)
+
+    monkeypatch.setattr(parallel, "read_image_dims", counting_read_image_dims)
+    return reads
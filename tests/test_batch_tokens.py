@@ -0,0 +1,91 @@
+import random
+import pytest
+from conftest import GPT_4_1_MINI_MODEL_NAME, test_cases
+from image_token import calculate_image_tokens_batch
+from image_token.base.base import VisionModel, get_token_memo
+from image_token.main import _get_model
+from image_token.models.openai_helper import OpenAiModel
+from image_token.utils.config import gemini_config, openai_config
+
+np = pytest.importorskip("numpy")
+
+ALL_MODEL_NAMES = list(openai_config) + list(gemini_config)
+
+
+def sample_dimensions():
+    rng = random.Random(42)
+    dims = [(1, 1), (32, 32), (33, 31), (384, 384), (385, 100), (2048, 2048), (2049, 1)]
+    dims += list(test_cases)
+    dims += [(rng.randint(1, 12000), rng.randint(1, 12000)) for _ in range(3000)]
+    dims += [(rng.randint(1, 1200), rng.randint(1, 1200)) for _ in range(3000)]
+    return dims
+
+
+@pytest.mark.parametrize("model_name", ALL_MODEL_NAMES)
+def test_batch_matches_scalar(model_name):
+    dims = sample_dimensions()
+    widths = np.array([w for w, _ in dims])
+    heights = np.array([h for _, h in dims])
+    model = _get_model(model_name)
+
+    batch = calculate_image_tokens_batch(model_name, widths, heights, prefix_tokens=5)
+    scalar = [
+        model.calculate_image_tokens(
+            model_name=model_name, width=w, height=h, prefix_tokens=5
+        )
+        for w, h in dims
+    ]
+
+    assert batch.dtype == np.int64
+    assert batch.tolist() == scalar
+
+
+def test_batch_known_values_and_validation():
+    widths, heights = zip(*test_cases)
+    tokens = calculate_image_tokens_batch(GPT_4_1_MINI_MODEL_NAME, widths, heights)
+    assert tokens.tolist() == list(test_cases.values())
+
+    assert calculate_image_tokens_batch(GPT_4_1_MINI_MODEL_NAME, [], []).shape == (0,)
+    with pytest.raises(ValueError):
+        calculate_image_tokens_batch(GPT_4_1_MINI_MODEL_NAME, [10, 20], [10])
+    with pytest.raises(ValueError):
+        calculate_image_tokens_batch(GPT_4_1_MINI_MODEL_NAME, [0], [10])
+
+
+class CountingModel(OpenAiModel):
+    def __init__(self):
+        self.calls = 0
+
+    def calculate_image_tokens(self, model_name, width, height, **kwargs):
+        self.calls += 1
+        return super().calculate_image_tokens(model_name, width, height, **kwargs)
+
+
+def test_token_memo_is_keyed_by_dimensions_and_kwargs():
+    memo = get_token_memo()
+    memo.clear()
+    model = CountingModel()
+
+    for _ in range(5):
+        assert model.cached_image_tokens(GPT_4_1_MINI_MODEL_NAME, 300, 500) == test_cases[(300, 500)]
+    assert model.cached_image_tokens(GPT_4_1_MINI_MODEL_NAME, 300, 500, prefix_tokens=0) == (
+        test_cases[(300, 500)] - 9
+    )
+    assert model.calls == 2
+    stats = memo.stats()
+    assert (stats["hits"], stats["misses"], stats["size"]) == (4, 2, 2)
+
+
+def test_batch_fallback_computes_each_unique_dimension_once():
+    get_token_memo().clear()
+    model = CountingModel()
+    widths = np.array([64, 300, 64, 800, 300, 64] * 1000)
+    heights = np.array([64, 500, 64, 200, 500, 64] * 1000)
+
+    tokens = VisionModel.calculate_image_tokens_batch(
+        model, GPT_4_1_MINI_MODEL_NAME, widths, heights
+    )
+
+    assert model.calls == 3
+    assert tokens[:6].tolist() == [test_cases[dims] for dims in zip(widths[:6], heights[:6])]
+    assert tokens.shape == widths.shape
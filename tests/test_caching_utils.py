@@ -0,0 +1,332 @@
+import os
+import sqlite3
+import subprocess
+import sys
+import time
+import uuid
+import pytest
+from image_token.utils import caching_utils
+from image_token.utils.caching_utils import (
+    DimensionLRU,
+    ImageDimensionCache,
+    get_db_path,
+    get_memory_cache,
+)
+
+
+@pytest.fixture
+def private_db(tmp_path, monkeypatch):
+    db_path = str(tmp_path / "cache.db")
+    monkeypatch.setattr(caching_utils, "DB_PATH", db_path)
+    return db_path
+
+
+@pytest.fixture
+def url_prefix(private_db):
+    return f"https://cache-test.invalid/{uuid.uuid4().hex}/"
+
+
+def count_rows(prefix):
+    if not get_db_path().exists():
+        # Nothing was flushed yet.
+        return 0
+    with sqlite3.connect(get_db_path()) as connection:
+        return connection.execute(
+            "SELECT COUNT(*) FROM dimension_cache WHERE url LIKE ?", (prefix + "%",)
+        ).fetchone()[0]
+
+
+def test_buffered_writes_are_visible_and_flushed_on_exit(url_prefix):
+    with ImageDimensionCache(flush_size=1000, flush_interval=3600) as cache:
+        for i in range(10):
+            cache.cache_dimensions(f"{url_prefix}{i}.png", i + 1, i + 2)
+        assert cache.get_cached_dimensions(f"{url_prefix}3.png") == (4, 5)
+        assert count_rows(url_prefix) == 0
+
+    assert count_rows(url_prefix) == 10
+    with ImageDimensionCache() as cache:
+        assert cache.get_cached_dimensions(f"{url_prefix}9.png") == (10, 11)
+
+
+def test_writes_flush_at_size_threshold(url_prefix):
+    with ImageDimensionCache(flush_size=4, flush_interval=3600) as cache:
+        for i in range(5):
+            cache.cache_dimensions(f"{url_prefix}{i}.png", 10, 10)
+        assert count_rows(url_prefix) == 4
+
+
+def test_bulk_put_and_delete(url_prefix):
+    items = [(f"{url_prefix}{i}.jpg", 100 + i, 200 + i) for i in range(1000)]
+    with ImageDimensionCache() as cache:
+        cache.bulk_put(items)
+        assert count_rows(url_prefix) == 1000
+        assert cache.get_cached_dimensions(f"{url_prefix}999.jpg") == (1099, 1199)
+
+        cache.cache_dimensions(f"{url_prefix}new.jpg", 1, 1)
+        cache.delete_dimensions(f"{url_prefix}new.jpg")
+        cache.delete_dimensions(f"{url_prefix}0.jpg")
+        assert cache.get_cached_dimensions(f"{url_prefix}new.jpg") is None
+        assert cache.get_cached_dimensions(f"{url_prefix}0.jpg") is None
+
+
+def test_cache_uses_wal_journal(private_db):
+    with ImageDimensionCache() as cache:
+        mode = cache._db().execute("PRAGMA journal_mode").fetchone()[0]
+    assert mode.lower() == "wal"
+
+
+def test_get_many(url_prefix):
+    urls = [f"{url_prefix}{i}.png" for i in range(1200)]
+    with ImageDimensionCache(flush_size=10000, flush_interval=3600) as cache:
+        cache.bulk_put((url, 10, 20) for url in urls[:1100])
+        cache.cache_dimensions(urls[1150], 30, 40)
+
+        found = cache.get_many(urls + urls[:5])
+
+    assert len(found) == 1101
+    assert found[urls[0]] == (10, 20)
+    assert found[urls[1150]] == (30, 40)
+    assert urls[1100] not in found
+
+
+def test_dimension_lru_eviction_and_stats():
+    lru = DimensionLRU(maxsize=2)
+    lru.put("a", (1, 1))
+    lru.put("b", (2, 2))
+    assert lru.get("a") == (1, 1)
+    lru.put("c", (3, 3))
+
+    assert lru.get("b") is None
+    assert lru.get("c") == (3, 3)
+    stats = lru.stats()
+    assert (stats["size"], stats["hits"], stats["misses"], stats["evictions"]) == (2, 2, 1, 1)
+
+    lru.resize(1)
+    assert len(lru) == 1 and lru.get("c") == (3, 3)
+    lru.resize(0)
+    lru.put("d", (4, 4))
+    assert len(lru) == 0
+
+
+def test_memory_tier_serves_repeat_lookups_without_sqlite(url_prefix):
+    url = f"{url_prefix}hot.png"
+    with ImageDimensionCache() as cache:
+        cache.bulk_put([(url, 7, 8)])
+
+    hits_before = get_memory_cache().stats()["hits"]
+    with ImageDimensionCache() as cache:
+        for _ in range(100):
+            assert cache.get_cached_dimensions(url) == (7, 8)
+        assert cache._connection is None
+    assert get_memory_cache().stats()["hits"] - hits_before == 100
+
+    with ImageDimensionCache(memory_cache=None) as cache:
+        assert cache.get_cached_dimensions(url) == (7, 8)
+        assert cache._connection is not None
+
+
+def test_ttl_expires_url_entries(url_prefix):
+    url = f"{url_prefix}old.png"
+    with ImageDimensionCache(memory_cache=None) as cache:
+        cache.bulk_put([(url, 5, 6)])
+    with sqlite3.connect(get_db_path()) as connection:
+        connection.execute(
+            "UPDATE dimension_cache SET created_at = ? WHERE url = ?", (time.time() - 120, url)
+        )
+
+    with ImageDimensionCache(memory_cache=None) as cache:
+        assert cache.get_cached_dimensions(url) == (5, 6)
+    with ImageDimensionCache(memory_cache=None, ttl=60) as cache:
+        assert cache.get_cached_dimensions(url) is None
+        assert cache.get_many([url]) == {}
+
+
+def test_evict_least_recently_accessed(private_db):
+    with ImageDimensionCache(memory_cache=None, flush_interval=3600) as cache:
+        cache.bulk_put((f"https://example.com/{i}.png", i, i) for i in range(10))
+        with sqlite3.connect(private_db) as connection:
+            for i in range(10):
+                connection.execute(
+                    "UPDATE dimension_cache SET accessed_at = ? WHERE url = ?",
+                    (i, f"https://example.com/{i}.png"),
+                )
+        assert cache.get_cached_dimensions("https://example.com/0.png") == (0, 0)
+        cache.max_entries = 5
+        assert cache.evict() == 5
+
+        remaining = set(cache.get_many(f"https://example.com/{i}.png" for i in range(10)))
+    assert remaining == {f"https://example.com/{i}.png" for i in (0, 6, 7, 8, 9)}
+
+
+def test_evict_keeps_entries_served_from_the_memory_tier(private_db):
+    urls = [f"https://example.com/{i}.png" for i in range(10)]
+    memory = DimensionLRU()
+    with ImageDimensionCache(memory_cache=memory) as cache:
+        cache.bulk_put((url, i, i) for i, url in enumerate(urls))
+        cache.cache_file_dimensions("hot.png", 1, 1, 1, 10, 10)
+    with sqlite3.connect(private_db) as connection:
+        for i, url in enumerate(urls):
+            connection.execute(
+                "UPDATE dimension_cache SET accessed_at = ? WHERE url = ?", (i, url)
+            )
+        connection.execute("UPDATE file_dimension_cache SET accessed_at = 0")
+
+    # The hottest entries are only ever read from memory.
+    with ImageDimensionCache(memory_cache=memory) as cache:
+        assert cache.get_cached_dimensions(urls[0]) == (0, 0)
+        assert cache.get_many(urls[1:2]) == {urls[1]: (1, 1)}
+        assert cache.get_cached_file_dimensions("hot.png", 1, 1, 1) == (10, 10)
+        assert cache._connection is None
+
+    with ImageDimensionCache(memory_cache=None, max_entries=6) as cache:
+        assert cache.evict() == 5
+        remaining = set(cache.get_many(urls))
+        assert cache.get_cached_file_dimensions("hot.png", 1, 1, 1) == (10, 10)
+    assert remaining == {urls[i] for i in (0, 1, 7, 8, 9)}
+
+
+def test_max_entries_enforced_on_exit_of_a_memory_only_session(private_db):
+    urls = [f"https://example.com/{i}.png" for i in range(150)]
+    memory = DimensionLRU()
+    with ImageDimensionCache(memory_cache=memory) as cache:
+        cache.bulk_put((url, 1, 1) for url in urls)
+
+    with ImageDimensionCache(memory_cache=memory, max_entries=100) as cache:
+        assert cache.get_cached_dimensions(urls[0]) == (1, 1)
+        assert cache._connection is None
+    with ImageDimensionCache(memory_cache=None) as cache:
+        assert cache.stats()["entries"] == 100
+        assert cache.get_cached_dimensions(urls[0]) == (1, 1)
+
+
+def test_evict_removes_exactly_the_excess_of_rows_sharing_a_timestamp(private_db):
+    # bulk_put and buffered writes give every row of a batch the same accessed_at.
+    with ImageDimensionCache(memory_cache=None, flush_interval=3600) as cache:
+        cache.bulk_put((f"https://example.com/bulk/{i}.png", i, i) for i in range(1000))
+        cache.max_entries = 999
+        assert cache.evict() == 1
+        assert cache.stats()["entries"] == 999
+
+    with ImageDimensionCache(memory_cache=None, flush_size=1000, flush_interval=3600) as cache:
+        for i in range(450):
+            cache.cache_dimensions(f"https://example.com/put/{i}.png", i, i)
+        cache.max_entries = 400
+        assert cache.evict() == 1049
+        assert cache.stats()["entries"] == 400
+
+
+def test_max_entries_enforced_on_exit(private_db):
+    with ImageDimensionCache(memory_cache=None, max_entries=100) as cache:
+        cache.bulk_put((f"https://example.com/{i}.png", i, i) for i in range(150))
+        cache.cache_file_dimensions("a.png", 1, 1, 1, 10, 10)
+    with ImageDimensionCache(memory_cache=None) as cache:
+        assert cache.stats()["entries"] <= 100
+
+
+def test_stats_and_vacuum(private_db):
+    with ImageDimensionCache(memory_cache=None) as cache:
+        cache.bulk_put((f"https://example.com/{i}.png", i, i) for i in range(2000))
+        cache.cache_file_dimensions("a.png", 1, 1, 1, 10, 10)
+        before = cache.stats()
+        assert (before["url_entries"], before["file_entries"]) == (2000, 1)
+        assert before["entries"] == 2001
+        assert before["disk_bytes"] > 0
+        assert before["memory"] is None
+
+        hits = before["hits"]
+        cache.get_cached_dimensions("https://example.com/1.png")
+        cache.get_cached_dimensions("https://example.com/missing.png")
+        after = cache.stats()
+        assert after["hits"] == hits + 1
+        assert 0 < after["hit_ratio"] <= 1
+
+        cache.max_bytes = 4096 * 4
+        cache.evict()
+        cache.vacuum()
+        assert cache.stats()["disk_bytes"] < before["disk_bytes"]
+
+
+def test_revalidate_keeps_expired_entries_with_validators(private_db):
+    with ImageDimensionCache(memory_cache=None, ttl=60, revalidate=True) as cache:
+        cache.cache_dimensions("https://example.com/a.png", 1, 2, etag='"abc"')
+        cache.cache_dimensions("https://example.com/b.png", 3, 4)
+        cache.flush()
+        with sqlite3.connect(private_db) as connection:
+            connection.execute("UPDATE dimension_cache SET created_at = ?", (time.time() - 120,))
+
+        entry = cache.get_cached_entry("https://example.com/a.png")
+        assert cache.is_stale(entry) and entry.etag == '"abc"'
+        assert cache.get_cached_dimensions("https://example.com/a.png") is None
+
+        assert cache.evict() == 1
+        assert cache.get_cached_entry("https://example.com/b.png") is None
+
+        cache.touch_dimensions("https://example.com/a.png")
+        assert cache.get_cached_dimensions("https://example.com/a.png") == (1, 2)
+        assert cache.get_cached_entry("https://example.com/a.png").etag == '"abc"'
+
+
+def test_import_does_not_touch_the_filesystem(tmp_path):
+    cache_dir = tmp_path / "cache"
+    code = (
+        "from image_token.utils.caching_utils import ImageDimensionCache, get_db_path\n"
+        "import os\n"
+        "assert not os.path.exists(os.environ['IMAGE_CACHE_DIR'])\n"
+        "with ImageDimensionCache() as cache:\n"
+        "    cache.cache_dimensions('https://example.com/a.png', 1, 2)\n"
+        "print(get_db_path())"
+    )
+    result = subprocess.run(
+        [sys.executable, "-c", code],
+        env={**os.environ, "IMAGE_CACHE_DIR": str(cache_dir)},
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    assert result.stdout.strip() == str(cache_dir / "ImageTokenDimensionCache.sqlite")
+    assert os.path.exists(result.stdout.strip())
+
+
+def test_cache_path_per_instance(tmp_path):
+    db_path = tmp_path / "nested" / "dims.sqlite"
+    with ImageDimensionCache(memory_cache=None, path=db_path) as cache:
+        cache.cache_dimensions("https://example.com/a.png", 1, 2)
+    assert db_path.exists()
+    with ImageDimensionCache(memory_cache=None, path=db_path) as cache:
+        assert cache.get_cached_dimensions("https://example.com/a.png") == (1, 2)
+        assert cache.stats()["disk_bytes"] > 0
+
+    with ImageDimensionCache(memory_cache=None, path=":memory:") as cache:
+        cache.cache_dimensions("https://example.com/a.png", 3, 4)
+        assert cache.get_cached_dimensions("https://example.com/a.png") == (3, 4)
+        stats = cache.stats()
+        assert (stats["url_entries"], stats["disk_bytes"]) == (1, 0)
+
+
+def test_memory_tier_is_keyed_by_database(tmp_path):
+    url = f"https://cache-test.invalid/{uuid.uuid4().hex}/isolated.png"
+    with ImageDimensionCache(path=tmp_path / "a.sqlite") as cache:
+        cache.cache_dimensions(url, 5, 6)
+    with ImageDimensionCache(path=tmp_path / "a.sqlite") as cache:
+        assert cache.get_cached_dimensions(url) == (5, 6)
+        assert cache._connection is None
+
+    with ImageDimensionCache(path=tmp_path / "b.sqlite") as cache:
+        assert cache.get_cached_dimensions(url) is None
+    with ImageDimensionCache(path=":memory:") as cache:
+        assert cache.get_cached_dimensions(url) is None
+        cache.cache_dimensions(url, 7, 8)
+    with ImageDimensionCache(path=":memory:") as cache:
+        assert cache.get_cached_dimensions(url) is None
+
+
+def test_unwritable_default_location_falls_back_to_memory(tmp_path, monkeypatch):
+    blocker = tmp_path / "file"
+    blocker.write_text("")
+    monkeypatch.setenv("IMAGE_CACHE_DIR", str(blocker / "cache"))
+
+    with pytest.warns(UserWarning):
+        with ImageDimensionCache(memory_cache=None) as cache:
+            cache.cache_dimensions("https://example.com/a.png", 1, 2)
+            assert cache.get_cached_dimensions("https://example.com/a.png") == (1, 2)
+            assert cache.stats()["disk_bytes"] == 0
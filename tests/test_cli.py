@@ -0,0 +1,149 @@
+import base64
+import csv
+import io
+import json
+import pytest
+from pathlib import Path
+from conftest import (
+    JPG_FILE_PATH,
+    PNG_FILE_PATH,
+    GPT_4_1_MINI_MODEL_NAME,
+    GEMINI_2_0_FLASH,
+    encode_image,
+    test_cases,
+)
+from image_token import get_token
+from image_token.cli import main
+
+FOLDER = str(Path(JPG_FILE_PATH).parent)
+
+
+def test_table_output_for_folder_and_models(capsys):
+    assert main(["-m", f"{GPT_4_1_MINI_MODEL_NAME},{GEMINI_2_0_FLASH}", "--cache", ":memory:", FOLDER]) == 0
+    out = capsys.readouterr().out
+    assert GPT_4_1_MINI_MODEL_NAME in out.splitlines()[0]
+    assert "3 images, 0 failed" in out
+    expected = get_token(model_name=GPT_4_1_MINI_MODEL_NAME, path=FOLDER)
+    assert any(line.split()[:2] == [GPT_4_1_MINI_MODEL_NAME, str(expected)] for line in out.splitlines())
+
+
+def test_ndjson_records_and_failures(capsys):
+    status = main(["-m", GPT_4_1_MINI_MODEL_NAME, "--format", "ndjson", str(JPG_FILE_PATH), "missing.png"])
+    captured = capsys.readouterr()
+    records = [json.loads(line) for line in captured.out.splitlines()]
+
+    assert status == 1
+    assert records[0]["source"] == str(JPG_FILE_PATH)
+    assert records[0]["tokens"] == get_token(model_name=GPT_4_1_MINI_MODEL_NAME, path=JPG_FILE_PATH)
+    assert records[1]["source"] == "missing.png" and records[1]["tokens"] == -1
+    assert records[1]["error"]
+    assert "2 images, 1 failed" in captured.err
+
+
+def test_csv_output_file_from_stdin(tmp_path, monkeypatch, capsys):
+    monkeypatch.setattr("sys.stdin", io.StringIO(f"{JPG_FILE_PATH}\n# comment\n\n{PNG_FILE_PATH}\n"))
+    output = tmp_path / "tokens.csv"
+
+    assert main(["-m", GPT_4_1_MINI_MODEL_NAME, "-m", GEMINI_2_0_FLASH, "-o", str(output)]) == 0
+    with open(output, newline="") as f:
+        rows = list(csv.DictReader(f))
+    assert [(row["source"], row["model"]) for row in rows] == [
+        (str(JPG_FILE_PATH), GPT_4_1_MINI_MODEL_NAME),
+        (str(JPG_FILE_PATH), GEMINI_2_0_FLASH),
+        (str(PNG_FILE_PATH), GPT_4_1_MINI_MODEL_NAME),
+        (str(PNG_FILE_PATH), GEMINI_2_0_FLASH),
+    ]
+    assert capsys.readouterr().out == ""
+
+
+def test_jsonl_requests_and_url_list(image_server, tmp_path, capsys):
+    image_server.images["/cli.png"] = encode_image(300, 500, "PNG")
+    url = image_server.base_url + "/cli.png"
+    data_url = "data:image/png;base64," + base64.b64encode(encode_image(800, 200, "PNG")).decode()
+    requests_file = tmp_path / "batch.jsonl"
+    requests_file.write_text(
+        "\n".join(
+            json.dumps(request)
+            for request in [
+                {
+                    "custom_id": "req-1",
+                    "body": {
+                        "messages": [
+                            {"role": "system", "content": "Describe the image."},
+                            {
+                                "role": "user",
+                                "content": [
+                                    {"type": "text", "text": "What is this?"},
+                                    {"type": "image_url", "image_url": {"url": data_url}},
+                                    {"type": "image_url", "image_url": {"url": url}},
+                                ],
+                            },
+                        ]
+                    },
+                },
+                {"url": url},
+            ]
+        )
+    )
+    url_list = tmp_path / "urls.txt"
+    url_list.write_text(url + "\n")
+
+    status = main([
+        "-m", GPT_4_1_MINI_MODEL_NAME, "--format", "ndjson", "--cache", ":memory:",
+        "--jsonl", str(requests_file), "--urls", str(url_list),
+    ])
+    records = [json.loads(line) for line in capsys.readouterr().out.splitlines()]
+
+    assert status == 0
+    # Inputs are read in order: URL lists, then JSONL request files.
+    assert [record["source"] for record in records] == [url, "req-1#0", url, url]
+    assert [record["tokens"] for record in records] == [
+        test_cases[(300, 500)], test_cases[(800, 200)], test_cases[(300, 500)], test_cases[(300, 500)]
+    ]
+
+
+def test_jsonl_errors_point_at_the_source_line(tmp_path, capsys):
+    requests_file = tmp_path / "batch.jsonl"
+    requests_file.write_text(
+        "# requests\n"
+        f"{json.dumps({'path': str(JPG_FILE_PATH)})}\n"
+        "\n"
+        "{not json\n"
+        "[1, 2]\n"
+    )
+
+    status = main(["-m", GPT_4_1_MINI_MODEL_NAME, "--format", "ndjson", "--jsonl", str(requests_file)])
+    records = [json.loads(line) for line in capsys.readouterr().out.splitlines()]
+
+    assert status == 1
+    assert [record["source"] for record in records] == [
+        str(JPG_FILE_PATH), f"{requests_file}:4", f"{requests_file}:5"
+    ]
+    assert records[1]["error"] and records[2]["error"]
+
+
+def test_invalid_model_and_missing_inputs():
+    with pytest.raises(SystemExit):
+        main(["-m", "not-a-model", str(JPG_FILE_PATH)])
+    with pytest.raises(SystemExit):
+        main([str(JPG_FILE_PATH)])
+
+
+@pytest.mark.parametrize("workers", [None, 2])
+def test_corrupt_file_in_folder_fails_only_that_file(tmp_path, capsys, workers):
+    (tmp_path / "a.png").write_bytes(encode_image(300, 500, "PNG"))
+    (tmp_path / "b.png").write_bytes(encode_image(800, 200, "PNG"))
+    (tmp_path / "corrupt.jpg").write_bytes(b"not a jpeg")
+    argv = ["-m", GPT_4_1_MINI_MODEL_NAME, "--format", "ndjson", str(tmp_path)]
+    if workers:
+        argv += ["--workers", str(workers), "--executor", "thread"]
+
+    status = main(argv)
+    captured = capsys.readouterr()
+    records = {Path(record["source"]).name: record for record in map(json.loads, captured.out.splitlines())}
+
+    assert status == 1
+    assert records["a.png"]["tokens"] == test_cases[(300, 500)]
+    assert records["b.png"]["tokens"] == test_cases[(800, 200)]
+    assert records["corrupt.jpg"]["tokens"] == -1 and records["corrupt.jpg"]["error"]
+    assert "3 images, 1 failed" in captured.err
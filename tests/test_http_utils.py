@@ -0,0 +1,396 @@
+import asyncio
+import json
+import time
+import pytest
+from PIL import Image
+from conftest import GPT_4_1_MINI_MODEL_NAME, encode_image, test_cases
+from image_token import get_token, get_cost, get_token_multi, iter_tokens, aget_token, aget_cost
+from image_token.utils.async_utils import aclose_async_client
+from image_token.utils.caching_utils import ImageDimensionCache
+from image_token.utils.http_utils import (
+    ImageFetchSession,
+    fetch_image_dimensions,
+    fetch_image_info,
+    get_default_session,
+    set_default_session,
+)
+
+
+@pytest.mark.parametrize("support_range", [True, False])
+def test_partial_download_of_large_image(image_server, support_range):
+    image_server.support_range = support_range
+    body = encode_image(1600, 1200, "PNG", compress_level=0)
+    image_server.images["/big.png"] = body
+
+    dims = fetch_image_dimensions(image_server.base_url + "/big.png")
+
+    assert dims == (1600, 1200)
+    if support_range:
+        assert image_server.bytes_sent < len(body) // 10
+    else:
+        assert image_server.request_count == 1
+
+
+def test_partial_download_grows_range_for_deep_jpeg_header(image_server):
+    exif = Image.Exif()
+    exif[0x010E] = "x" * 60000
+    image_server.images["/exif.jpg"] = encode_image(800, 600, "JPEG", exif=exif.tobytes())
+
+    dims = fetch_image_dimensions(image_server.base_url + "/exif.jpg", range_bytes=1024)
+
+    assert dims == (800, 600)
+    assert image_server.request_count > 1
+
+
+def test_partial_download_of_small_and_unusual_images(image_server):
+    image_server.images["/small.jpg"] = encode_image(32, 16, "JPEG")
+    image_server.images["/image.tiff"] = encode_image(40, 20, "TIFF")
+
+    assert fetch_image_dimensions(image_server.base_url + "/small.jpg") == (32, 16)
+    assert fetch_image_dimensions(image_server.base_url + "/image.tiff") == (40, 20)
+
+
+def test_full_download_mode(image_server):
+    image_server.images["/full.png"] = encode_image(300, 200, "PNG")
+
+    dims = fetch_image_dimensions(image_server.base_url + "/full.png", partial=False)
+
+    assert dims == (300, 200)
+    assert image_server.bytes_sent == len(image_server.images["/full.png"])
+
+
+def test_get_token_with_concurrent_url_fetch(image_server, tmp_path):
+    sizes = [(64, 64), (300, 500), (800, 200), (1024, 1024)]
+    urls = []
+    for i in range(24):
+        width, height = sizes[i % len(sizes)]
+        image_server.images[f"/{i}.png"] = encode_image(width, height, "PNG")
+        urls.append(f"{image_server.base_url}/{i}.png")
+    urls.append(image_server.base_url + "/missing.png")
+    image_server.delay = 0.05
+
+    output_path = tmp_path / "tokens.json"
+    cache_path = str(tmp_path / "cache.sqlite")
+    total = get_token(
+        model_name=GPT_4_1_MINI_MODEL_NAME,
+        path=urls,
+        save_to=str(output_path),
+        max_workers=8,
+        max_per_host=4,
+        cache_path=cache_path,
+    )
+
+    expected = [test_cases[sizes[i % len(sizes)]] for i in range(24)] + [-1]
+    with open(output_path) as f:
+        result = json.load(f)
+    assert list(result.keys()) == urls
+    assert list(result.values()) == expected
+    assert total == sum(expected)
+    assert 1 < image_server.max_active <= 4
+
+    # Second run is served from the dimension cache.
+    requests_before = image_server.request_count
+    assert get_token(
+        model_name=GPT_4_1_MINI_MODEL_NAME, path=urls, max_workers=8, cache_path=cache_path
+    ) == total
+    assert image_server.request_count == requests_before + 1
+
+
+def test_concurrent_fetch_does_not_block_other_hosts_behind_a_busy_one(image_server):
+    from image_token.utils.fetcher import fetch_dimensions_concurrently
+
+    for i in range(12):
+        image_server.images[f"/hol_{i}.png"] = encode_image(64, 64, "PNG")
+    image_server.delay = 0.1
+    port = image_server.server_address[1]
+    # Two host names for the same server; the first host's URLs are queued first.
+    urls = [f"http://127.0.0.1:{port}/hol_{i}.png" for i in range(6)]
+    urls += [f"http://localhost:{port}/hol_{i}.png" for i in range(6, 12)]
+
+    with ImageFetchSession() as session:
+        start = time.perf_counter()
+        results = list(
+            fetch_dimensions_concurrently(urls, max_workers=4, max_per_host=2, session=session)
+        )
+        elapsed = time.perf_counter() - start
+
+    assert all(result.dimensions == (64, 64) for _, result, _ in results)
+    # Both hosts run side by side: 3 rounds of 2 + 2 requests. Workers blocked on a
+    # busy host would need 5 rounds.
+    assert elapsed < 0.45
+
+
+def test_aget_token_and_aget_cost(image_server, tmp_path):
+    pytest.importorskip("httpx")
+    sizes = [(64, 64), (300, 500), (1024, 1024)]
+    urls = []
+    for i, (width, height) in enumerate(sizes * 4):
+        image_server.images[f"/async_{i}.png"] = encode_image(width, height, "PNG")
+        urls.append(f"{image_server.base_url}/async_{i}.png")
+    image_server.delay = 0.05
+
+    expected = sum(test_cases[size] for size in sizes * 4)
+    cache_path = str(tmp_path / "cache.sqlite")
+
+    async def run():
+        tokens = await aget_token(
+            model_name=GPT_4_1_MINI_MODEL_NAME,
+            path=urls,
+            max_concurrency=8,
+            max_per_host=3,
+            cache_path=cache_path,
+        )
+        single = await aget_token(
+            model_name=GPT_4_1_MINI_MODEL_NAME, path=urls[0], cache_path=cache_path
+        )
+        missing = await aget_token(
+            model_name=GPT_4_1_MINI_MODEL_NAME,
+            path=image_server.base_url + "/missing.png",
+            cache_path=cache_path,
+        )
+        cost = await aget_cost(
+            model_name=GPT_4_1_MINI_MODEL_NAME,
+            system_prompt_tokens=100,
+            approx_output_tokens=10,
+            path=urls,
+            cache_path=cache_path,
+        )
+        await aclose_async_client()
+        return tokens, single, missing, cost
+
+    tokens, single, missing, cost = asyncio.run(run())
+
+    assert tokens == expected
+    assert single == test_cases[sizes[0]]
+    assert missing == -1
+    assert cost == get_cost(
+        model_name=GPT_4_1_MINI_MODEL_NAME,
+        system_prompt_tokens=100,
+        approx_output_tokens=10,
+        path=urls,
+        cache_path=cache_path,
+    )
+    assert 1 < image_server.max_active <= 3
+
+
+def test_aget_token_fetches_misses_in_batches_without_probing_again(
+    image_server, tmp_path, monkeypatch
+):
+    pytest.importorskip("httpx")
+    import image_token.base.base as base
+
+    urls = []
+    for i in range(6):
+        image_server.images[f"/abatch_{i}.png"] = encode_image(64, 64, "PNG")
+        urls.append(f"{image_server.base_url}/abatch_{i}.png")
+    image_server.delay = 0.05
+    monkeypatch.setattr(base, "URL_BATCH_SIZE", 2)
+    probes = []
+    original = ImageDimensionCache.get_cached_dimensions
+
+    def counting_get_cached_dimensions(self, url):
+        probes.append(url)
+        return original(self, url)
+
+    monkeypatch.setattr(
+        ImageDimensionCache, "get_cached_dimensions", counting_get_cached_dimensions
+    )
+
+    async def run():
+        tokens = await aget_token(
+            model_name=GPT_4_1_MINI_MODEL_NAME,
+            path=urls,
+            max_concurrency=16,
+            cache_path=str(tmp_path / "cache.sqlite"),
+        )
+        await aclose_async_client()
+        return tokens
+
+    assert asyncio.run(run()) == 6 * test_cases[(64, 64)]
+    assert image_server.request_count == 6
+    # Misses from the bulk lookup are fetched directly, one batch at a time.
+    assert probes == []
+    assert image_server.max_active <= 2
+
+
+def test_fetch_session_reuses_connections(image_server):
+    for i in range(10):
+        image_server.images[f"/pooled_{i}.jpg"] = encode_image(640, 480, "JPEG")
+
+    with ImageFetchSession(pool_maxsize=2, timeout=5) as session:
+        for i in range(10):
+            dims = fetch_image_dimensions(
+                f"{image_server.base_url}/pooled_{i}.jpg", session=session
+            )
+            assert dims == (640, 480)
+        stats = session.stats()
+
+    assert stats["requests"] == 10
+    assert stats["connections"] == 1
+    assert stats["reused"] == 9
+
+
+def test_default_session_is_injectable(image_server, tmp_path):
+    image_server.images["/default.png"] = encode_image(300, 500, "PNG")
+    session = ImageFetchSession()
+    set_default_session(session)
+    try:
+        tokens = get_token(
+            model_name=GPT_4_1_MINI_MODEL_NAME,
+            path=image_server.base_url + "/default.png",
+            cache_path=str(tmp_path / "cache.sqlite"),
+        )
+        assert tokens == test_cases[(300, 500)]
+        assert session.stats()["requests"] == 1
+    finally:
+        set_default_session(None)
+    assert get_default_session() is not session
+
+
+def test_get_token_warm_cache_fetches_only_misses(image_server, tmp_path):
+    urls = []
+    for i in range(6):
+        image_server.images[f"/warm_{i}.png"] = encode_image(64, 64, "PNG")
+        urls.append(f"{image_server.base_url}/warm_{i}.png")
+
+    cache_path = str(tmp_path / "cache.sqlite")
+    with ImageDimensionCache(path=cache_path) as cache:
+        cache.bulk_put((url, 64, 64) for url in urls[:4])
+
+    expected = 6 * test_cases[(64, 64)]
+    assert get_token(model_name=GPT_4_1_MINI_MODEL_NAME, path=urls, cache_path=cache_path) == (
+        expected
+    )
+    assert image_server.request_count == 2
+    assert asyncio.run(
+        aget_token(model_name=GPT_4_1_MINI_MODEL_NAME, path=urls, cache_path=cache_path)
+    ) == expected
+    assert image_server.request_count == 2
+
+
+def test_conditional_fetch_returns_not_modified(image_server):
+    image_server.images["/etag.png"] = encode_image(1600, 1200, "PNG", compress_level=0)
+    url = image_server.base_url + "/etag.png"
+
+    result = fetch_image_info(url)
+    assert result.dimensions == (1600, 1200)
+    assert result.etag is not None and not result.not_modified
+
+    requests_before = image_server.request_count
+    revalidated = fetch_image_info(url, etag=result.etag)
+    assert revalidated.not_modified and revalidated.dimensions is None
+    assert image_server.request_count == requests_before + 1
+    assert image_server.not_modified == 1
+    assert fetch_image_info(url, partial=False, etag=result.etag).not_modified
+
+
+def test_get_token_revalidates_stale_urls(image_server, tmp_path):
+    image_server.images["/cdn.png"] = encode_image(300, 500, "PNG")
+    url = image_server.base_url + "/cdn.png"
+    cache_path = str(tmp_path / "cache.sqlite")
+    first = get_token(model_name=GPT_4_1_MINI_MODEL_NAME, path=url, cache_path=cache_path)
+    assert first == test_cases[(300, 500)]
+
+    # Cached entries are trusted unless revalidation is requested.
+    requests_before = image_server.request_count
+    assert get_token(model_name=GPT_4_1_MINI_MODEL_NAME, path=url, cache_path=cache_path) == first
+    assert image_server.request_count == requests_before
+
+    assert get_token(
+        model_name=GPT_4_1_MINI_MODEL_NAME, path=url, cache_path=cache_path, revalidate_after=0
+    ) == first
+    assert image_server.not_modified == 1
+
+    image_server.images["/cdn.png"] = encode_image(800, 200, "PNG")
+    assert get_token(
+        model_name=GPT_4_1_MINI_MODEL_NAME, path=url, cache_path=cache_path, revalidate_after=0
+    ) == test_cases[(800, 200)]
+    assert get_token(
+        model_name=GPT_4_1_MINI_MODEL_NAME,
+        path=[url],
+        max_workers=2,
+        cache_path=cache_path,
+        revalidate_after=0,
+    ) == test_cases[(800, 200)]
+    assert image_server.not_modified == 2
+    assert get_token(model_name=GPT_4_1_MINI_MODEL_NAME, path=url, cache_path=cache_path) == (
+        test_cases[(800, 200)]
+    )
+
+
+def test_iter_tokens_yields_url_records_in_input_order(image_server, tmp_path):
+    image_server.images["/a.png"] = encode_image(64, 64, "PNG")
+    image_server.images["/b.png"] = encode_image(300, 500, "PNG")
+    urls = [image_server.base_url + name for name in ("/b.png", "/missing.png", "/a.png")]
+
+    records = list(
+        iter_tokens(
+            GPT_4_1_MINI_MODEL_NAME, urls, max_workers=4, cache_path=str(tmp_path / "cache.sqlite")
+        )
+    )
+
+    assert [r.source for r in records] == urls
+    assert records[0][1:] == (300, 500, test_cases[(300, 500)], None)
+    assert records[1].tokens == -1 and records[1].width is None
+    assert "404" in records[1].error
+    assert records[2][1:] == (64, 64, test_cases[(64, 64)], None)
+
+
+def test_get_token_multi_fetches_each_url_once(image_server, tmp_path):
+    urls = []
+    for i, size in enumerate([(64, 64), (800, 200)]):
+        image_server.images[f"/multi_{i}.png"] = encode_image(*size, "PNG")
+        urls.append(f"{image_server.base_url}/multi_{i}.png")
+    urls.append(image_server.base_url + "/missing.png")
+
+    totals = get_token_multi(
+        [GPT_4_1_MINI_MODEL_NAME, "gemini-2.5-flash"],
+        urls,
+        max_workers=4,
+        cache_path=str(tmp_path / "cache.sqlite"),
+    )
+
+    assert image_server.request_count == 3
+    assert totals == {
+        GPT_4_1_MINI_MODEL_NAME: test_cases[(64, 64)] + test_cases[(800, 200)] - 1,
+        "gemini-2.5-flash": 2 * 258 - 1,
+    }
+
+
+def test_get_token_uses_cache_path(image_server, tmp_path):
+    image_server.images["/located.png"] = encode_image(64, 64, "PNG")
+    url = image_server.base_url + "/located.png"
+    db_path = tmp_path / "urls.sqlite"
+
+    assert get_token(model_name=GPT_4_1_MINI_MODEL_NAME, path=url, cache_path=db_path) == (
+        test_cases[(64, 64)]
+    )
+    with ImageDimensionCache(memory_cache=None, path=db_path) as cache:
+        assert cache.get_cached_dimensions(url) == (64, 64)
+    assert asyncio.run(
+        aget_token(model_name=GPT_4_1_MINI_MODEL_NAME, path=[url], cache_path=":memory:")
+    ) == test_cases[(64, 64)]
+
+
+def test_async_host_limiter_does_not_let_a_busy_host_hold_global_slots():
+    from image_token.utils.async_utils import AsyncHostLimiter
+
+    async def run():
+        limiter = AsyncHostLimiter(max_concurrency=4, max_per_host=2)
+        active = []
+
+        async def request(url):
+            async with limiter.slot(url):
+                active.append(url)
+                await asyncio.sleep(0.02)
+
+        # Host a is queued first; host b must still get its slots right away.
+        urls = [f"http://a.invalid/{i}" for i in range(6)] + [f"http://b.invalid/{i}" for i in range(2)]
+        tasks = [asyncio.ensure_future(request(url)) for url in urls]
+        await asyncio.sleep(0.01)
+        started = list(active)
+        await asyncio.gather(*tasks)
+        return started
+
+    started = asyncio.run(run())
+    assert sorted(url.split("/")[2] for url in started) == ["a.invalid"] * 2 + ["b.invalid"] * 2
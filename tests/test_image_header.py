@@ -0,0 +1,62 @@
+import os
+import tempfile
+import pytest
+from PIL import Image, features
+from conftest import JPG_FILE_PATH, JPEG_FILE_PATH, PNG_FILE_PATH, encode_image
+from image_token.utils.image_header import (
+    get_image_dimensions_from_header,
+    sniff_image_format,
+)
+from image_token.utils.utils import read_image_dims, get_image_dimensions_from_bytes
+
+
+@pytest.mark.parametrize("path", [JPG_FILE_PATH, JPEG_FILE_PATH, PNG_FILE_PATH])
+def test_read_image_dims_matches_pillow(path):
+    with Image.open(path) as img:
+        assert read_image_dims(path) == img.size
+
+
+@pytest.mark.parametrize(
+    "image_format,save_kwargs",
+    [
+        ("PNG", {}),
+        ("JPEG", {}),
+        ("JPEG", {"progressive": True}),
+        ("GIF", {}),
+        ("BMP", {}),
+    ],
+)
+@pytest.mark.parametrize("width,height", [(1, 1), (64, 33), (1023, 517)])
+def test_header_dims_for_formats(image_format, save_kwargs, width, height):
+    data = encode_image(width, height, image_format, **save_kwargs)
+    assert get_image_dimensions_from_header(data[:512]) == (width, height)
+
+
+@pytest.mark.skipif(not features.check("webp"), reason="Pillow built without WebP")
+@pytest.mark.parametrize("save_kwargs", [{"lossless": False}, {"lossless": True}])
+def test_header_dims_for_webp(save_kwargs):
+    data = encode_image(301, 157, "WEBP", **save_kwargs)
+    assert sniff_image_format(data) == "webp"
+    assert get_image_dimensions_from_header(data) == (301, 157)
+
+
+def test_jpeg_with_large_exif_block():
+    exif = Image.Exif()
+    exif[0x010E] = "x" * 60000  # ImageDescription
+    data = encode_image(640, 480, "JPEG", exif=exif.tobytes())
+
+    assert get_image_dimensions_from_header(data[:512]) is None
+    assert get_image_dimensions_from_header(data) == (640, 480)
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        path = os.path.join(temp_dir, "exif.jpg")
+        with open(path, "wb") as f:
+            f.write(data)
+        assert read_image_dims(path) == (640, 480)
+
+
+def test_unknown_header_falls_back_to_pillow():
+    data = encode_image(40, 20, "TIFF")
+    assert get_image_dimensions_from_header(data) is None
+    assert get_image_dimensions_from_bytes(data) == (40, 20)
+    assert get_image_dimensions_from_bytes(b"not an image") is None
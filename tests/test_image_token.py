@@ -1,10 +1,12 @@
 import pytest
 import tempfile
 import os
+import subprocess
+import sys
 import json
 from PIL import Image
 from tempfile import NamedTemporaryFile
-from image_token import get_token
+from image_token import Metrics, compare_cost, get_cost, get_token, get_token_multi, iter_tokens
 from pathlib import Path
 from conftest import (
     JPG_FILE_PATH,
@@ -16,6 +18,9 @@ from conftest import (
     CACHE_TEST_IMAGE_URL,
     GPT_4_1_MINI_MODEL_NAME,
     GPT_4_1_NANO_MODEL_NAME,
+    GPT_4_O_MODEL_NAME,
+    GEMINI_2_0_FLASH,
+    GEMINI_2_5_PRO,
     GPT_MODEL_NAMES,
     EXPECTED_OUTPUT_TOKENS_GPT,
     GEMINI_MODEL_NAMES,
@@ -25,6 +30,7 @@ from conftest import (
 )
 from image_token.utils.config import openai_config
 from image_token.utils.caching_utils import ImageDimensionCache
+from image_token.utils.utils import list_all_images, scan_images
 import time
 from image_token.utils.validate import (
     check_if_path_is_file,
@@ -271,3 +277,207 @@ def test_is_multiple_urls():
     for key in test_inputs:
         if key != "urls":
             assert is_multiple_urls(test_inputs[key]) == False
+
+
+@pytest.mark.parametrize("executor", ["process", "thread"])
+def test_get_tokens_with_folder_in_parallel(executor, tmp_path):
+    sizes = list(test_cases.keys())
+    for i in range(40):
+        sub_dir = tmp_path / f"part_{i % 3}"
+        sub_dir.mkdir(exist_ok=True)
+        Image.new("RGB", sizes[i % len(sizes)]).save(sub_dir / f"img_{i}.png")
+
+    serial_output = tmp_path / "serial.json"
+    parallel_output = tmp_path / "parallel.json"
+    serial_tokens = get_token(
+        model_name=GPT_4_1_MINI_MODEL_NAME, path=str(tmp_path), save_to=str(serial_output)
+    )
+    parallel_tokens = get_token(
+        model_name=GPT_4_1_MINI_MODEL_NAME,
+        path=str(tmp_path),
+        save_to=str(parallel_output),
+        workers=3,
+        executor=executor,
+    )
+
+    assert parallel_tokens == serial_tokens
+    assert serial_tokens == sum(test_cases[sizes[i % len(sizes)]] for i in range(40))
+    with open(serial_output) as f_serial, open(parallel_output) as f_parallel:
+        assert json.load(f_parallel) == json.load(f_serial)
+
+
+def test_get_tokens_with_folder_invalid_executor():
+    with pytest.raises(ValueError):
+        get_token(
+            model_name=GPT_4_1_MINI_MODEL_NAME,
+            path=str(Path("tests") / "image_folder"),
+            workers=2,
+            executor="gpu",
+        )
+
+
+def test_scan_images_filters(tmp_path):
+    files = {
+        "a.jpg": 10,
+        "B.JPG": 20,
+        "c.png": 3000,
+        "notes.txt": 5,
+        "sub/d.jpeg": 40,
+        "sub/deeper/e.png": 50,
+        "raw/f.png": 60,
+    }
+    for name, size in files.items():
+        file_path = tmp_path / name
+        file_path.parent.mkdir(parents=True, exist_ok=True)
+        file_path.write_bytes(b"\0" * size)
+
+    def scan(**kwargs):
+        return {
+            os.path.relpath(entry.path, tmp_path).replace(os.sep, "/")
+            for entry in scan_images(str(tmp_path), **kwargs)
+        }
+
+    assert scan() == {"a.jpg", "B.JPG", "c.png", "sub/d.jpeg", "sub/deeper/e.png", "raw/f.png"}
+    assert scan(max_depth=0) == {"a.jpg", "B.JPG", "c.png"}
+    assert scan(max_depth=1) == {"a.jpg", "B.JPG", "c.png", "sub/d.jpeg", "raw/f.png"}
+    assert scan(exclude=["raw", "*.png"]) == {"a.jpg", "B.JPG", "sub/d.jpeg"}
+    assert scan(include=["sub*"]) == {"sub/d.jpeg", "sub/deeper/e.png"}
+    assert scan(min_size=20, max_size=2000) == {"B.JPG", "sub/d.jpeg", "sub/deeper/e.png", "raw/f.png"}
+
+    entry = next(e for e in scan_images(str(tmp_path)) if e.path.endswith("c.png"))
+    st = os.stat(entry.path)
+    assert (entry.size, entry.mtime_ns, entry.inode) == (st.st_size, st.st_mtime_ns, st.st_ino)
+
+
+@pytest.mark.skipif(not hasattr(os, "symlink"), reason="symlinks not supported")
+def test_scan_images_symlinks(tmp_path):
+    (tmp_path / "real").mkdir()
+    (tmp_path / "real" / "a.png").write_bytes(b"\0")
+    os.symlink(tmp_path / "real", tmp_path / "link")
+    os.symlink(tmp_path, tmp_path / "real" / "loop")
+
+    assert len(list(scan_images(str(tmp_path)))) == 1
+    assert len(list(scan_images(str(tmp_path), follow_symlinks=True))) == 1
+
+
+@pytest.mark.skipif(not hasattr(os, "symlink"), reason="symlinks not supported")
+def test_scan_images_yields_symlinked_files(tmp_path):
+    # Blob stores such as the Hugging Face cache link image names to content files.
+    (tmp_path / "blobs").mkdir()
+    Image.new("RGB", (64, 64)).save(tmp_path / "blobs" / "3f2a9c", format="PNG")
+    (tmp_path / "snapshot").mkdir()
+    os.symlink(tmp_path / "blobs" / "3f2a9c", tmp_path / "snapshot" / "cat.png")
+    os.symlink(tmp_path / "blobs" / "missing", tmp_path / "snapshot" / "broken.png")
+
+    folder = str(tmp_path / "snapshot")
+    assert list(list_all_images(folder)) == [str(tmp_path / "snapshot" / "cat.png")]
+    assert get_token(model_name=GPT_4_1_MINI_MODEL_NAME, path=folder) == test_cases[(64, 64)]
+
+
+def test_scan_images_skips_unreadable_directories(tmp_path, monkeypatch):
+    (tmp_path / "locked").mkdir()
+    (tmp_path / "locked" / "a.png").write_bytes(b"\0")
+    (tmp_path / "b.png").write_bytes(b"\0")
+    scandir = os.scandir
+
+    def failing_scandir(path):
+        if os.path.basename(path) == "locked":
+            raise PermissionError(13, "Permission denied", path)
+        return scandir(path)
+
+    monkeypatch.setattr(os, "scandir", failing_scandir)
+    metrics = Metrics()
+
+    paths = [entry.path for entry in scan_images(str(tmp_path), metrics=metrics)]
+
+    assert paths == [str(tmp_path / "b.png")]
+    assert metrics.to_dict()["counters"]["dirs_unreadable"] == 1
+
+
+def test_list_all_images_is_case_insensitive(tmp_path):
+    Image.new("RGB", (64, 64)).save(tmp_path / "upper.JPG", format="JPEG")
+    Image.new("RGB", (64, 64)).save(tmp_path / "lower.png")
+    assert len(list(list_all_images(str(tmp_path)))) == 2
+    assert get_token(model_name=GPT_4_1_MINI_MODEL_NAME, path=str(tmp_path)) == 2 * test_cases[(64, 64)]
+
+
+def test_get_tokens_with_folder_file_cache(tmp_path, image_dim_reads):
+    folder = tmp_path / "images"
+    folder.mkdir()
+    for i, size in enumerate([(64, 64), (128, 256), (300, 500)]):
+        Image.new("RGB", size).save(folder / f"img_{i}.png")
+    expected = test_cases[(64, 64)] + test_cases[(128, 256)] + test_cases[(300, 500)]
+    options = {"file_cache": True, "cache_path": str(tmp_path / "cache.sqlite")}
+
+    assert get_token(GPT_4_1_MINI_MODEL_NAME, str(folder), **options) == expected
+    assert len(image_dim_reads) == 3
+
+    image_dim_reads.clear()
+    assert get_token(GPT_4_1_MINI_MODEL_NAME, str(folder), **options) == expected
+    assert image_dim_reads == []
+
+    # A changed file is re-read, the others still come from the cache.
+    Image.new("RGB", (512, 512)).save(folder / "img_0.png")
+    expected = expected - test_cases[(64, 64)] + test_cases[(512, 512)]
+    assert get_token(GPT_4_1_MINI_MODEL_NAME, str(folder), **options) == expected
+    assert [os.path.basename(path) for path in image_dim_reads] == ["img_0.png"]
+
+
+def test_iter_tokens_streams_folder_records(tmp_path):
+    sizes = [(64, 64), (300, 500), (800, 200)]
+    for i, size in enumerate(sizes):
+        Image.new("RGB", size).save(tmp_path / f"img_{i}.png")
+
+    records = iter_tokens(GPT_4_1_MINI_MODEL_NAME, str(tmp_path))
+    first = next(records)
+    assert first.error is None and first.tokens == test_cases[(first.width, first.height)]
+
+    records = [first, *records]
+    assert sorted((r.width, r.height) for r in records) == sorted(sizes)
+    assert {os.path.basename(r.source) for r in records} == {"img_0.png", "img_1.png", "img_2.png"}
+    assert sum(r.tokens for r in records) == get_token(GPT_4_1_MINI_MODEL_NAME, str(tmp_path))
+
+    file_record, = iter_tokens(GPT_4_1_MINI_MODEL_NAME, str(tmp_path / "img_1.png"))
+    assert file_record == (str(tmp_path / "img_1.png"), 300, 500, test_cases[(300, 500)], None)
+
+    with pytest.raises(ValueError):
+        iter_tokens(GPT_4_1_MINI_MODEL_NAME, "random text")
+
+
+def test_get_token_multi_reads_each_image_once(tmp_path, image_dim_reads):
+    for i, size in enumerate([(64, 64), (300, 500), (1024, 1024)]):
+        Image.new("RGB", size).save(tmp_path / f"img_{i}.png")
+    models = [GPT_4_1_MINI_MODEL_NAME, GPT_4_O_MODEL_NAME, GEMINI_2_0_FLASH, GEMINI_2_5_PRO]
+
+    totals = get_token_multi(models, str(tmp_path), prefix_tokens=3)
+
+    assert len(image_dim_reads) == 3
+    assert list(totals) == models
+    for model_name in models:
+        assert totals[model_name] == get_token(model_name, str(tmp_path), prefix_tokens=3)
+
+    breakdown = compare_cost(models, 100, 50, str(tmp_path), prefix_tokens=3)
+    for model_name in models:
+        assert breakdown[model_name]["image_tokens"] == totals[model_name]
+        assert breakdown[model_name]["input_tokens"] == totals[model_name] + 100
+        assert breakdown[model_name]["cost"] == pytest.approx(
+            get_cost(model_name, 100, 50, str(tmp_path), prefix_tokens=3)
+        )
+
+    with pytest.raises(ValueError):
+        get_token_multi([GPT_4_1_MINI_MODEL_NAME, "gpt-unknown"], str(tmp_path))
+
+
+def test_import_defers_heavy_dependencies():
+    code = (
+        "import sys, image_token\n"
+        "image_token.get_token('gpt-4.1-mini', sys.argv[1])\n"
+        "print(','.join(m for m in ('langchain_openai', 'tiktoken', 'requests') if m in sys.modules))"
+    )
+    result = subprocess.run(
+        [sys.executable, "-c", code, str(JPG_FILE_PATH)],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    assert result.stdout.strip() == ""
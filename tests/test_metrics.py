@@ -0,0 +1,120 @@
+import json
+from pathlib import Path
+from conftest import JPG_FILE_PATH, GPT_4_1_MINI_MODEL_NAME, encode_image, test_cases
+from image_token import Metrics, get_cost, get_token
+from image_token.utils.http_utils import fetch_image_info
+from image_token.utils.metrics import Histogram
+
+FOLDER = str(Path(JPG_FILE_PATH).parent)
+
+
+def test_histogram_buckets_are_cumulative():
+    histogram = Histogram(buckets=(1, 10))
+    for value in (0.5, 1, 5, 50):
+        histogram.observe(value)
+
+    assert histogram.cumulative() == [(1, 2), (10, 3), (float("inf"), 4)]
+    assert histogram.sum == 56.5 and histogram.count == 4
+
+
+def test_folder_run_records_stages_and_counters(tmp_path):
+    (tmp_path / "notes.txt").write_text("not an image")
+    (tmp_path / "kitten.jpg").write_bytes(Path(JPG_FILE_PATH).read_bytes())
+    metrics = Metrics()
+
+    tokens = get_token(
+        model_name=GPT_4_1_MINI_MODEL_NAME,
+        path=str(tmp_path),
+        file_cache=True,
+        cache_path=str(tmp_path / "cache.sqlite"),
+        metrics=metrics,
+    )
+
+    assert tokens == get_token(model_name=GPT_4_1_MINI_MODEL_NAME, path=JPG_FILE_PATH)
+    snapshot = metrics.to_dict()
+    assert snapshot["counters"] == {
+        "files_skipped_extension": 1,
+        "files_seen": 1,
+        "cache_hits": 0,
+        "cache_misses": 1,
+        "images": 1,
+    }
+    assert set(snapshot["stages"]) == {"listing", "header_decode", "sqlite", "token_math", "total"}
+    assert snapshot["stages"]["header_decode"]["count"] == 1
+    assert snapshot["stages"]["header_decode"]["buckets"]["+Inf"] == 1
+    json.dumps(snapshot)
+
+
+def test_parallel_folder_run_and_get_cost(tmp_path):
+    metrics = Metrics()
+
+    get_cost(
+        model_name=GPT_4_1_MINI_MODEL_NAME,
+        system_prompt_tokens=10,
+        approx_output_tokens=10,
+        path=FOLDER,
+        workers=2,
+        executor="thread",
+        metrics=metrics,
+    )
+
+    snapshot = metrics.to_dict()
+    assert snapshot["counters"]["files_seen"] == 3
+    assert snapshot["counters"]["images"] == 3
+    assert snapshot["stages"]["token_math"]["count"] == 3
+    assert snapshot["stages"]["total"]["count"] == 1
+
+
+def test_url_run_counts_bytes_hits_and_errors(image_server, tmp_path):
+    body = encode_image(300, 500, "PNG")
+    image_server.images["/metrics.png"] = body
+    urls = [image_server.base_url + "/metrics.png", image_server.base_url + "/missing.png"]
+    cache_path = str(tmp_path / "cache.sqlite")
+
+    cold = Metrics()
+    tokens = get_token(
+        model_name=GPT_4_1_MINI_MODEL_NAME, path=urls, cache_path=cache_path, metrics=cold
+    )
+    assert tokens == test_cases[(300, 500)] - 1
+    counters = cold.to_dict()["counters"]
+    assert counters["cache_misses"] == 2
+    assert counters["http_fetches"] == 2
+    assert counters["http_bytes"] == len(body)
+    assert counters["errors"] == 1
+    assert cold.to_dict()["stages"]["network"]["count"] == 2
+    assert cold.to_dict()["histograms"]["http_bytes_per_image"]["count"] == 1
+
+    warm = Metrics()
+    get_token(model_name=GPT_4_1_MINI_MODEL_NAME, path=urls[:1], cache_path=cache_path, metrics=warm)
+    assert warm.to_dict()["counters"]["cache_hits"] == 1
+    assert "network" not in warm.to_dict()["stages"]
+
+
+def test_fetch_result_reports_bytes_read(image_server):
+    body = encode_image(1600, 1200, "PNG", compress_level=0)
+    image_server.images["/bytes.png"] = body
+    url = image_server.base_url + "/bytes.png"
+
+    partial = fetch_image_info(url)
+    full = fetch_image_info(url, partial=False)
+
+    assert 0 < partial.bytes_read < len(body) // 10
+    assert full.bytes_read == len(body)
+
+
+def test_prometheus_text():
+    metrics = Metrics()
+    metrics.add_time("network", 0.002)
+    metrics.count("http_bytes", 2048)
+    metrics.observe("http_bytes_per_image", 2048)
+
+    lines = metrics.to_prometheus(prefix="test").splitlines()
+
+    assert "# TYPE test_stage_seconds histogram" in lines
+    assert 'test_stage_seconds_bucket{stage="network",le="0.001"} 0' in lines
+    assert 'test_stage_seconds_bucket{stage="network",le="0.005"} 1' in lines
+    assert 'test_stage_seconds_count{stage="network"} 1' in lines
+    assert "test_http_bytes_total 2048" in lines
+    assert 'test_http_bytes_per_image_bucket{le="4096.0"} 1' in lines
+    assert "test_http_bytes_per_image_sum 2048.0" in lines
+    assert Metrics().to_prometheus() == ""
@@ -0,0 +1,86 @@
+import pytest
+from conftest import JPG_FILE_PATH, GPT_4_1_MINI_MODEL_NAME, test_cases
+from image_token import ModelCalculator, get_cost, get_token, register_model
+from image_token.main import _get_model
+from image_token.models.openai_helper import OpenAiModel, PatchCalculator
+from image_token.models.registry import (
+    RegisteredModel,
+    get_calculator,
+    registered_models,
+    unregister_model,
+)
+from image_token.utils.config import gemini_config, openai_config
+
+
+class FlatCalculator(ModelCalculator):
+    __slots__ = ("tokens_per_image", "price")
+
+    kind = "flat"
+
+    def __init__(self, name, tokens_per_image, price):
+        super().__init__(name)
+        self._set(tokens_per_image=tokens_per_image, price=price)
+
+    def image_tokens(self, width, height, **kwargs):
+        return self.tokens_per_image
+
+    def cost(self, input_tokens, output_tokens):
+        return (input_tokens + output_tokens) * self.price
+
+
+@pytest.fixture
+def flat_model():
+    register_model(FlatCalculator("flat-vision", tokens_per_image=100, price=0.5))
+    yield "flat-vision"
+    unregister_model("flat-vision")
+
+
+def test_builtin_models_are_registered_once_and_shared():
+    assert set(registered_models()) >= set(openai_config) | set(gemini_config)
+    assert _get_model("gpt-4o") is _get_model(GPT_4_1_MINI_MODEL_NAME)
+    assert isinstance(_get_model("gpt-4o"), OpenAiModel)
+    assert _get_model("gemini-2.0-flash") is _get_model("gemini-2.5-pro")
+
+    calculator = get_calculator(GPT_4_1_MINI_MODEL_NAME)
+    assert isinstance(calculator, PatchCalculator) and calculator.kind == "patch"
+    assert get_calculator("gpt-4o").kind == "tile"
+    assert get_calculator("gemini-2.0-flash").tiled
+    assert not get_calculator("gemini-2.5-pro").tiled
+    assert get_calculator(GPT_4_1_MINI_MODEL_NAME) is calculator
+
+
+def test_calculators_are_immutable():
+    calculator = get_calculator(GPT_4_1_MINI_MODEL_NAME)
+    with pytest.raises(AttributeError):
+        calculator.factor = 2
+    with pytest.raises(AttributeError):
+        calculator.extra = 1
+    with pytest.raises(AttributeError):
+        del calculator.max_tokens
+    assert not hasattr(calculator, "__dict__")
+
+
+def test_unsupported_model_names_the_model():
+    with pytest.raises(ValueError, match="Unsupported model: not-a-model"):
+        get_token(model_name="not-a-model", path=JPG_FILE_PATH)
+    with pytest.raises(ValueError):
+        OpenAiModel().calculate_image_tokens("gemini-2.0-flash", 100, 100)
+
+
+def test_register_third_party_model(flat_model):
+    assert isinstance(_get_model(flat_model), RegisteredModel)
+    assert get_token(model_name=flat_model, path=JPG_FILE_PATH) == 100
+    assert get_cost(
+        model_name=flat_model, system_prompt_tokens=10, approx_output_tokens=5, path=JPG_FILE_PATH
+    ) == pytest.approx(57.5)
+
+    with pytest.raises(ValueError):
+        register_model(FlatCalculator(flat_model, tokens_per_image=1, price=0))
+    register_model(FlatCalculator(flat_model, tokens_per_image=7, price=0), replace=True)
+    assert get_token(model_name=flat_model, path=JPG_FILE_PATH) == 7
+
+
+def test_registry_results_match_known_values():
+    model = _get_model(GPT_4_1_MINI_MODEL_NAME)
+    for (width, height), expected in test_cases.items():
+        assert model.calculate_image_tokens(GPT_4_1_MINI_MODEL_NAME, width, height) == expected
@@ -0,0 +1,92 @@
+import csv
+import json
+import pytest
+from PIL import Image
+from conftest import GPT_4_1_MINI_MODEL_NAME, test_cases
+from image_token import get_token
+from image_token.utils.records import TokenRecord
+from image_token.utils.sinks import CsvSink, JsonSink, NdjsonSink, infer_format, open_sink
+
+
+def make_folder(folder, sizes):
+    for i, size in enumerate(sizes):
+        Image.new("RGB", size).save(folder / f"img_{i}.png")
+
+
+def test_open_sink_infers_format(tmp_path):
+    assert infer_format("out.NDJSON") == "ndjson"
+    assert infer_format("out.jsonl") == "ndjson"
+    assert infer_format("out.csv") == "csv"
+    assert infer_format("out.json") == "json"
+    assert isinstance(open_sink(tmp_path / "a.jsonl"), NdjsonSink)
+    assert isinstance(open_sink(tmp_path / "a.txt", format="csv"), CsvSink)
+    assert isinstance(open_sink(tmp_path / "a.json"), JsonSink)
+    with pytest.raises(ValueError):
+        open_sink(tmp_path / "a.json", format="xml")
+
+
+@pytest.mark.parametrize("name", ["out.ndjson", "out.csv"])
+def test_streaming_sink_resumes_after_partial_write(tmp_path, name):
+    path = tmp_path / name
+    records = [
+        TokenRecord("a.png", 64, 64, 15),
+        TokenRecord("https://example.com/x.png", None, None, -1, "HTTP error"),
+    ]
+    with open_sink(path) as sink:
+        for record in records:
+            sink.write(record)
+    with open(path, "a") as f:
+        f.write('{"source": "trunc')
+
+    with open_sink(path, resume=True) as sink:
+        assert sink.completed == {"a.png": 15, "https://example.com/x.png": -1}
+        sink.write(TokenRecord("b.png", 128, 256, 60))
+
+    with open_sink(path, resume=True) as sink:
+        assert list(sink._read_records(str(path))) == records + [TokenRecord("b.png", 128, 256, 60)]
+
+
+@pytest.mark.parametrize("name", ["tokens.ndjson", "tokens.csv", "tokens.json"])
+def test_get_token_resume_skips_completed_images(tmp_path, name):
+    folder = tmp_path / "images"
+    folder.mkdir()
+    make_folder(folder, [(64, 64), (300, 500)])
+    output = tmp_path / name
+    first = get_token(GPT_4_1_MINI_MODEL_NAME, str(folder), save_to=str(output))
+    assert first == test_cases[(64, 64)] + test_cases[(300, 500)]
+
+    Image.new("RGB", (800, 200)).save(folder / "img_2.png")
+    # Rewrite a finished image: a resumed run must not read it again.
+    Image.new("RGB", (512, 512)).save(folder / "img_0.png")
+    total = get_token(GPT_4_1_MINI_MODEL_NAME, str(folder), save_to=str(output), resume=True)
+    assert total == first + test_cases[(800, 200)]
+
+    with open_sink(output, resume=True) as sink:
+        assert sorted(sink.completed.values()) == sorted(
+            [test_cases[(64, 64)], test_cases[(300, 500)], test_cases[(800, 200)]]
+        )
+
+
+def test_ndjson_and_csv_records(tmp_path):
+    folder = tmp_path / "images"
+    folder.mkdir()
+    make_folder(folder, [(300, 500)])
+
+    get_token(GPT_4_1_MINI_MODEL_NAME, str(folder), save_to=str(tmp_path / "t.ndjson"))
+    with open(tmp_path / "t.ndjson") as f:
+        (line,) = [json.loads(line) for line in f]
+    assert line == {
+        "source": str(folder / "img_0.png"),
+        "width": 300,
+        "height": 500,
+        "tokens": test_cases[(300, 500)],
+        "error": None,
+    }
+
+    get_token(GPT_4_1_MINI_MODEL_NAME, str(folder), save_to=str(tmp_path / "t.csv"))
+    with open(tmp_path / "t.csv", newline="") as f:
+        rows = list(csv.reader(f))
+    assert rows == [
+        ["source", "width", "height", "tokens", "error"],
+        [str(folder / "img_0.png"), "300", "500", str(test_cases[(300, 500)]), ""],
+    ]